@@ -116,7 +116,7 @@ def safety(session: Session) -> None:
 def mypy(session: Session) -> None:
     """Type-check using mypy."""
     args = session.posargs or ["src", "tests", "docs/conf.py"]
-    session.install(".")
+    session.install(".[arrow,fast,msgpack]")
     session.install("mypy", "pytest", "types-requests")
     session.run("mypy", *args)
     if not session.posargs:
@@ -126,7 +126,7 @@ def mypy(session: Session) -> None:
 @session(python=python_versions)
 def tests(session: Session) -> None:
     """Run the test suite."""
-    session.install(".")
+    session.install(".[arrow,fast,msgpack]")
     session.install("coverage[toml]", "pytest", "pygments", "vcrpy", "pytest-asyncio")
     try:
         session.run("coverage", "run", "--parallel", "-m", "pytest", *session.posargs)
@@ -135,6 +135,14 @@ def tests(session: Session) -> None:
             session.notify("coverage", posargs=[])
 
 
+@session(python=python_versions[0])
+def benchmarks(session: Session) -> None:
+    """Run the benchmarks against the recorded cassettes."""
+    session.install(".")
+    session.install("pytest", "pytest-asyncio", "pytest-benchmark", "vcrpy")
+    session.run("pytest", "tests/benchmarks", "--benchmark-only", *session.posargs)
+
+
 @session(python=python_versions[0])
 def coverage(session: Session) -> None:
     """Produce the coverage report."""
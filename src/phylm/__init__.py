@@ -1,4 +1,5 @@
 """Phylm."""
+from .batch import PhylmBatch
 from .phylm import Phylm
 
-__all__ = ["Phylm"]
+__all__ = ["Phylm", "PhylmBatch"]
@@ -1,12 +1,218 @@
 """Command-line interface."""
+import asyncio
+import csv
+import json
+from typing import IO
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+
 import click
 
+from phylm.batch import DEFAULT_CONCURRENCY
+from phylm.batch import PhylmBatch
+from phylm.errors import SourceNotLoadedError
+from phylm.phylm import SOURCES
+from phylm.phylm import Phylm
+
+LINES_FORMAT = "lines"
+CSV_FORMAT = "csv"
+
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.version_option()
 def main() -> None:
     """Phylm."""
 
 
+@main.command()
+@click.argument("input_file", metavar="INPUT", type=click.File("r"), default="-")
+@click.option(
+    "--sources",
+    default=",".join(SOURCES),
+    show_default=True,
+    help="A comma separated list of the sources to load.",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    help="The maximum number of films being loaded at any one time.",
+)
+@click.option(
+    "--format",
+    "input_format",
+    type=click.Choice([LINES_FORMAT, CSV_FORMAT]),
+    default=LINES_FORMAT,
+    show_default=True,
+    help=(
+        "Either a title per line, or a CSV file with a header and a title column, "
+        "and optionally year, imdb_id and tmdb_id columns."
+    ),
+)
+@click.option(
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="The file to write the results to. Defaults to stdout.",
+)
+def enrich(
+    input_file: IO[str],
+    sources: str,
+    concurrency: int,
+    input_format: str,
+    output: IO[str],
+) -> None:
+    """Load the sources for each film in INPUT, defaulting to stdin.
+
+    The results are written as JSON Lines, one film per line in order of completion. A
+    source which fails to load doesn't stop the other films, its error is included in
+    the film's result instead.
+    """
+    source_list = _parse_sources(sources)
+    films = (
+        _read_csv(input_file) if input_format == CSV_FORMAT else _read_lines(input_file)
+    )
+
+    asyncio.run(_enrich(films, source_list, concurrency, output))
+
+
+async def _enrich(
+    films: Iterator[Phylm], sources: List[str], concurrency: int, output: IO[str]
+) -> None:
+    """Load the films, writing each one as soon as it has loaded.
+
+    Args:
+        films: the films to load
+        sources: the sources to load for every film
+        concurrency: the maximum number of films being loaded at any one time
+        output: the file to write the results to
+    """
+    async with PhylmBatch(sources, concurrency=concurrency, partial=True) as batch:
+        async for phylm in batch.load_many(films):
+            output.write(json.dumps(_to_record(phylm, sources)) + "\n")
+            output.flush()
+
+
+def _parse_sources(sources: str) -> List[str]:
+    """Split and validate a comma separated list of sources.
+
+    Args:
+        sources: the comma separated list
+
+    Raises:
+        BadParameter: if a source is not recognised or none are given
+
+    Returns:
+        List[str]: the sources
+    """
+    source_list = [source.strip() for source in sources.split(",") if source.strip()]
+
+    if not source_list:
+        raise click.BadParameter(
+            "at least one source must be given", param_hint="'--sources'"
+        )
+
+    for source in source_list:
+        if source not in SOURCES:
+            raise click.BadParameter(
+                f"{source} is not a recognised source, use any of {', '.join(SOURCES)}",
+                param_hint="'--sources'",
+            )
+
+    return source_list
+
+
+def _read_lines(input_file: IO[str]) -> Iterator[Phylm]:
+    """Read a title per line, skipping blank lines.
+
+    Args:
+        input_file: the input file
+
+    Yields:
+        a `Phylm` instance for each title
+    """
+    for line in input_file:
+        title = line.strip()
+        if title:
+            yield Phylm(title)
+
+
+def _read_csv(input_file: IO[str]) -> Iterator[Phylm]:
+    """Read the films of a CSV file with a header.
+
+    Args:
+        input_file: the input file
+
+    Raises:
+        ClickException: if there's no title column or a year isn't a number
+
+    Yields:
+        a `Phylm` instance for each row
+    """
+    reader = csv.DictReader(input_file)
+
+    if "title" not in (reader.fieldnames or []):
+        raise click.ClickException("The CSV input must have a title column")
+
+    for row in reader:
+        title = (row.get("title") or "").strip()
+        if not title:
+            continue
+
+        year = (row.get("year") or "").strip()
+        if year and not year.isdigit():
+            raise click.ClickException(
+                f"Line {reader.line_num}: {year} is not a valid year"
+            )
+
+        yield Phylm(
+            title,
+            imdb_id=(row.get("imdb_id") or "").strip() or None,
+            year=int(year) if year else None,
+            tmdb_id=(row.get("tmdb_id") or "").strip() or None,
+        )
+
+
+def _to_record(phylm: Phylm, sources: List[str]) -> Dict[str, Any]:
+    """Return the search terms and the loaded sources of a film.
+
+    Args:
+        phylm: the loaded film
+        sources: the sources which were loaded
+
+    Returns:
+        Dict[str, Any]: the record to write
+    """
+    loaded: Dict[str, Dict[str, Any]] = {}
+
+    for source in sources:
+        if source in phylm.errors:
+            continue
+        try:
+            source_obj = getattr(phylm, source)
+        except SourceNotLoadedError:
+            continue
+        loaded[source] = {
+            "low_confidence": source_obj.low_confidence,
+            "match_score": source_obj.match_score,
+            "data": source_obj.to_dict()["data"],
+        }
+
+    return {
+        "title": phylm.title,
+        "year": phylm.year,
+        "imdb_id": phylm.imdb_id,
+        "tmdb_id": phylm.tmdb_id,
+        "sources": loaded,
+        "errors": {
+            source: f"{type(error).__name__}: {error}"
+            for source, error in phylm.errors.items()
+        },
+    }
+
+
 if __name__ == "__main__":
     main(prog_name="phylm")  # pragma: no cover
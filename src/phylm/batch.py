@@ -0,0 +1,359 @@
+"""Module to contain the `PhylmBatch` class definition."""
+import asyncio
+import functools
+from types import TracebackType
+from typing import AsyncGenerator
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
+from typing import Type
+from typing import Union
+
+from aiohttp import ClientSession
+from aiohttp import TCPConnector
+
+from phylm.phylm import Phylm
+from phylm.utils.aio import bounded_as_completed
+
+DEFAULT_CONCURRENCY = 10
+DEFAULT_LIMIT_PER_HOST = 10
+DNS_CACHE_TTL = 300
+NOT_OPEN_MESSAGE = "The batch must be opened with `async with` first."
+
+
+class PhylmBatch:
+    """Load many `Phylm` objects through one shared `aiohttp.ClientSession`."""
+
+    def __init__(
+        self,
+        sources: List[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        source_limits: Optional[Dict[str, int]] = None,
+        limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+        session: Optional[ClientSession] = None,
+        partial: bool = False,
+        imdb_info: Optional[Sequence[str]] = None,
+        tmdb_append_to_response: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Initialize the batch.
+
+        Args:
+            sources: a list of the sources to load for every film
+            concurrency: the maximum number of films being loaded at any one time
+            source_limits: an optional mapping of source name to the maximum number of
+                concurrent loads for that source, eg. `{"imdb": 4}`
+            limit_per_host: the maximum number of pooled connections per host. Only
+                used when no `session` is given.
+            session: an optional instance of `aiohttp.ClientSession` to share between
+                all films. If a session is passed here then it will remain open after
+                the batch is closed.
+            partial: whether to record the error of a source which fails to load in
+                the film's `errors` instead of raising it
+            imdb_info: the optional `cinemagoer` info sets to fetch when loading the
+                imdb data of every film, eg. `["main", "plot"]`
+            tmdb_append_to_response: optional sub-resources to fetch in the same
+                request as the TMDB movie details of every film, eg. `["credits"]`
+
+        Raises:
+            ValueError: if `concurrency` or any of the `source_limits` is less than 1
+        """
+        if concurrency < 1:
+            raise ValueError("`concurrency` must be at least 1")
+
+        source_limits = source_limits or {}
+        if any(limit < 1 for limit in source_limits.values()):
+            raise ValueError("`source_limits` must all be at least 1")
+
+        self.sources = sources
+        self.concurrency = concurrency
+        self.source_limits = source_limits
+        self.limit_per_host = limit_per_host
+        self._session = session
+        self._keep_session = session is not None
+        self.partial = partial
+        self.imdb_info = imdb_info
+        self.tmdb_append_to_response = tmdb_append_to_response
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._source_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "PhylmBatch":
+        """Open the shared session and create the concurrency limits.
+
+        Returns:
+            the instance
+        """
+        if self._session is None:
+            connector = TCPConnector(
+                limit_per_host=self.limit_per_host, ttl_dns_cache=DNS_CACHE_TTL
+            )
+            self._session = ClientSession(connector=connector)
+
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._source_semaphores = {
+            source: asyncio.Semaphore(limit)
+            for source, limit in self.source_limits.items()
+        }
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close the shared session if it was created by the batch."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the shared session if it was created by the batch."""
+        if self._session is not None and not self._keep_session:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> ClientSession:
+        """Return the shared session.
+
+        Returns:
+            the shared `aiohttp.ClientSession`
+
+        Raises:
+            RuntimeError: if the batch has not been opened
+        """
+        if self._session is None:
+            raise RuntimeError(NOT_OPEN_MESSAGE)
+
+        return self._session
+
+    async def load(self, film: Union[str, Phylm]) -> Phylm:
+        """Asynchronously load all the batch sources for a single film.
+
+        Args:
+            film: a title or a `Phylm` instance
+
+        Returns:
+            the loaded `Phylm` instance
+
+        Raises:
+            RuntimeError: if the batch has not been opened
+        """
+        if self._semaphore is None:
+            raise RuntimeError(NOT_OPEN_MESSAGE)
+
+        phylm = _to_phylm(film)
+        session = self.session
+
+        async with self._semaphore:
+            await asyncio.gather(
+                *[self._load_source(phylm, source, session) for source in self.sources]
+            )
+
+        return phylm
+
+    async def load_many(
+        self, films: Iterable[Union[str, Phylm]]
+    ) -> AsyncGenerator[Phylm, None]:
+        """Asynchronously load many films, yielding each one as it completes.
+
+        Films are taken from `films` lazily so that no more than `concurrency` films
+        are in flight at any one time. A loaded film is not referenced by the batch
+        once it has been yielded.
+
+        Args:
+            films: an iterable of titles or `Phylm` instances
+
+        Yields:
+            each loaded `Phylm` instance in order of completion
+        """
+        loads = (self.load(film) for film in films)
+
+        async for phylm in bounded_as_completed(loads, self.concurrency):
+            yield phylm
+
+    async def iter_sources(
+        self, films: Iterable[Union[str, Phylm]]
+    ) -> AsyncGenerator[Tuple[Phylm, str], None]:
+        """Asynchronously load many films, yielding each source as it completes.
+
+        Films are taken from `films` lazily so that no more than `concurrency` films
+        are in flight at any one time, and a film's sources are only started once it
+        has a slot. Note that a film may be yielded before all of its sources have
+        loaded.
+
+        Args:
+            films: an iterable of titles or `Phylm` instances
+
+        Yields:
+            a `(phylm, source)` pair for every source load in order of completion
+
+        Raises:
+            RuntimeError: if the batch has not been opened
+        """
+        if self._semaphore is None:
+            raise RuntimeError(NOT_OPEN_MESSAGE)
+
+        semaphore = self._semaphore
+        session = self.session
+        phylms = (_to_phylm(film) for film in films)
+        sources_left: Dict[Phylm, int] = {}
+        pending: Set[asyncio.Future[Tuple[Phylm, str]]] = set()
+
+        try:
+            while self.sources:
+                while not semaphore.locked():
+                    phylm = next(phylms, None)
+                    if phylm is None:
+                        break
+                    await semaphore.acquire()
+                    sources_left[phylm] = len(self.sources)
+                    pending.update(
+                        asyncio.ensure_future(self._load_pair(phylm, source, session))
+                        for source in self.sources
+                    )
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    phylm, source = task.result()
+                    sources_left[phylm] -= 1
+                    if not sources_left[phylm]:
+                        del sources_left[phylm]
+                        semaphore.release()
+                    yield phylm, source
+        finally:
+            for task in pending:
+                task.cancel()
+            for _ in sources_left:
+                semaphore.release()
+
+    async def _load_pair(
+        self, phylm: Phylm, source: str, session: ClientSession
+    ) -> Tuple[Phylm, str]:
+        await self._load_source(phylm, source, session)
+        return phylm, source
+
+    async def _load_source(
+        self, phylm: Phylm, source: str, session: ClientSession
+    ) -> None:
+        semaphore = self._source_semaphores.get(source)
+        load = functools.partial(
+            phylm.load_source,
+            source,
+            session=session,
+            imdb_info=self.imdb_info,
+            tmdb_append_to_response=self.tmdb_append_to_response,
+        )
+
+        try:
+            if semaphore is None:
+                await load()
+                return
+
+            async with semaphore:
+                await load()
+        except Exception as error:
+            if not self.partial:
+                raise
+            phylm.errors[source] = error
+
+
+async def load_many(
+    films: Iterable[Union[str, Phylm]],
+    sources: List[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    source_limits: Optional[Dict[str, int]] = None,
+    partial: bool = False,
+    imdb_info: Optional[Sequence[str]] = None,
+    tmdb_append_to_response: Optional[Sequence[str]] = None,
+) -> AsyncGenerator[Phylm, None]:
+    """Asynchronously load many films over one shared session.
+
+    Args:
+        films: an iterable of titles or `Phylm` instances
+        sources: a list of the sources to load for every film
+        concurrency: the maximum number of films being loaded at any one time
+        source_limits: an optional mapping of source name to the maximum number of
+            concurrent loads for that source
+        partial: whether to record the error of a source which fails to load in the
+            film's `errors` instead of raising it
+        imdb_info: the optional `cinemagoer` info sets to fetch when loading the imdb
+            data of every film
+        tmdb_append_to_response: optional sub-resources to fetch in the same request
+            as the TMDB movie details of every film
+
+    Yields:
+        each loaded `Phylm` instance in order of completion
+    """
+    async with PhylmBatch(
+        sources,
+        concurrency=concurrency,
+        source_limits=source_limits,
+        partial=partial,
+        imdb_info=imdb_info,
+        tmdb_append_to_response=tmdb_append_to_response,
+    ) as batch:
+        async for phylm in batch.load_many(films):
+            yield phylm
+
+
+async def iter_sources(
+    films: Iterable[Union[str, Phylm]],
+    sources: List[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    source_limits: Optional[Dict[str, int]] = None,
+    partial: bool = False,
+    imdb_info: Optional[Sequence[str]] = None,
+    tmdb_append_to_response: Optional[Sequence[str]] = None,
+) -> AsyncGenerator[Tuple[Phylm, str], None]:
+    """Asynchronously load many films, yielding each source as it completes.
+
+    Args:
+        films: an iterable of titles or `Phylm` instances
+        sources: a list of the sources to load for every film
+        concurrency: the maximum number of films being loaded at any one time
+        source_limits: an optional mapping of source name to the maximum number of
+            concurrent loads for that source
+        partial: whether to record the error of a source which fails to load in the
+            film's `errors` instead of raising it
+        imdb_info: the optional `cinemagoer` info sets to fetch when loading the imdb
+            data of every film
+        tmdb_append_to_response: optional sub-resources to fetch in the same request
+            as the TMDB movie details of every film
+
+    Yields:
+        a `(phylm, source)` pair for every source load in order of completion
+    """
+    async with PhylmBatch(
+        sources,
+        concurrency=concurrency,
+        source_limits=source_limits,
+        partial=partial,
+        imdb_info=imdb_info,
+        tmdb_append_to_response=tmdb_append_to_response,
+    ) as batch:
+        async for pair in batch.iter_sources(films):
+            yield pair
+
+
+def _to_phylm(film: Union[str, Phylm]) -> Phylm:
+    """Return a `Phylm` instance for a title or an existing instance.
+
+    Args:
+        film: a title or a `Phylm` instance
+
+    Returns:
+        Phylm: the `Phylm` instance
+    """
+    if isinstance(film, Phylm):
+        return film
+
+    return Phylm(title=film)
@@ -0,0 +1,190 @@
+"""Async client to fetch movie data from the IMDb website."""
+import html
+import json
+import re
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from aiohttp import ClientResponseError
+from aiohttp import ClientSession
+
+from phylm.utils.executors import run_parser
+from phylm.utils.web import DEFAULT_HEADERS
+from phylm.utils.web import async_get_text
+from phylm.utils.web import url_encode
+
+SOURCE_NAME = "imdb"
+IMDB_SUGGESTION_URL = "https://v3.sg.media-imdb.com/suggestion/x"
+IMDB_TITLE_URL = "https://www.imdb.com/title"
+JSON_LD_PATTERN = re.compile(
+    r'<script type="application/ld\+json">(.*?)</script>', re.DOTALL
+)
+DURATION_PATTERN = re.compile(r"PT(?:(\d+)H)?(?:(\d+)M)?")
+
+
+class ImdbClient:
+    """Class to fetch IMDb data over `aiohttp` rather than with blocking calls."""
+
+    def __init__(self, session: Optional[ClientSession] = None) -> None:
+        """Initialize the client.
+
+        Args:
+            session: an optional instance of `aiohttp.ClientSession` in which to run the
+                requests. If not given a session is opened and closed for every request.
+        """
+        self.session = session
+
+    async def search_movies(self, query: str) -> List[Dict[str, Any]]:
+        """Search for movies.
+
+        Args:
+            query: the search query
+
+        Returns:
+            List[Dict[str, Any]]: the search results, each with an `id`, `title` and
+                `year`
+        """
+        url_encoded_query = url_encode(query.lower())
+        res = await async_get_text(
+            f"{IMDB_SUGGESTION_URL}/{url_encoded_query}.json",
+            session=self.session,
+            headers=DEFAULT_HEADERS,
+            source=SOURCE_NAME,
+            raise_for_status=True,
+        )
+
+        return parse_suggestions(res)
+
+    async def get_movie(self, movie_id: str) -> Optional[Dict[str, Any]]:
+        """Return a movie by id.
+
+        Args:
+            movie_id: the IMDb id of the movie, with or without the `tt` prefix
+
+        Returns:
+            Optional[Dict[str, Any]]: the movie data in the shape of the `data` returned
+                by `Imdb.to_dict`, or `None` if the movie isn't found
+        """
+        movie_id = movie_id.lstrip("t")
+
+        try:
+            res = await async_get_text(
+                f"{IMDB_TITLE_URL}/tt{movie_id}/",
+                session=self.session,
+                headers=DEFAULT_HEADERS,
+                source=SOURCE_NAME,
+                raise_for_status=True,
+            )
+        except ClientResponseError as err:
+            if err.status == 404:
+                return None
+            raise
+
+        return await run_parser(parse_title_page, res, movie_id)
+
+
+def parse_suggestions(text: str) -> List[Dict[str, Any]]:
+    """Parse the movies from an IMDb suggestion response.
+
+    Args:
+        text: the suggestion response body
+
+    Returns:
+        List[Dict[str, Any]]: the movies, each with an `id`, `title` and `year`
+    """
+    suggestions = json.loads(text).get("d", [])
+
+    return [
+        {
+            "id": suggestion["id"].lstrip("t"),
+            "title": suggestion.get("l"),
+            "year": suggestion.get("y"),
+        }
+        for suggestion in suggestions
+        if suggestion.get("qid") == "movie"
+    ]
+
+
+def parse_title_page(text: str, movie_id: str) -> Optional[Dict[str, Any]]:
+    """Parse the movie data from the linked data of an IMDb title page.
+
+    Only the principal cast members are listed in the linked data.
+
+    Args:
+        text: the title page
+        movie_id: the IMDb id of the movie without the `tt` prefix
+
+    Returns:
+        Optional[Dict[str, Any]]: the movie data in the shape of the `data` returned
+            by `Imdb.to_dict`, or `None` if the page has no linked data
+    """
+    match = JSON_LD_PATTERN.search(text)
+
+    if not match:
+        return None
+
+    linked_data = json.loads(match.group(1))
+    date_published = linked_data.get("datePublished")
+    rating = linked_data.get("aggregateRating", {}).get("ratingValue")
+    runtime = _parse_duration(linked_data.get("duration"))
+    description = linked_data.get("description")
+    genres = linked_data.get("genre", [])
+    if isinstance(genres, str):
+        genres = [genres]
+
+    return {
+        "id": movie_id,
+        "title": _unescape(linked_data.get("name")),
+        "year": int(date_published[:4]) if date_published else None,
+        "genres": [html.unescape(genre) for genre in genres],
+        "cast": _names(linked_data.get("actor")),
+        "directors": _names(linked_data.get("director")),
+        "runtimes": [runtime] if runtime else [],
+        "rating": float(rating) if rating is not None else None,
+        "plot": [_unescape(description)] if description else [],
+    }
+
+
+def _names(people: Any) -> List[str]:
+    """Return the names of the people in a linked data field.
+
+    Args:
+        people: a linked data person or list of persons
+
+    Returns:
+        List[str]: the names
+    """
+    if not people:
+        return []
+
+    if isinstance(people, dict):
+        people = [people]
+
+    return [html.unescape(person["name"]) for person in people if person.get("name")]
+
+
+def _parse_duration(duration: Optional[str]) -> Optional[str]:
+    """Return the number of minutes in an ISO 8601 duration.
+
+    Args:
+        duration: the duration, eg. "PT2H16M"
+
+    Returns:
+        Optional[str]: the number of minutes, eg. "136"
+    """
+    if not duration:
+        return None
+
+    match = DURATION_PATTERN.fullmatch(duration)
+
+    if not match or not any(match.groups()):
+        return None
+
+    hours, minutes = (int(group or 0) for group in match.groups())
+    return str(hours * 60 + minutes)
+
+
+def _unescape(value: Optional[str]) -> Optional[str]:
+    return html.unescape(value) if value is not None else None
@@ -0,0 +1,491 @@
+"""Offline IMDb data built from the IMDb non-commercial datasets.
+
+The datasets are published at https://datasets.imdbws.com/ as gzipped TSV files. Only
+movies are kept. The store is a directory holding:
+
+- `records.jsonl`: one JSON record per movie, in the shape of the `data` returned by
+  `Imdb.to_dict`
+- `ids.idx`: fixed width `(numeric id, record offset)` entries sorted by id
+- `titles.keys` and `titles.idx`: the normalised titles and fixed width
+  `(key offset, key length, record offset)` entries sorted by normalised title
+
+The files are memory-mapped and searched with a binary search, so a store can be
+opened instantly and looked up without loading it into memory.
+"""
+import csv
+import gzip
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from types import TracebackType
+from typing import IO
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Type
+from typing import Union
+
+from phylm.utils.title_index import TitleEntry
+from phylm.utils.title_index import TitleIndex
+from phylm.utils.title_index import normalize_title
+
+TITLE_TYPES = ("movie",)
+CAST_CATEGORIES = ("actor", "actress", "self")
+DIRECTOR_CATEGORY = "director"
+NULL = "\\N"
+DATASET_FILES = ("title.basics", "title.ratings", "title.principals", "name.basics")
+
+RECORDS_FILE = "records.jsonl"
+IDS_FILE = "ids.idx"
+TITLE_KEYS_FILE = "titles.keys"
+TITLES_FILE = "titles.idx"
+META_FILE = "meta.json"
+STORE_VERSION = 1
+
+ID_ENTRY = struct.Struct("<IQ")
+TITLE_ENTRY = struct.Struct("<QHQ")
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def build_imdb_dataset(dataset_dir: PathLike, store_dir: PathLike) -> "ImdbDataset":
+    """Build a store from the IMDb datasets.
+
+    The `title.basics`, `title.ratings`, `title.principals` and `name.basics` files
+    are read from `dataset_dir`, either gzipped (`.tsv.gz`) as downloaded or
+    decompressed (`.tsv`). Each file is streamed once, so only the movies and the names
+    of their cast and directors are held in memory.
+
+    Args:
+        dataset_dir: the directory holding the dataset files
+        store_dir: the directory to write the store to, created if needed
+
+    Returns:
+        ImdbDataset: the opened store
+    """
+    dataset_path = Path(dataset_dir)
+    movies = _read_basics(_dataset_file(dataset_path, "title.basics"))
+    _read_ratings(_dataset_file(dataset_path, "title.ratings"), movies)
+    people = _read_principals(_dataset_file(dataset_path, "title.principals"), movies)
+    names = _read_names(_dataset_file(dataset_path, "name.basics"), people)
+
+    store_path = Path(store_dir)
+    store_path.mkdir(parents=True, exist_ok=True)
+    _write_store(store_path, movies, names)
+
+    return ImdbDataset(store_path)
+
+
+def build_imdb_title_index(dataset_dir: PathLike, path: PathLike) -> TitleIndex:
+    """Build a title index of the movies in the IMDb datasets.
+
+    Only the `title.basics` and `title.ratings` files are read from `dataset_dir`. Each
+    movie is indexed under its title and its original title, with its number of votes
+    as its popularity.
+
+    Args:
+        dataset_dir: the directory holding the dataset files
+        path: the path to the SQLite database file of the index
+
+    Returns:
+        TitleIndex: the opened index
+    """
+    dataset_path = Path(dataset_dir)
+    movies = _read_basics(_dataset_file(dataset_path, "title.basics"))
+    _read_ratings(_dataset_file(dataset_path, "title.ratings"), movies)
+
+    return TitleIndex.build(Path(path), _title_entries(movies))
+
+
+class ImdbDataset:
+    """A read-only IMDb store built with `build_imdb_dataset`."""
+
+    def __init__(self, store_dir: PathLike) -> None:
+        """Open the store.
+
+        Args:
+            store_dir: the directory of the store
+
+        Raises:
+            ValueError: if the directory doesn't hold a store of a supported version
+        """
+        self.path = Path(store_dir)
+
+        try:
+            meta = json.loads((self.path / META_FILE).read_text())
+        except FileNotFoundError:
+            raise ValueError(f"{self.path} is not an IMDb dataset store") from None
+
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(
+                f"{self.path} holds an IMDb dataset store of an unsupported version"
+            )
+
+        self._files: List[IO[bytes]] = []
+        self._records = self._map(RECORDS_FILE)
+        self._ids = self._map(IDS_FILE)
+        self._title_keys = self._map(TITLE_KEYS_FILE)
+        self._titles = self._map(TITLES_FILE)
+
+    def __len__(self) -> int:
+        """Return the number of movies in the store."""
+        return len(self._ids) // ID_ENTRY.size
+
+    def __enter__(self) -> "ImdbDataset":
+        """Return the store to use in a `with` block.
+
+        Returns:
+            the store
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        """Close the store at the end of a `with` block."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the memory-mapped files."""
+        for mapped in (self._records, self._ids, self._title_keys, self._titles):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+        for file in self._files:
+            file.close()
+
+        self._files = []
+
+    def get_movie(self, movie_id: str) -> Optional[Dict[str, Any]]:
+        """Return a movie by id.
+
+        Args:
+            movie_id: the IMDb id of the movie, with or without the `tt` prefix
+
+        Returns:
+            Optional[Dict[str, Any]]: the movie data in the shape of the `data` returned
+                by `Imdb.to_dict`, or `None` if the movie isn't in the store
+        """
+        try:
+            target = int(movie_id.lstrip("t"))
+        except ValueError:
+            return None
+
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            numeric_id, offset = ID_ENTRY.unpack_from(self._ids, mid * ID_ENTRY.size)
+            if numeric_id < target:
+                lo = mid + 1
+            elif numeric_id > target:
+                hi = mid
+            else:
+                return self._record(offset)
+
+        return None
+
+    def search_movies(self, title: str) -> List[Dict[str, Any]]:
+        """Return the movies with a title, or original title, matching `title`.
+
+        Titles are compared once normalised with `normalize_title`. The movies are
+        ordered by their number of votes, most first.
+
+        Args:
+            title: the title to search for
+
+        Returns:
+            List[Dict[str, Any]]: the movie data of the matching movies
+        """
+        key = normalize_title(title).encode()
+
+        if not key:
+            return []
+
+        results = []
+        index = self._first_title_index(key)
+        count = len(self._titles) // TITLE_ENTRY.size
+
+        while index < count:
+            key_offset, key_length, offset = TITLE_ENTRY.unpack_from(
+                self._titles, index * TITLE_ENTRY.size
+            )
+            if self._title_keys[key_offset : key_offset + key_length] != key:
+                break
+            results.append(self._record(offset))
+            index += 1
+
+        return results
+
+    def _first_title_index(self, key: bytes) -> int:
+        """Return the index of the first title entry not less than `key`.
+
+        Args:
+            key: the encoded normalised title
+
+        Returns:
+            int: the index
+        """
+        lo, hi = 0, len(self._titles) // TITLE_ENTRY.size
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_offset, key_length, _ = TITLE_ENTRY.unpack_from(
+                self._titles, mid * TITLE_ENTRY.size
+            )
+            if self._title_keys[key_offset : key_offset + key_length] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return lo
+
+    def _record(self, offset: int) -> Dict[str, Any]:
+        end = self._records.find(b"\n", offset)
+        record: Dict[str, Any] = json.loads(self._records[offset:end])
+        return record
+
+    def _map(self, name: str) -> Union[mmap.mmap, bytes]:
+        """Memory-map a file of the store.
+
+        Args:
+            name: the file name
+
+        Returns:
+            the memory-mapped file, or empty bytes if the file is empty
+        """
+        file = (self.path / name).open("rb")
+        self._files.append(file)
+
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+_dataset: Optional[ImdbDataset] = None
+
+
+def configure_imdb_dataset(store_dir: PathLike) -> ImdbDataset:
+    """Open a store to be used by the "dataset" IMDb backend.
+
+    Any previously configured store is closed.
+
+    Args:
+        store_dir: the directory of a store built with `build_imdb_dataset`
+
+    Returns:
+        the opened store
+    """
+    global _dataset
+
+    if _dataset is not None:
+        _dataset.close()
+
+    _dataset = ImdbDataset(store_dir)
+    return _dataset
+
+
+def disable_imdb_dataset() -> None:
+    """Close the configured store."""
+    global _dataset
+
+    if _dataset is not None:
+        _dataset.close()
+
+    _dataset = None
+
+
+def get_imdb_dataset() -> Optional[ImdbDataset]:
+    """Return the configured store.
+
+    Returns:
+        the configured `ImdbDataset` or `None` if none is configured
+    """
+    return _dataset
+
+
+def _dataset_file(dataset_dir: Path, name: str) -> Path:
+    """Return the path of a dataset file, preferring the gzipped file.
+
+    Args:
+        dataset_dir: the directory holding the dataset files
+        name: the dataset name, eg. "title.basics"
+
+    Raises:
+        FileNotFoundError: if the dataset file isn't found
+
+    Returns:
+        Path: the path of the file
+    """
+    for suffix in (".tsv.gz", ".tsv"):
+        path = dataset_dir / f"{name}{suffix}"
+        if path.exists():
+            return path
+
+    raise FileNotFoundError(f"No {name}.tsv.gz or {name}.tsv in {dataset_dir}")
+
+
+def _read_rows(path: Path) -> Iterator[Dict[str, str]]:
+    """Stream the rows of a dataset file.
+
+    Args:
+        path: the path of the file
+
+    Yields:
+        each row keyed by column name
+    """
+    if path.suffix == ".gz":
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as file:
+            yield from csv.DictReader(file, delimiter="\t", quoting=csv.QUOTE_NONE)
+    else:
+        with path.open(encoding="utf-8", newline="") as file:
+            yield from csv.DictReader(file, delimiter="\t", quoting=csv.QUOTE_NONE)
+
+
+def _value(value: Optional[str]) -> Optional[str]:
+    return None if value in (None, NULL, "") else value
+
+
+def _read_basics(path: Path) -> Dict[str, Dict[str, Any]]:
+    movies: Dict[str, Dict[str, Any]] = {}
+
+    for row in _read_rows(path):
+        if row["titleType"] not in TITLE_TYPES:
+            continue
+
+        year = _value(row["startYear"])
+        runtime = _value(row["runtimeMinutes"])
+        genres = _value(row["genres"])
+        original_title = _value(row["originalTitle"])
+
+        movies[row["tconst"]] = {
+            "id": row["tconst"][2:],
+            "title": row["primaryTitle"],
+            "original_title": original_title,
+            "year": int(year) if year else None,
+            "genres": genres.split(",") if genres else [],
+            "cast": [],
+            "directors": [],
+            "runtimes": [runtime] if runtime else [],
+            "rating": None,
+            "votes": 0,
+        }
+
+    return movies
+
+
+def _read_ratings(path: Path, movies: Dict[str, Dict[str, Any]]) -> None:
+    for row in _read_rows(path):
+        movie = movies.get(row["tconst"])
+        if movie is not None:
+            movie["rating"] = float(row["averageRating"])
+            movie["votes"] = int(row["numVotes"])
+
+
+def _read_principals(path: Path, movies: Dict[str, Dict[str, Any]]) -> Dict[str, None]:
+    """Add the cast and directors of the movies, as name ids for now.
+
+    Args:
+        path: the path of the `title.principals` file
+        movies: the movies keyed by tconst
+
+    Returns:
+        Dict[str, None]: the name ids of the people, to be resolved to names
+    """
+    people: Dict[str, None] = {}
+    movie_credits: Dict[str, List[Tuple[int, str, str]]] = {}
+
+    for row in _read_rows(path):
+        category = row["category"]
+        if row["tconst"] not in movies or (
+            category not in CAST_CATEGORIES and category != DIRECTOR_CATEGORY
+        ):
+            continue
+
+        movie_credits.setdefault(row["tconst"], []).append(
+            (int(row["ordering"]), category, row["nconst"])
+        )
+        people[row["nconst"]] = None
+
+    for tconst, credited in movie_credits.items():
+        for _, category, nconst in sorted(credited):
+            field = "directors" if category == DIRECTOR_CATEGORY else "cast"
+            movies[tconst][field].append(nconst)
+
+    return people
+
+
+def _read_names(path: Path, people: Dict[str, None]) -> Dict[str, str]:
+    return {
+        row["nconst"]: row["primaryName"]
+        for row in _read_rows(path)
+        if row["nconst"] in people
+    }
+
+
+def _title_entries(movies: Dict[str, Dict[str, Any]]) -> Iterator[TitleEntry]:
+    for movie in movies.values():
+        titles = [movie["title"]]
+        if movie["original_title"] and movie["original_title"] != movie["title"]:
+            titles.append(movie["original_title"])
+        for title in titles:
+            yield TitleEntry(movie["id"], title, movie["year"], movie["votes"])
+
+
+def _write_store(
+    store_path: Path, movies: Dict[str, Dict[str, Any]], names: Dict[str, str]
+) -> None:
+    """Write the records and indexes of the movies.
+
+    Args:
+        store_path: the directory of the store
+        movies: the movies keyed by tconst
+        names: the names of the people keyed by name id
+    """
+    ids: List[Tuple[int, int]] = []
+    titles: List[Tuple[bytes, int, int]] = []
+
+    with (store_path / RECORDS_FILE).open("wb") as records:
+        for movie in movies.values():
+            record = {
+                "id": movie["id"],
+                "title": movie["title"],
+                "year": movie["year"],
+                "genres": movie["genres"],
+                "cast": [names[n] for n in movie["cast"] if n in names],
+                "directors": [names[n] for n in movie["directors"] if n in names],
+                "runtimes": movie["runtimes"],
+                "rating": movie["rating"],
+            }
+            offset = records.tell()
+            records.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+
+            ids.append((int(movie["id"]), offset))
+            keys = {normalize_title(movie["title"])}
+            if movie["original_title"]:
+                keys.add(normalize_title(movie["original_title"]))
+            titles.extend(
+                (key.encode(), -movie["votes"], offset) for key in keys if key
+            )
+
+    with (store_path / IDS_FILE).open("wb") as ids_file:
+        for numeric_id, offset in sorted(ids):
+            ids_file.write(ID_ENTRY.pack(numeric_id, offset))
+
+    with (store_path / TITLE_KEYS_FILE).open("wb") as keys_file, (
+        store_path / TITLES_FILE
+    ).open("wb") as titles_file:
+        for key, _, offset in sorted(titles):
+            titles_file.write(TITLE_ENTRY.pack(keys_file.tell(), len(key), offset))
+            keys_file.write(key)
+
+    meta = {"version": STORE_VERSION, "movies": len(ids), "titles": len(titles)}
+    (store_path / META_FILE).write_text(json.dumps(meta))
@@ -1,16 +1,36 @@
 """Client to interact with The Movie DB (TMDB)."""
 import asyncio
+import json
 import os
+import warnings
+from types import TracebackType
 from typing import Any
+from typing import AsyncIterator
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Tuple
+from typing import Type
 from typing import Union
 
+from aiohttp import ClientResponseError
 from aiohttp import ClientSession
+from aiohttp import TCPConnector
 from requests import Session
+from requests.adapters import HTTPAdapter
 
 from phylm.errors import NoTMDbApiKeyError
+from phylm.utils.aio import bounded_as_completed
+from phylm.utils.web import async_get_text
+from phylm.utils.web import get_text
+
+SOURCE_NAME = "tmdb"
+TMDB_BASE_URL = "https://api.themoviedb.org/3"
+DEFAULT_CONCURRENCY = 10
+DEFAULT_POOL_SIZE = 20
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
 
 
 def _has_running_event_loop() -> bool:
@@ -22,24 +42,148 @@ def _has_running_event_loop() -> bool:
         return False
 
 
+def _make_async_session(pool_size: int = DEFAULT_POOL_SIZE) -> ClientSession:
+    """Return an `aiohttp.ClientSession` tuned for many requests to the TMDB API.
+
+    Args:
+        pool_size: the maximum number of pooled connections
+
+    Returns:
+        the session
+    """
+    connector = TCPConnector(
+        limit=pool_size,
+        limit_per_host=pool_size,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    return ClientSession(connector=connector)
+
+
 class TmdbClient:
-    """Class to abstract to the Tmdb API."""
+    """Class to abstract to the Tmdb API.
+
+    The client can be used as a context manager, with `async with` or `with`, to close
+    the sessions it opened when done.
+    """
 
     def __init__(
-        self, api_key: str, async_session: Optional[ClientSession] = None
+        self,
+        api_key: str,
+        async_session: Optional[ClientSession] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
     ) -> None:
         """Initialize the client.
 
         Args:
             api_key: an api_key for authentication
-            async_session: an optional instance of `aiohttp.ClientSession`
+            async_session: an optional instance of `aiohttp.ClientSession`. If not
+                given and there's a running event loop then a session is opened, which
+                is closed along with the client.
+            pool_size: the maximum number of pooled connections of the sessions opened
+                by the client
         """
-        self.session = Session()
         self.async_session: Optional[ClientSession] = async_session
+        self._owns_async_session = False
         if _has_running_event_loop() and not self.async_session:
-            self.async_session = ClientSession()
+            self.async_session = _make_async_session(pool_size)
+            self._owns_async_session = True
         self.api_key = api_key
-        self._base_url = "https://api.themoviedb.org/3"
+        self.pool_size = pool_size
+        self._session: Optional[Session] = None
+        self._base_url = TMDB_BASE_URL
+
+    def __enter__(self) -> "TmdbClient":
+        """Return the client to use in a `with` block.
+
+        Returns:
+            the client
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        """Close the blocking session at the end of a `with` block."""
+        self.close()
+
+    async def __aenter__(self) -> "TmdbClient":
+        """Return the client to use in an `async with` block.
+
+        A session is opened if the client doesn't have one yet.
+
+        Returns:
+            the client
+        """
+        if not self.async_session:
+            self.async_session = _make_async_session(self.pool_size)
+            self._owns_async_session = True
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        """Close the sessions at the end of an `async with` block."""
+        await self.aclose()
+
+    @property
+    def session(self) -> Session:
+        """Return the `requests.Session` for blocking requests, opening it if needed.
+
+        Returns:
+            the session, which keeps up to `pool_size` connections alive
+        """
+        if self._session is None:
+            self._session = Session()
+            adapter = HTTPAdapter(pool_maxsize=self.pool_size)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+        return self._session
+
+    def close(self) -> None:
+        """Close the blocking session, if it was opened."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    async def aclose(self) -> None:
+        """Close the blocking session and the async session opened by the client.
+
+        A session passed to the client is left open.
+        """
+        self.close()
+
+        if self._owns_async_session and self.async_session:
+            await self.async_session.close()
+            self.async_session = None
+            self._owns_async_session = False
+
+    def discard(self) -> None:
+        """Close the client once the event loop of its async session has closed.
+
+        The async session opened by the client can no longer be awaited, so its
+        connector is closed directly, which is all `ClientSession.close` does.
+        """
+        self.close()
+
+        if self._owns_async_session and self.async_session:
+            connector = self.async_session.connector
+            self.async_session.detach()
+            if connector is not None:
+                with warnings.catch_warnings():
+                    # the returned awaitable only warns that it wasn't awaited
+                    warnings.simplefilter("ignore", DeprecationWarning)
+                    connector.close()
+            self.async_session = None
+            self._owns_async_session = False
 
     def search_movies(
         self, query: str, region: Optional[str] = None
@@ -60,11 +204,15 @@ class TmdbClient:
             "include_adult": "false",
             "region": region,
         }
-        res = self.session.get(f"{self._base_url}/search/movie", params=payload)
-
-        res.raise_for_status()
+        res = get_text(
+            f"{self._base_url}/search/movie",
+            session=self.session,
+            params=payload,
+            source=SOURCE_NAME,
+            raise_for_status=True,
+        )
 
-        results: List[Dict[str, Any]] = res.json()["results"]
+        results: List[Dict[str, Any]] = json.loads(res)["results"]
         return results
 
     async def search_movies_async(
@@ -100,19 +248,27 @@ class TmdbClient:
         if year:
             params["year"] = year
 
-        async with self.async_session.get(
-            f"{self._base_url}/search/movie", params=params
-        ) as resp:
-            results = await resp.json()
+        res = await async_get_text(
+            f"{self._base_url}/search/movie",
+            session=self.async_session,
+            params=params,
+            source=SOURCE_NAME,
+        )
+        results = json.loads(res)
 
         movies: List[Dict[str, Any]] = results["results"]
         return movies
 
-    async def get_movie(self, movie_id: str) -> Dict[str, Any]:
+    async def get_movie(
+        self, movie_id: str, append_to_response: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
         """Return a movie by id.
 
         Args:
             movie_id: the tmdb id of the movie
+            append_to_response: optional sub-resources of the movie to fetch in the
+                same request, eg. `["credits", "watch/providers"]`. Each is added to
+                the movie data under its own name.
 
         Returns:
             Dict[str, Any]: a dictionary of the movie data
@@ -128,11 +284,17 @@ class TmdbClient:
             "language": "en-US",
         }
 
-        async with self.async_session.get(
-            f"{self._base_url}/movie/{movie_id}", params=params
-        ) as resp:
-            movie: Dict[str, Any] = await resp.json()
+        if append_to_response:
+            params["append_to_response"] = ",".join(append_to_response)
 
+        res = await async_get_text(
+            f"{self._base_url}/movie/{movie_id}",
+            session=self.async_session,
+            params=params,
+            source=SOURCE_NAME,
+        )
+
+        movie: Dict[str, Any] = json.loads(res)
         return movie
 
     def get_streaming_providers(
@@ -149,16 +311,89 @@ class TmdbClient:
         """
         payload = {"api_key": self.api_key}
 
-        res = self.session.get(
-            f"{self._base_url}/movie/{movie_id}/watch/providers", params=payload
+        res = get_text(
+            f"{self._base_url}/movie/{movie_id}/watch/providers",
+            session=self.session,
+            params=payload,
+            source=SOURCE_NAME,
+            raise_for_status=True,
         )
 
-        res.raise_for_status()
+        results: Dict[str, Any] = json.loads(res)["results"]
+
+        return {key: results.get(key.upper(), {}) for key in regions}
+
+    async def get_streaming_providers_async(
+        self, movie_id: str, regions: List[str]
+    ) -> Dict[str, Any]:
+        """Return a list of streaming providers for a given movie async.
+
+        Args:
+            movie_id: the tmdb id of the movie
+            regions: a list of regions to trim down the return list
+
+        Returns:
+            Dict[str, Any]: a dictionary of streaming providers, keyed by region name
 
-        results: Dict[str, Any] = res.json()["results"]
+        Raises:
+            RuntimeError: when no `async_session` has been set
+        """
+        if not self.async_session:
+            raise RuntimeError("No `async_session` available.")
+
+        res = await async_get_text(
+            f"{self._base_url}/movie/{movie_id}/watch/providers",
+            session=self.async_session,
+            params={"api_key": self.api_key},
+            source=SOURCE_NAME,
+            raise_for_status=True,
+        )
+
+        results: Dict[str, Any] = json.loads(res)["results"]
 
         return {key: results.get(key.upper(), {}) for key in regions}
 
+    async def iter_streaming_providers(
+        self,
+        movie_ids: Iterable[str],
+        regions: List[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Return the streaming providers for many movies as they're fetched.
+
+        Movie ids are taken from `movie_ids` lazily so that no more than `concurrency`
+        requests are in flight at any one time, all through the `async_session`.
+
+        Args:
+            movie_ids: an iterable of tmdb movie ids
+            regions: a list of regions to trim down the return lists
+            concurrency: the maximum number of requests in flight at any one time
+
+        Yields:
+            a `(movie_id, providers)` pair for each movie in order of completion, where
+            `providers` is keyed by region name. Movies which aren't found have no
+            providers.
+        """
+        requests = (
+            self._get_streaming_providers_pair(movie_id, regions)
+            for movie_id in movie_ids
+        )
+
+        async for pair in bounded_as_completed(requests, concurrency):
+            yield pair
+
+    async def _get_streaming_providers_pair(
+        self, movie_id: str, regions: List[str]
+    ) -> Tuple[str, Dict[str, Any]]:
+        try:
+            providers = await self.get_streaming_providers_async(movie_id, regions)
+        except ClientResponseError as err:
+            if err.status != 404:
+                raise
+            providers = {key: {} for key in regions}
+
+        return movie_id, providers
+
 
 def initialize_tmdb_client(
     api_key: Optional[str] = None,
@@ -176,9 +411,163 @@ def initialize_tmdb_client(
     Returns:
         TmdbClient: an authorized Tmdb client
     """
+    tmdb_api_key = _resolve_api_key(api_key)
+
+    return TmdbClient(api_key=tmdb_api_key, async_session=async_session)
+
+
+class TmdbClientRegistry:
+    """Share a long-lived `TmdbClient` per api key.
+
+    Clients opened inside an event loop have an async session, which can only be used in
+    that loop, so they are kept per event loop until the loop is closed. The registry
+    can be used with `async with` to close all its clients when done.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE) -> None:
+        """Initialize the registry.
+
+        Args:
+            pool_size: the maximum number of pooled connections of each client
+        """
+        self.pool_size = pool_size
+        self._clients: Dict[str, TmdbClient] = {}
+        self._loop_clients: Dict[asyncio.AbstractEventLoop, Dict[str, TmdbClient]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of clients in the registry."""
+        self._discard_closed_loops()
+        return len(self._clients) + sum(len(c) for c in self._loop_clients.values())
+
+    async def __aenter__(self) -> "TmdbClientRegistry":
+        """Return the registry to use in an `async with` block.
+
+        Returns:
+            the registry
+        """
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        """Close all the clients at the end of an `async with` block."""
+        await self.aclose()
+
+    def get(self, api_key: Optional[str] = None) -> TmdbClient:
+        """Return the client for an api key, opening it if needed.
+
+        Args:
+            api_key: an optional api_key to take precedence over an env var key
+
+        Raises:
+            NoTMDbApiKeyError: when no api_key has been provided
+
+        Returns:
+            TmdbClient: an authorized Tmdb client
+        """
+        tmdb_api_key = _resolve_api_key(api_key)
+
+        try:
+            loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        self._discard_closed_loops()
+        clients = (
+            self._clients if loop is None else self._loop_clients.setdefault(loop, {})
+        )
+        client = clients.get(tmdb_api_key)
+
+        if client is None or (loop is not None and not client.async_session):
+            client = TmdbClient(api_key=tmdb_api_key, pool_size=self.pool_size)
+            clients[tmdb_api_key] = client
+
+        return client
+
+    async def aclose(self) -> None:
+        """Close all the clients.
+
+        The async sessions of clients opened in another event loop which is still
+        running can't be closed and are discarded.
+        """
+        try:
+            loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        for client in self._clients.values():
+            client.close()
+
+        for client_loop, clients in list(self._loop_clients.items()):
+            for client in clients.values():
+                if client_loop is loop:
+                    await client.aclose()
+                elif client_loop.is_closed():
+                    client.discard()
+                else:
+                    client.close()
+
+        self._clients.clear()
+        self._loop_clients.clear()
+
+    def _discard_closed_loops(self) -> None:
+        """Discard the clients of event loops which have been closed.
+
+        Their async sessions reference the loop, so the clients are kept until the loop
+        is seen to be closed rather than until it's garbage collected, which they would
+        prevent. The sessions are closed as they're discarded.
+        """
+        for loop in [loop for loop in self._loop_clients if loop.is_closed()]:
+            for client in self._loop_clients.pop(loop).values():
+                client.discard()
+
+
+_registry = TmdbClientRegistry()
+
+
+def get_tmdb_client(api_key: Optional[str] = None) -> TmdbClient:
+    """Return the shared `TmdbClient` for an api key.
+
+    Unlike `initialize_tmdb_client`, the client is reused by every call with the same
+    api key (in the same event loop), so its connections are kept alive between
+    requests.
+
+    A client returned inside an event loop opens an async session which should be
+    closed with `close_tmdb_clients` before the loop ends. Otherwise it's only closed
+    when the registry is next used after the loop has closed.
+
+    Args:
+        api_key: an optional api_key to take precedence over an env var key
+
+    Returns:
+        TmdbClient: an authorized Tmdb client
+    """
+    return _registry.get(api_key)
+
+
+async def close_tmdb_clients() -> None:
+    """Close all the shared clients returned by `get_tmdb_client`."""
+    await _registry.aclose()
+
+
+def _resolve_api_key(api_key: Optional[str] = None) -> str:
+    """Return the api key, falling back to the `TMDB_API_KEY` env var.
+
+    Args:
+        api_key: an optional api_key to take precedence over an env var key
+
+    Raises:
+        NoTMDbApiKeyError: when no api_key has been provided
+
+    Returns:
+        str: the api key
+    """
     tmdb_api_key = api_key or os.environ.get("TMDB_API_KEY")
 
     if not tmdb_api_key:
         raise NoTMDbApiKeyError("An `api_key` must be provided to use this service")
 
-    return TmdbClient(api_key=tmdb_api_key, async_session=async_session)
+    return tmdb_api_key
@@ -9,5 +9,9 @@ class SourceNotLoadedError(Exception):
     """Raised when data from an unloaded source is retreived."""
 
 
+class SourceTimeoutError(Exception):
+    """Raised when a source doesn't load before its deadline."""
+
+
 class NoTMDbApiKeyError(Exception):
     """Raised when requests are made to TMDb but no api_key has be provided."""
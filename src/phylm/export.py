@@ -0,0 +1,368 @@
+"""Module to contain the export of loaded films to Arrow record batches.
+
+Films are added to an `ArrowExporter` one at a time, eg. as they are yielded by
+`load_many`, and are buffered column by column. Every `batch_size` films the buffered
+columns are turned into an Arrow record batch, which is also written to a Parquet file
+if a path is given, so a catalogue of any size is exported in constant memory.
+
+Each source contributes its own typed columns, prefixed with the name of the source,
+eg. `imdb_rating` is a `float64` column and `imdb_genres` a list of strings. Scores
+which the sources return as strings, eg. the Metacritic rating, are exported as
+integers, with anything which isn't a number, eg. "tbd", exported as null.
+
+`pyarrow` is an optional dependency, installed with the `arrow` extra.
+"""
+import datetime
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Type
+from typing import Union
+
+from phylm.batch import DEFAULT_CONCURRENCY
+from phylm.batch import load_many
+from phylm.errors import SourceNotLoadedError
+from phylm.errors import UnrecognizedSourceError
+from phylm.phylm import SOURCES
+from phylm.phylm import Phylm
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    HAS_PYARROW = True
+except ImportError:  # pragma: no cover
+    HAS_PYARROW = False
+
+DEFAULT_BATCH_SIZE = 1_000
+DEFAULT_LIST_LIMIT = 20
+
+PathLike = Union[str, Path]
+
+
+class Column(NamedTuple):
+    """A column of the export."""
+
+    name: str
+    type: str
+    """The Arrow type, one of "string", "int32", "float64", "bool", "date" or "list"."""
+    getter: Callable[[Any, int], Any]
+    """Return the value of the column from a loaded source and the list limit."""
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_date(value: Optional[str]) -> Optional[datetime.date]:
+    try:
+        return datetime.date.fromisoformat(value or "")
+    except ValueError:
+        return None
+
+
+def _common_columns(source: str) -> List[Column]:
+    return [
+        Column(f"{source}_low_confidence", "bool", lambda s, _: s.low_confidence),
+        Column(f"{source}_match_score", "float64", lambda s, _: s.match_score),
+    ]
+
+
+SOURCE_COLUMNS: Dict[str, List[Column]] = {
+    "imdb": [
+        Column("imdb_movie_id", "string", lambda s, _: s.id),
+        Column("imdb_title", "string", lambda s, _: s.title),
+        Column("imdb_year", "int32", lambda s, _: s.year),
+        Column("imdb_rating", "float64", lambda s, _: s.rating),
+        Column("imdb_runtime", "int32", lambda s, _: _to_int(s.runtime)),
+        Column("imdb_genres", "list", lambda s, limit: s.genres(limit)),
+        Column("imdb_cast", "list", lambda s, limit: s.cast(limit)),
+        Column("imdb_directors", "list", lambda s, limit: s.directors(limit)),
+        *_common_columns("imdb"),
+    ],
+    "mtc": [
+        Column("mtc_title", "string", lambda s, _: s.title),
+        Column("mtc_year", "int32", lambda s, _: s.year),
+        Column("mtc_rating", "int32", lambda s, _: _to_int(s.rating)),
+        *_common_columns("mtc"),
+    ],
+    "rt": [
+        Column("rt_title", "string", lambda s, _: s.title),
+        Column("rt_year", "int32", lambda s, _: _to_int(s.year)),
+        Column("rt_tomato_score", "int32", lambda s, _: _to_int(s.tomato_score)),
+        *_common_columns("rt"),
+    ],
+    "tmdb": [
+        Column("tmdb_movie_id", "string", lambda s, _: s.id),
+        Column("tmdb_title", "string", lambda s, _: s.title),
+        Column("tmdb_year", "int32", lambda s, _: s.year),
+        Column("tmdb_release_date", "date", lambda s, _: _to_date(s.release_date)),
+        Column("tmdb_rating", "float64", lambda s, _: s.rating),
+        Column("tmdb_runtime", "int32", lambda s, _: s.runtime),
+        Column("tmdb_genres", "list", lambda s, limit: s.genres(limit)),
+        Column("tmdb_cast", "list", lambda s, limit: s.cast(limit)),
+        Column("tmdb_directors", "list", lambda s, limit: s.directors(limit)),
+        *_common_columns("tmdb"),
+    ],
+}
+"""The columns exported for each source, in order."""
+
+FILM_COLUMNS = [
+    Column("title", "string", lambda p, _: p.title),
+    Column("year", "int32", lambda p, _: p.year),
+    Column("imdb_id", "string", lambda p, _: p.imdb_id),
+    Column("tmdb_id", "string", lambda p, _: p.tmdb_id),
+]
+"""The columns of the search terms of each film, which come first."""
+
+
+def _arrow_type(name: str) -> "pa.DataType":
+    return {
+        "string": pa.string(),
+        "int32": pa.int32(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "date": pa.date32(),
+        "list": pa.list_(pa.string()),
+    }[name]
+
+
+def export_schema(sources: Sequence[str]) -> "pa.Schema":
+    """Return the Arrow schema of the export of some sources.
+
+    The columns of the search terms of each film come first, followed by the columns
+    of each source in the given order and finally an `<source>_error` column for each
+    source, which holds the error of a source which failed to load with `partial=True`.
+
+    Args:
+        sources: the sources to export
+
+    Raises:
+        UnrecognizedSourceError: if a source is not recognised
+        ImportError: if `pyarrow` is not installed
+
+    Returns:
+        the schema
+    """
+    if not HAS_PYARROW:
+        raise ImportError(
+            "pyarrow must be installed to export to Arrow: pip install phylm[arrow]"
+        )
+
+    for source in sources:
+        if source not in SOURCES:
+            raise UnrecognizedSourceError(f"{source} is not a recognized source")
+
+    return pa.schema(
+        [
+            pa.field(column.name, _arrow_type(column.type))
+            for column in _columns(sources)
+        ]
+        + [pa.field(f"{source}_error", pa.string()) for source in sources]
+    )
+
+
+class ArrowExporter:
+    """Export loaded films to Arrow record batches, and optionally a Parquet file."""
+
+    def __init__(
+        self,
+        sources: Sequence[str],
+        path: Optional[PathLike] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        list_limit: int = DEFAULT_LIST_LIMIT,
+    ) -> None:
+        """Initialize the exporter.
+
+        Args:
+            sources: the sources to export, normally those loaded for every film. The
+                columns of a source which isn't loaded for a film are null.
+            path: an optional path of a Parquet file to write the batches to, which is
+                replaced if it exists
+            batch_size: the number of films in each record batch
+            list_limit: the maximum number of genres, cast members and directors
+                exported for each film
+
+        Raises:
+            ValueError: if `batch_size` is less than 1
+        """
+        if batch_size < 1:
+            raise ValueError("`batch_size` must be at least 1")
+
+        self.sources = list(sources)
+        self.schema = export_schema(self.sources)
+        self.path = Path(path) if path is not None else None
+        self.batch_size = batch_size
+        self.list_limit = list_limit
+        self.rows = 0
+        self._buffers: List[List[Any]] = [[] for _ in self.schema]
+        self._writer: Optional[pq.ParquetWriter] = None
+
+    def __enter__(self) -> "ArrowExporter":
+        """Return the exporter to use in a `with` block.
+
+        Returns:
+            the exporter
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        """Write any buffered films and close the Parquet file."""
+        self.close()
+
+    def add(self, phylm: Phylm) -> Optional["pa.RecordBatch"]:
+        """Add a loaded film to the export.
+
+        Args:
+            phylm: the loaded film
+
+        Returns:
+            the completed record batch if the film filled it, otherwise `None`
+        """
+        for buffer, value in zip(self._buffers, self._row(phylm)):
+            buffer.append(value)
+
+        if len(self._buffers[0]) >= self.batch_size:
+            return self.flush()
+
+        return None
+
+    def flush(self) -> Optional["pa.RecordBatch"]:
+        """Turn the buffered films into a record batch.
+
+        Returns:
+            the record batch, or `None` if there are no buffered films
+        """
+        if not self._buffers[0]:
+            return None
+
+        batch = pa.RecordBatch.from_arrays(
+            [
+                pa.array(buffer, type=field.type)
+                for buffer, field in zip(self._buffers, self.schema)
+            ],
+            schema=self.schema,
+        )
+        self._buffers = [[] for _ in self.schema]
+        self.rows += batch.num_rows
+
+        if self.path is not None:
+            self._open_writer().write_batch(batch)
+
+        return batch
+
+    def close(self) -> None:
+        """Write any buffered films and close the Parquet file."""
+        self.flush()
+
+        if self.path is not None:
+            # the file is written with the schema even if no films were exported
+            self._open_writer().close()
+            self._writer = None
+
+    def _open_writer(self) -> "pq.ParquetWriter":
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self.schema)
+
+        return self._writer
+
+    def _row(self, phylm: Phylm) -> List[Any]:
+        """Return the values of each column for a film.
+
+        Args:
+            phylm: the loaded film
+
+        Returns:
+            List[Any]: the values, in the order of the schema
+        """
+        loaded: Dict[str, Any] = {}
+        for source in self.sources:
+            try:
+                loaded[source] = getattr(phylm, source)
+            except SourceNotLoadedError:
+                continue
+
+        values = [column.getter(phylm, self.list_limit) for column in FILM_COLUMNS]
+        for source in self.sources:
+            source_obj = loaded.get(source)
+            values += [
+                None
+                if source_obj is None
+                else column.getter(source_obj, self.list_limit)
+                for column in SOURCE_COLUMNS[source]
+            ]
+
+        errors = [phylm.errors.get(source) for source in self.sources]
+        return values + [
+            None if error is None else f"{type(error).__name__}: {error}"
+            for error in errors
+        ]
+
+
+async def export_many(
+    films: Iterable[Union[str, Phylm]],
+    sources: List[str],
+    path: Optional[PathLike] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    partial: bool = False,
+    imdb_info: Optional[Sequence[str]] = None,
+    tmdb_append_to_response: Optional[Sequence[str]] = None,
+) -> AsyncIterator["pa.RecordBatch"]:
+    """Load many films and export them as they complete.
+
+    Args:
+        films: an iterable of titles or `Phylm` instances
+        sources: a list of the sources to load and export for every film
+        path: an optional path of a Parquet file to write the batches to
+        concurrency: the maximum number of films being loaded at any one time
+        batch_size: the number of films in each record batch
+        partial: whether to export the error of a source which fails to load instead
+            of raising it
+        imdb_info: the optional `cinemagoer` info sets to fetch when loading the imdb
+            data of every film
+        tmdb_append_to_response: optional sub-resources to fetch in the same request
+            as the TMDB movie details of every film, eg. `["credits"]` to fill the
+            `tmdb_cast` and `tmdb_directors` columns
+
+    Yields:
+        each record batch once it's complete, the last of which may be smaller
+    """
+    with ArrowExporter(sources, path=path, batch_size=batch_size) as exporter:
+        async for phylm in load_many(
+            films,
+            sources,
+            concurrency=concurrency,
+            partial=partial,
+            imdb_info=imdb_info,
+            tmdb_append_to_response=tmdb_append_to_response,
+        ):
+            batch = exporter.add(phylm)
+            if batch is not None:
+                yield batch
+
+        batch = exporter.flush()
+        if batch is not None:
+            yield batch
+
+
+def _columns(sources: Sequence[str]) -> List[Column]:
+    return FILM_COLUMNS + [
+        column for source in sources for column in SOURCE_COLUMNS[source]
+    ]
@@ -0,0 +1,508 @@
+"""Module to contain a local stand-in for the sites and APIs of the sources.
+
+`MockServer` is an `aiohttp` server which replays recorded responses, eg. the bodies of
+VCR cassettes, for the search and detail endpoints used by the sources, so that phylm
+can be load tested at thousands of requests a second without touching the real sites.
+Every response can be delayed by a latency drawn from a distribution, and a proportion
+of the requests can fail with a 500 or be throttled with a 429, overall or per source.
+
+Each source is served under its own prefix, eg. `/mtc/search/movie/...`, and
+`point_sources_at` points the base urls of the sources at a server:
+
+```python
+async with MockServer(cassettes, Behaviour(latency=lognormal_latency(0.2))) as server:
+    with point_sources_at(server.url):
+        await Phylm("The Matrix").load_sources(["imdb", "mtc", "rt", "tmdb"])
+```
+
+Reading cassettes requires `pyyaml`, responses can also be added with `add_response`.
+"""
+import asyncio
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from types import TracebackType
+from typing import Callable
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Mapping
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from typing import Type
+from typing import Union
+
+from aiohttp import web
+from yarl import URL
+
+from phylm.clients import imdb as imdb_client
+from phylm.clients import tmdb as tmdb_client
+from phylm.sources import mtc
+from phylm.sources import rt
+from phylm.sources.imdb import ia
+
+try:
+    import yaml
+
+    HAS_YAML = True
+except ImportError:  # pragma: no cover
+    HAS_YAML = False
+
+SOURCE_HOSTS = {
+    "www.imdb.com": "imdb",
+    "v3.sg.media-imdb.com": "imdb",
+    "www.metacritic.com": "mtc",
+    "www.rottentomatoes.com": "rt",
+    "api.themoviedb.org": "tmdb",
+}
+"""The source served for the recorded responses of each host."""
+
+ENDPOINTS = {
+    "imdb": {
+        "search": re.compile(r"^/find/?$"),
+        "movie": re.compile(r"^/title/tt\d+/reference/?$"),
+        "plot": re.compile(r"^/title/tt\d+/plotsummary/?$"),
+        # the endpoints of the "web" backend
+        "suggestion": re.compile(r"^/suggestion/x/[^/]+\.json$"),
+        "title": re.compile(r"^/title/tt\d+/?$"),
+    },
+    "mtc": {"search": re.compile(r"^/search/movie/[^/]+/results$")},
+    "rt": {"search": re.compile(r"^/search$")},
+    "tmdb": {
+        "search": re.compile(r"^/3/search/movie$"),
+        "movie": re.compile(r"^/3/movie/\d+$"),
+        "providers": re.compile(r"^/3/movie/\d+/watch/providers$"),
+    },
+}
+"""The endpoints of each source, which unrecorded requests fall back to."""
+
+IGNORED_QUERY_PARAMS = ("api_key",)
+DEFAULT_CONTENT_TYPE = "text/html; charset=utf-8"
+
+PathLike = Union[str, Path]
+LatencyDistribution = Callable[[random.Random], float]
+"""Return a latency in seconds, drawn with the given random number generator."""
+
+
+def constant_latency(seconds: float) -> LatencyDistribution:
+    """Return a distribution which is always `seconds`.
+
+    Args:
+        seconds: the latency
+
+    Returns:
+        LatencyDistribution: the distribution
+    """
+    return lambda _: seconds
+
+
+def uniform_latency(low: float, high: float) -> LatencyDistribution:
+    """Return a distribution uniform between `low` and `high` seconds.
+
+    Args:
+        low: the minimum latency
+        high: the maximum latency
+
+    Returns:
+        LatencyDistribution: the distribution
+    """
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float, sigma: float = 0.5) -> LatencyDistribution:
+    """Return a log-normal distribution, the long tailed shape of real latencies.
+
+    Args:
+        median: the median latency in seconds
+        sigma: the standard deviation of the latency's natural logarithm. The larger
+            it is the longer the tail.
+
+    Returns:
+        LatencyDistribution: the distribution
+    """
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+class Behaviour(NamedTuple):
+    """How the server responds to requests."""
+
+    latency: Union[float, LatencyDistribution] = 0.0
+    """The seconds to delay every response by, or a distribution to draw them from."""
+    error_rate: float = 0.0
+    """The proportion of requests which fail with a 500."""
+    throttle_rate: float = 0.0
+    """The proportion of requests which are throttled with a 429."""
+    rate_limit: Optional[float] = None
+    """The number of requests a second above which requests are throttled."""
+    retry_after: int = 1
+    """The `Retry-After` of throttled responses, in seconds."""
+
+
+class RecordedResponse(NamedTuple):
+    """A response to replay."""
+
+    url: str
+    status: int
+    content_type: str
+    body: bytes
+
+
+_RouteKey = Tuple[str, str, FrozenSet[Tuple[str, str]]]
+
+
+def read_cassette(path: PathLike) -> List[RecordedResponse]:
+    """Read the responses recorded in a VCR cassette.
+
+    Both plain cassettes and those with zlib compressed bodies are read.
+
+    Args:
+        path: the path of the cassette
+
+    Raises:
+        ImportError: if `pyyaml` is not installed
+
+    Returns:
+        List[RecordedResponse]: the responses, with the urls they were recorded for
+    """
+    if not HAS_YAML:
+        raise ImportError("pyyaml must be installed to read cassettes")
+
+    with Path(path).open() as f:
+        cassette = yaml.safe_load(f)
+
+    responses = []
+    for interaction in cassette["interactions"]:
+        response = interaction["response"]
+        body = response["body"]["string"]
+        body = zlib.decompress(body) if isinstance(body, bytes) else body.encode()
+        headers = {key.lower(): value for key, value in response["headers"].items()}
+        responses.append(
+            RecordedResponse(
+                url=interaction["request"]["uri"],
+                status=response["status"]["code"],
+                content_type=(headers.get("content-type") or [DEFAULT_CONTENT_TYPE])[0],
+                body=body,
+            )
+        )
+
+    return responses
+
+
+class _RateLimit:
+    """A token bucket allowing `rate` requests a second, in bursts of up to `rate`."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+        return True
+
+
+class MockServer:
+    """Serve recorded responses for the sources from a local port.
+
+    The server can be run in the current event loop with `async with`, or in a
+    background thread with `with`, eg. to load films with `asyncio.run` while it runs.
+    """
+
+    def __init__(
+        self,
+        cassettes: Iterable[PathLike] = (),
+        behaviour: Optional[Behaviour] = None,
+        source_behaviour: Optional[Mapping[str, Behaviour]] = None,
+        fallback: bool = True,
+        seed: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """Initialize the server.
+
+        Args:
+            cassettes: the paths of VCR cassettes to replay the responses of. A request
+                recorded more than once is answered with the last response.
+            behaviour: how to respond to requests. Defaults to responding at once.
+            source_behaviour: an optional mapping of source name to how to respond to
+                the requests for that source instead, eg. `{"rt": Behaviour(...)}`
+            fallback: whether to answer an unrecorded request to a known endpoint,
+                eg. a search for another title, with the first response recorded for
+                that endpoint rather than a 404
+            seed: an optional seed for the latencies, errors and throttling
+            host: the host to listen on
+            port: the port to listen on. Defaults to a free port.
+        """
+        self.behaviour = behaviour or Behaviour()
+        self.source_behaviour = dict(source_behaviour or {})
+        self.fallback = fallback
+        self.host = host
+        self.port = port
+        self.url = ""
+        self.requests: Counter[str] = Counter()
+        """The number of requests for each source."""
+        self.statuses: Counter[int] = Counter()
+        """The number of responses with each status."""
+        self._random = random.Random(seed)  # noqa: S311
+        self._responses: Dict[_RouteKey, RecordedResponse] = {}
+        self._fallbacks: Dict[Tuple[str, str], RecordedResponse] = {}
+        self._rate_limits: Dict[str, _RateLimit] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+        for cassette in cassettes:
+            for response in read_cassette(cassette):
+                self.add_response(response)
+
+    def add_response(self, response: RecordedResponse) -> None:
+        """Add a response to replay for requests to its url.
+
+        The query parameters of the url are matched in any order and the api key of
+        TMDB is ignored.
+
+        Args:
+            response: the response
+
+        Raises:
+            ValueError: if the url isn't for the site of one of the sources
+        """
+        url = URL(response.url)
+        source = SOURCE_HOSTS.get(url.host or "")
+
+        if source is None:
+            raise ValueError(f"{url.host} is not the host of a source")
+
+        self._responses[_route_key(source, url.path, url.query.items())] = response
+
+        endpoint = _endpoint(source, url.path)
+        if endpoint is not None and response.status == 200:
+            self._fallbacks.setdefault((source, endpoint), response)
+
+    async def __aenter__(self) -> "MockServer":
+        """Start the server in the running event loop.
+
+        Returns:
+            the server
+        """
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        """Stop the server at the end of an `async with` block."""
+        await self.close()
+
+    def __enter__(self) -> "MockServer":
+        """Start the server in a background thread.
+
+        Returns:
+            the server
+        """
+        self.start_in_thread()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        """Stop the background thread at the end of a `with` block."""
+        self.stop_thread()
+
+    async def start(self) -> str:
+        """Start the server in the running event loop.
+
+        Returns:
+            str: the url of the server
+        """
+        app = web.Application()
+        app.router.add_route("GET", "/{source}/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start_in_thread(self) -> str:
+        """Start the server in a new event loop in a background thread.
+
+        Returns:
+            str: the url of the server
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        return asyncio.run_coroutine_threadsafe(self.start(), self._loop).result()
+
+    def stop_thread(self) -> None:
+        """Stop the server and its background thread."""
+        if self._loop is None or self._thread is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Respond to a request as configured.
+
+        Args:
+            request: the request
+
+        Returns:
+            web.Response: the response
+        """
+        source = request.match_info["source"]
+        path = "/" + request.match_info["path"]
+        self.requests[source] += 1
+        behaviour = self.source_behaviour.get(source, self.behaviour)
+
+        response = await self._respond(source, path, request, behaviour)
+        self.statuses[response.status] += 1
+        return response
+
+    async def _respond(
+        self, source: str, path: str, request: web.Request, behaviour: Behaviour
+    ) -> web.Response:
+        if self._throttled(source, behaviour):
+            return web.Response(
+                status=429, headers={"Retry-After": str(behaviour.retry_after)}
+            )
+
+        latency = (
+            behaviour.latency
+            if isinstance(behaviour.latency, (int, float))
+            else behaviour.latency(self._random)
+        )
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+        if self._random.random() < behaviour.error_rate:
+            return web.Response(status=500)
+
+        recorded = self._find(source, path, request.query.items())
+        if recorded is None:
+            return web.Response(status=404)
+
+        return web.Response(
+            status=recorded.status,
+            body=recorded.body,
+            headers={"Content-Type": recorded.content_type},
+        )
+
+    def _throttled(self, source: str, behaviour: Behaviour) -> bool:
+        if behaviour.rate_limit is not None:
+            rate_limit = self._rate_limits.setdefault(
+                source, _RateLimit(behaviour.rate_limit)
+            )
+            if not rate_limit.allow():
+                return True
+
+        return self._random.random() < behaviour.throttle_rate
+
+    def _find(
+        self, source: str, path: str, query: Iterable[Tuple[str, str]]
+    ) -> Optional[RecordedResponse]:
+        recorded = self._responses.get(_route_key(source, path, query))
+
+        if recorded is None and self.fallback:
+            endpoint = _endpoint(source, path)
+            if endpoint is not None:
+                recorded = self._fallbacks.get((source, endpoint))
+
+        return recorded
+
+
+def _route_key(source: str, path: str, query: Iterable[Tuple[str, str]]) -> _RouteKey:
+    return (
+        source,
+        path,
+        frozenset(
+            (key, value) for key, value in query if key not in IGNORED_QUERY_PARAMS
+        ),
+    )
+
+
+def _endpoint(source: str, path: str) -> Optional[str]:
+    for name, pattern in ENDPOINTS.get(source, {}).items():
+        if pattern.match(path):
+            return name
+
+    return None
+
+
+@contextmanager
+def point_sources_at(url: str) -> Iterator[None]:
+    """Point the base urls of all the sources at a `MockServer` within a `with` block.
+
+    Note that a shared TMDB client, see `get_tmdb_client`, which was opened before the
+    block keeps using the real api.
+
+    Args:
+        url: the url of the server
+
+    Yields:
+        nothing, the base urls are restored at the end of the block
+    """
+    url = url.rstrip("/")
+    previous = (
+        mtc.MTC_BASE_MOVIE_URL,
+        rt.RT_BASE_MOVIE_URL,
+        tmdb_client.TMDB_BASE_URL,
+        imdb_client.IMDB_SUGGESTION_URL,
+        imdb_client.IMDB_TITLE_URL,
+        dict(ia.urls),
+    )
+
+    mtc.MTC_BASE_MOVIE_URL = f"{url}/mtc/search/movie"
+    rt.RT_BASE_MOVIE_URL = f"{url}/rt/search"
+    tmdb_client.TMDB_BASE_URL = f"{url}/tmdb/3"
+    imdb_client.IMDB_SUGGESTION_URL = f"{url}/imdb/suggestion/x"
+    imdb_client.IMDB_TITLE_URL = f"{url}/imdb/title"
+    ia.set_imdb_urls(f"{url}/imdb/")
+
+    try:
+        yield
+    finally:
+        (
+            mtc.MTC_BASE_MOVIE_URL,
+            rt.RT_BASE_MOVIE_URL,
+            tmdb_client.TMDB_BASE_URL,
+            imdb_client.IMDB_SUGGESTION_URL,
+            imdb_client.IMDB_TITLE_URL,
+            ia.urls,
+        ) = previous
@@ -1,17 +1,36 @@
 """Module to contain the `Phylm` class definition."""
 import asyncio
+import functools
+import json
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
 from typing import List
+from typing import Mapping
 from typing import Optional
+from typing import Sequence
 
 from aiohttp import ClientSession
 
 from phylm.errors import SourceNotLoadedError
+from phylm.errors import SourceTimeoutError
 from phylm.errors import UnrecognizedSourceError
 from phylm.sources import Imdb
 from phylm.sources import Mtc
 from phylm.sources import Rt
 from phylm.sources import Tmdb
 
+try:
+    import msgpack
+
+    HAS_MSGPACK = True
+except ImportError:  # pragma: no cover
+    HAS_MSGPACK = False
+
+SOURCES = ("imdb", "mtc", "rt", "tmdb")
+SERIALIZATION_VERSION = 1
+
 
 class Phylm:
     """Main `Phylm` entrypoint."""
@@ -39,6 +58,7 @@ class Phylm:
         self._mtc: Optional[Mtc] = None
         self._rt: Optional[Rt] = None
         self._tmdb: Optional[Tmdb] = None
+        self.errors: Dict[str, BaseException] = {}
 
     def __repr__(self) -> str:
         """Return the string representation.
@@ -52,6 +72,134 @@ class Phylm:
         """Return the string representation."""
         return self.__repr__()
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the search terms and the data of the loaded sources as a dictionary.
+
+        The dictionary holds only plain values, so it can be serialised as JSON or
+        msgpack. The errors of sources which failed to load are not included.
+
+        Returns:
+            a dictionary which can be passed to `from_dict`
+        """
+        loaded = {
+            "imdb": self._imdb,
+            "mtc": self._mtc,
+            "rt": self._rt,
+            "tmdb": self._tmdb,
+        }
+
+        return {
+            "version": SERIALIZATION_VERSION,
+            "title": self.title,
+            "imdb_id": self.imdb_id,
+            "year": self.year,
+            "tmdb_id": self.tmdb_id,
+            "sources": {
+                source: source_obj.to_dict()
+                for source, source_obj in loaded.items()
+                if source_obj is not None
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Phylm":
+        """Create an instance with its sources loaded from the output of `to_dict`.
+
+        No requests are made, the sources are restored from the data alone. Note that
+        an IMDb plot which wasn't fetched before serialising is still fetched the
+        first time it's accessed.
+
+        Args:
+            data: a dictionary returned by `to_dict`
+
+        Raises:
+            ValueError: if the data was serialised by an unsupported version
+
+        Returns:
+            the `Phylm` instance
+        """
+        version = data.get("version")
+        if version != SERIALIZATION_VERSION:
+            raise ValueError(f"Unsupported serialization version: {version}")
+
+        phylm = cls(
+            title=data["title"],
+            imdb_id=data.get("imdb_id"),
+            year=data.get("year"),
+            tmdb_id=data.get("tmdb_id"),
+        )
+        sources = data.get("sources") or {}
+
+        if "imdb" in sources:
+            phylm._imdb = Imdb.from_dict(sources["imdb"])
+        if "mtc" in sources:
+            phylm._mtc = Mtc.from_dict(sources["mtc"])
+        if "rt" in sources:
+            phylm._rt = Rt.from_dict(sources["rt"])
+        if "tmdb" in sources:
+            phylm._tmdb = Tmdb.from_dict(sources["tmdb"])
+
+        return phylm
+
+    def to_json(self) -> str:
+        """Return the output of `to_dict` serialised as JSON.
+
+        Returns:
+            the JSON string
+        """
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, data: str) -> "Phylm":
+        """Create an instance with its sources loaded from the output of `to_json`.
+
+        Args:
+            data: a string returned by `to_json`
+
+        Returns:
+            the `Phylm` instance
+        """
+        return cls.from_dict(json.loads(data))
+
+    def to_bytes(self) -> bytes:
+        """Return the output of `to_dict` serialised as msgpack.
+
+        Raises:
+            ImportError: if `msgpack` is not installed
+
+        Returns:
+            the msgpack bytes
+        """
+        if not HAS_MSGPACK:
+            raise ImportError(
+                "msgpack must be installed to serialise to bytes: "
+                "pip install phylm[msgpack]"
+            )
+
+        packed: bytes = msgpack.packb(self.to_dict())
+        return packed
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Phylm":
+        """Create an instance with its sources loaded from the output of `to_bytes`.
+
+        Args:
+            data: the bytes returned by `to_bytes`
+
+        Raises:
+            ImportError: if `msgpack` is not installed
+
+        Returns:
+            the `Phylm` instance
+        """
+        if not HAS_MSGPACK:
+            raise ImportError(
+                "msgpack must be installed to deserialise bytes: "
+                "pip install phylm[msgpack]"
+            )
+
+        return cls.from_dict(msgpack.unpackb(data))
+
     @property
     def imdb(self) -> Imdb:
         """Return the IMDb data.
@@ -122,6 +270,8 @@ class Phylm:
         imdb_id: Optional[str] = None,
         session: Optional[ClientSession] = None,
         tmdb_id: Optional[str] = None,
+        imdb_info: Optional[Sequence[str]] = None,
+        tmdb_append_to_response: Optional[Sequence[str]] = None,
     ) -> "Phylm":
         """Asynchronously load the film data for a source.
 
@@ -133,6 +283,10 @@ class Phylm:
                 request
             tmdb_id: an optional `TMDB` id which will be used to load the TMDB data
                 instead of a basic search on the title
+            imdb_info: the optional `cinemagoer` info sets to fetch when loading the
+                imdb data, eg. `["main", "plot"]`
+            tmdb_append_to_response: optional sub-resources to fetch in the same
+                request as the TMDB movie details, eg. `["credits", "watch/providers"]`
 
         Returns:
             the instance
@@ -143,35 +297,45 @@ class Phylm:
         if source == "imdb":
             if not self._imdb:
                 movie_id = imdb_id or self.imdb_id
-                self._imdb = Imdb(
+                imdb = Imdb(
                     raw_title=self.title,
                     movie_id=movie_id,
                     raw_year=self.year,
                 )
-                await self._imdb.load_source()
+                await imdb.load_source(session=session, info=imdb_info)
+                self._imdb = imdb
+            self.errors.pop(source, None)
             return self
 
         if source == "mtc":
             if not self._mtc:
-                self._mtc = Mtc(raw_title=self.title, raw_year=self.year)
-                await self._mtc.load_source(session=session)
+                mtc = Mtc(raw_title=self.title, raw_year=self.year)
+                await mtc.load_source(session=session)
+                self._mtc = mtc
+            self.errors.pop(source, None)
             return self
 
         if source == "rt":
             if not self._rt:
-                self._rt = Rt(raw_title=self.title, raw_year=self.year)
-                await self._rt.load_source(session=session)
+                rt = Rt(raw_title=self.title, raw_year=self.year)
+                await rt.load_source(session=session)
+                self._rt = rt
+            self.errors.pop(source, None)
             return self
 
         if source == "tmdb":
             if not self._tmdb:
                 movie_id = tmdb_id or self.tmdb_id
-                self._tmdb = Tmdb(
+                tmdb = Tmdb(
                     raw_title=self.title,
                     movie_id=movie_id,
                     raw_year=self.year,
                 )
-                await self._tmdb.load_source(session=session)
+                await tmdb.load_source(
+                    session=session, append_to_response=tmdb_append_to_response
+                )
+                self._tmdb = tmdb
+            self.errors.pop(source, None)
             return self
 
         raise UnrecognizedSourceError(f"{source} is not a recognized source")
@@ -179,22 +343,169 @@ class Phylm:
     async def load_sources(
         self,
         sources: List[str],
+        timeout: Optional[float] = None,
+        source_timeouts: Optional[Mapping[str, float]] = None,
+        partial: bool = False,
+        imdb_info: Optional[Sequence[str]] = None,
+        tmdb_append_to_response: Optional[Sequence[str]] = None,
     ) -> "Phylm":
         """Asynchronously load multiple sources.
 
+        By default the first error raised by a source is raised. With `partial` set,
+        the sources which load in time are populated and the error of every source
+        which fails, or doesn't load before its deadline, is recorded in `errors`
+        instead.
+
         Args:
             sources: a list of the desired sources
+            timeout: an optional number of seconds to wait for all the sources to load
+            source_timeouts: an optional mapping of source name to the number of seconds
+                to wait for that source to load, eg. `{"rt": 1.0}`
+            partial: whether to return once the sources have loaded, failed or timed
+                out rather than raising the first error
+            imdb_info: the optional `cinemagoer` info sets to fetch when loading the
+                imdb data, eg. `["main", "plot"]`
+            tmdb_append_to_response: optional sub-resources to fetch in the same
+                request as the TMDB movie details, eg. `["credits", "watch/providers"]`
 
         Returns:
             the instance
+
+        Raises:
+            UnrecognizedSourceError: if `partial` is set and a source is not recognized
+            SourceTimeoutError: if `partial` isn't set and the sources don't load
+                within `timeout`, or a source doesn't load within its own timeout
         """
+        source_timeouts = source_timeouts or {}
+
+        if partial:
+            for source in sources:
+                if source not in SOURCES:
+                    raise UnrecognizedSourceError(
+                        f"{source} is not a recognized source"
+                    )
+
         session = ClientSession()
+        load = functools.partial(
+            self.load_source,
+            session=session,
+            imdb_info=imdb_info,
+            tmdb_append_to_response=tmdb_append_to_response,
+        )
 
         try:
-            await asyncio.gather(
-                *[self.load_source(source, session=session) for source in sources]
-            )
+            if partial:
+                await self._load_partial(sources, load, timeout, source_timeouts)
+            else:
+                await self._load_all(sources, load, timeout, source_timeouts)
         finally:
             await session.close()
 
         return self
+
+    async def _load_all(
+        self,
+        sources: List[str],
+        load: "Callable[[str], Awaitable[Phylm]]",
+        timeout: Optional[float],
+        source_timeouts: Mapping[str, float],
+    ) -> None:
+        """Load the sources, raising the first error.
+
+        Args:
+            sources: a list of the desired sources
+            load: a callable loading a source
+            timeout: an optional number of seconds to wait for all the sources to load
+            source_timeouts: a mapping of source name to the number of seconds to wait
+                for that source to load
+
+        Raises:
+            SourceTimeoutError: if the sources don't load within `timeout`
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    *[
+                        self._load_within(source, load, source_timeouts.get(source))
+                        for source in sources
+                    ]
+                ),
+                timeout,
+            )
+        except asyncio.TimeoutError as err:
+            # a timeout raised by a source itself before the deadline is left as is
+            if timeout is None or loop.time() - start < timeout:
+                raise
+            late = [s for s in sources if getattr(self, f"_{s}", None) is None]
+            raise SourceTimeoutError(
+                f"{', '.join(late)} did not load within {timeout} seconds"
+            ) from err
+
+    async def _load_partial(
+        self,
+        sources: List[str],
+        load: "Callable[[str], Awaitable[Phylm]]",
+        timeout: Optional[float],
+        source_timeouts: Mapping[str, float],
+    ) -> None:
+        """Load the sources, recording the errors rather than raising them.
+
+        Args:
+            sources: a list of the desired sources
+            load: a callable loading a source
+            timeout: an optional number of seconds to wait for all the sources to load
+            source_timeouts: a mapping of source name to the number of seconds to wait
+                for that source to load
+        """
+        tasks = {
+            source: asyncio.ensure_future(
+                self._load_within(source, load, source_timeouts.get(source))
+            )
+            for source in sources
+        }
+
+        if not tasks:
+            return
+
+        _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        for source, task in tasks.items():
+            if task in pending:
+                self.errors[source] = SourceTimeoutError(
+                    f"{source} did not load within {timeout} seconds"
+                )
+                continue
+
+            error = task.exception()
+            if error is not None:
+                self.errors[source] = error
+
+    async def _load_within(
+        self,
+        source: str,
+        load: "Callable[[str], Awaitable[Phylm]]",
+        timeout: Optional[float],
+    ) -> None:
+        """Load a source, giving up after `timeout` seconds.
+
+        Args:
+            source: the desired source
+            load: a callable loading a source
+            timeout: an optional number of seconds to wait for the source to load
+
+        Raises:
+            SourceTimeoutError: if the source doesn't load in time
+        """
+        try:
+            await asyncio.wait_for(load(source), timeout)
+        except asyncio.TimeoutError as err:
+            raise SourceTimeoutError(
+                f"{source} did not load within {timeout} seconds"
+            ) from err
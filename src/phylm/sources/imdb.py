@@ -1,14 +1,92 @@
 """Module to contain the IMDb class definition."""
 import asyncio
+from concurrent.futures import Executor
+from typing import Any
+from typing import Dict
 from typing import List
+from typing import NamedTuple
 from typing import Optional
+from typing import Sequence
+from typing import Tuple
 
 import imdb
+from aiohttp import ClientSession
 from imdb._exceptions import IMDbDataAccessError
 from imdb.Movie import Movie
+from imdb.Person import Person
+
+from phylm.clients.imdb import ImdbClient
+from phylm.clients.imdb_dataset import get_imdb_dataset
+from phylm.utils.cache import get_result_cache
+from phylm.utils.executors import get_imdb_executor
+from phylm.utils.matching import Candidate
+from phylm.utils.matching import score_match
+from phylm.utils.title_index import get_title_index
 
 ia = imdb.Cinemagoer()
 
+SOURCE_NAME = "imdb"
+CINEMAGOER_BACKEND = "cinemagoer"
+WEB_BACKEND = "web"
+DATASET_BACKEND = "dataset"
+BACKENDS = (CINEMAGOER_BACKEND, WEB_BACKEND, DATASET_BACKEND)
+DEFAULT_INFO = ("main",)
+
+_backend = CINEMAGOER_BACKEND
+
+
+class ImdbData(NamedTuple):
+    """The data points extracted from an IMDb movie."""
+
+    id: Optional[str]
+    title: Optional[str]
+    year: Optional[int]
+    genres: Tuple[str, ...]
+    cast: Tuple[str, ...]
+    directors: Tuple[str, ...]
+    runtimes: Tuple[str, ...]
+    rating: Optional[float]
+    plot: Optional[Tuple[str, ...]] = None
+    """The plot summaries, or `None` if they haven't been fetched."""
+    kind: Optional[str] = None
+
+
+def set_backend(backend: str = CINEMAGOER_BACKEND) -> None:
+    """Set how IMDb data is fetched.
+
+    Args:
+        backend: either "cinemagoer", to fetch with blocking `cinemagoer` calls in an
+            executor, "web", to fetch the IMDb website over `aiohttp`, or "dataset",
+            to read the local store opened with `configure_imdb_dataset`
+
+    Raises:
+        ValueError: if the backend is not recognised, or is "dataset" and no store is
+            configured
+    """
+    global _backend
+
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"{backend} is not a recognised IMDb backend, use one of {BACKENDS}"
+        )
+
+    if backend == DATASET_BACKEND and get_imdb_dataset() is None:
+        raise ValueError(
+            "The dataset backend needs a store, configure one with "
+            "`configure_imdb_dataset`"
+        )
+
+    _backend = backend
+
+
+def get_backend() -> str:
+    """Return how IMDb data is fetched.
+
+    Returns:
+        str: the backend name
+    """
+    return _backend
+
 
 class Imdb:
     """Class to abstract an IMDb movie object."""
@@ -39,73 +117,166 @@ class Imdb:
         self.movie_id = movie_id
         self.raw_year = raw_year
         self.low_confidence = False
-        self._imdb_data: Optional[Movie] = None
+        self._imdb_data: Optional[ImdbData] = None
 
-    def _get_imdb_data(self) -> Optional[Movie]:
-        """Fetch the data from IMDb.
+    async def load_source(
+        self,
+        executor: Optional[Executor] = None,
+        session: Optional[ClientSession] = None,
+        info: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Asynchronously load the data for from the source.
 
-        If `self.movie_id` exists, prefer that as a search query, falling back to
-        `self.raw_title` if that exists. If `movie_id` exists but is unrecognised
-        by `IMDb` then we also fall back to the `raw_title`.
+        If a result cache is configured and holds a result for this search then that
+        is used instead, unless the plot is requested and the cached result doesn't
+        include it. If a title index is configured and only a title is given then the
+        title is first resolved to a movie id with the index, only searching IMDb if
+        it isn't found there.
+
+        Args:
+            executor: an optional executor in which to run the blocking IMDb calls.
+                Defaults to the executor set with `configure_imdb_executor`, or the
+                event loop's default executor if none is set. Only used by the
+                "cinemagoer" backend.
+            session: an optional instance of `aiohttp.ClientSession` in which to run the
+                requests. Only used by the "web" backend.
+            info: the `cinemagoer` info sets to fetch while loading, eg.
+                `["main", "plot"]` so that reading the plot doesn't make a blocking
+                request. Defaults to `["main"]` for a title search or `cinemagoer`'s
+                default info sets for a movie id. The "web" backend always fetches the
+                main data and the plot. The "dataset" backend never loads the plot.
+        """
+        cache = get_result_cache()
+        if cache:
+            cached = cache.get(
+                SOURCE_NAME, self.raw_title, self.raw_year, self.movie_id
+            )
+            if cached is not None and not _missing_plot(cached, info):
+                self._restore(cached)
+                return
+
+        movie_id, resolved_low_confidence = await self._resolve_movie_id()
+        if movie_id != self.movie_id:
+            info = info or DEFAULT_INFO
+
+        movie: Optional[Movie]
+
+        if _backend == DATASET_BACKEND:
+            movie, self.low_confidence = fetch_imdb_data_offline(
+                self.raw_title, movie_id, self.raw_year
+            )
+        elif _backend == WEB_BACKEND:
+            movie, self.low_confidence = await fetch_imdb_data_async(
+                self.raw_title, movie_id, self.raw_year, session=session
+            )
+        else:
+            loop = asyncio.get_running_loop()
+            movie, self.low_confidence = await loop.run_in_executor(
+                executor or get_imdb_executor(),
+                fetch_imdb_data,
+                self.raw_title,
+                movie_id,
+                self.raw_year,
+                info,
+            )
+
+        self._imdb_data = _data_from_movie(movie) if movie else None
+
+        if movie_id != self.movie_id and self.id == movie_id:
+            self.low_confidence = resolved_low_confidence
+
+        if cache:
+            cache.set(
+                SOURCE_NAME,
+                self.to_dict(),
+                self.raw_title,
+                self.raw_year,
+                self.movie_id,
+            )
+
+    async def _resolve_movie_id(self) -> Tuple[Optional[str], bool]:
+        """Resolve the title to a movie id with the configured title index.
+
+        The index is queried in the event loop's default executor, as a similar title
+        search of a large index takes long enough to hold up the other sources.
 
         Returns:
-            an optional `IMDb` `Movie` object
+            Tuple[Optional[str], bool]: the given movie id, or the resolved one if only
+                a title is given and it's in the index, and whether the resolved match
+                is low confidence
         """
-        if self.movie_id:
-            try:
-                get_movie_result: Movie = ia.get_movie(self.movie_id)
-                if get_movie_result:
-                    return get_movie_result
-            except IMDbDataAccessError:
-                pass
-
-        if not self.raw_title:
-            return None
+        index = get_title_index()
 
-        results: List[Movie] = [
-            result
-            for result in ia.search_movie(self.raw_title)
-            if result.get("kind") == "movie"
-        ]
+        if self.movie_id or not self.raw_title or index is None:
+            return self.movie_id, False
 
-        if not results:
-            return None
+        loop = asyncio.get_running_loop()
+        resolved = await loop.run_in_executor(
+            None, index.resolve, self.raw_title, self.raw_year
+        )
+
+        if resolved is None:
+            return None, False
 
-        target = self._find_match(results)
+        match, low_confidence = resolved
+        return match.movie_id, low_confidence
 
-        ia.update(target, info=["main"])
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the search terms and the loaded data as a dictionary.
 
-        return target
+        The plot is only included if it has already been fetched.
 
-    def _find_match(self, results: List[Movie]) -> Optional[Movie]:
-        """Find a match based on year or title.
+        Returns:
+            a dictionary which can be passed to `from_dict`
+        """
+        data: Optional[Dict[str, Any]] = None
+        movie = self._imdb_data
+
+        if movie:
+            data = {
+                "id": movie.id,
+                "title": movie.title,
+                "year": movie.year,
+                "genres": list(movie.genres),
+                "cast": list(movie.cast),
+                "directors": list(movie.directors),
+                "runtimes": list(movie.runtimes),
+                "rating": movie.rating,
+                "kind": movie.kind,
+            }
+            if movie.plot is not None:
+                data["plot"] = list(movie.plot)
+
+        return {
+            "raw_title": self.raw_title,
+            "movie_id": self.movie_id,
+            "raw_year": self.raw_year,
+            "low_confidence": self.low_confidence,
+            "data": data,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Imdb":
+        """Create a loaded instance from the output of `to_dict`.
 
         Args:
-            results: A list of search results
+            data: a dictionary returned by `to_dict`
 
         Returns:
-            Optional[Movie]: the matched movie if found
+            a loaded `Imdb` instance
         """
-        # first try matching on year
-        if self.raw_year:
-            for result in results:
-                if result.get("year") == self.raw_year:
-                    return result
-
-        # then try matching on title
-        if self.raw_title:
-            for result in results:
-                if result["title"].lower() == self.raw_title.lower():
-                    return result
-
-        # finally pick the first result
-        self.low_confidence = True
-        return results[0]
-
-    async def load_source(self) -> None:
-        """Asynchronously load the data for from the source."""
-        loop = asyncio.get_running_loop()
-        self._imdb_data = await loop.run_in_executor(None, self._get_imdb_data)
+        imdb_source = cls(
+            raw_title=data.get("raw_title"),
+            movie_id=data.get("movie_id"),
+            raw_year=data.get("raw_year"),
+        )
+        imdb_source._restore(data)
+        return imdb_source
+
+    def _restore(self, data: Dict[str, Any]) -> None:
+        self.low_confidence = bool(data.get("low_confidence"))
+        result = data.get("data")
+        self._imdb_data = _data_from_dict(result) if result else None
 
     @property
     def title(self) -> Optional[str]:
@@ -117,7 +288,7 @@ class Imdb:
         if not self._imdb_data:
             return None
 
-        return str(self._imdb_data.get("title"))
+        return self._imdb_data.title
 
     @property
     def id(self) -> Optional[str]:
@@ -129,7 +300,7 @@ class Imdb:
         if not self._imdb_data:
             return None
 
-        return str(self._imdb_data.movieID)
+        return self._imdb_data.id
 
     def genres(self, limit: int = 3) -> List[str]:
         """Return the genres.
@@ -143,7 +314,7 @@ class Imdb:
         if not self._imdb_data:
             return []
 
-        return list(self._imdb_data.get("genres", [])[:limit])
+        return list(self._imdb_data.genres[:limit])
 
     def cast(self, limit: int = 5) -> List[str]:
         """Return the cast.
@@ -157,7 +328,7 @@ class Imdb:
         if not self._imdb_data:
             return []
 
-        return [person["name"] for person in self._imdb_data.get("cast", [])[:limit]]
+        return list(self._imdb_data.cast[:limit])
 
     @property
     def runtime(self) -> Optional[str]:
@@ -169,7 +340,7 @@ class Imdb:
         if not self._imdb_data:
             return None
 
-        runtimes = self._imdb_data.get("runtimes")
+        runtimes = self._imdb_data.runtimes
 
         if runtimes:
             return str(runtimes[0])
@@ -186,7 +357,7 @@ class Imdb:
         if not self._imdb_data:
             return None
 
-        year = self._imdb_data.get("year")
+        year = self._imdb_data.year
 
         if not year:
             return None
@@ -205,9 +376,7 @@ class Imdb:
         if not self._imdb_data:
             return []
 
-        return [
-            person["name"] for person in self._imdb_data.get("directors", [])[:limit]
-        ]
+        return list(self._imdb_data.directors[:limit])
 
     @property
     def rating(self) -> Optional[float]:
@@ -219,30 +388,339 @@ class Imdb:
         if not self._imdb_data:
             return None
 
-        rating = self._imdb_data.get("rating")
+        rating = self._imdb_data.rating
 
         if not rating:
             return None
 
         return float(rating)
 
+    @property
+    def match_score(self) -> Optional[float]:
+        """Return how well the loaded movie matches the search terms.
+
+        See `phylm.utils.matching` for how the score is calculated. The score only
+        describes the loaded movie, it isn't used to select it from the search results.
+
+        Returns:
+            the score from 0 to 1, or `None` if nothing is loaded or only a movie
+                id was given
+        """
+        if not self._imdb_data or not self.raw_title:
+            return None
+
+        return score_match(
+            self.raw_title,
+            self.raw_year,
+            Candidate(self.title, self.year, self._imdb_data.kind),
+        )
+
     @property
     def plot(self) -> Optional[str]:
         """Return the plot.
 
+        If the plot wasn't fetched when the source was loaded then it is fetched now
+        with a blocking request. Pass `info=["main", "plot"]` to `load_source` to avoid
+        this. The IMDb datasets don't include plots, so the "dataset" backend always
+        fetches it now.
+
         Returns:
             the plot of the movie
         """
         if not self._imdb_data:
             return None
 
-        data = self._imdb_data
-        if "plot" not in data.current_info:
-            ia.update(data, info=["plot"])
+        if self._imdb_data.plot is None:
+            movie = Movie(movieID=self._imdb_data.id)
+            ia.update(movie, info=["plot"])
+            self._imdb_data = self._imdb_data._replace(
+                plot=tuple(movie.get("plot", []))
+            )
 
-        plot = data.get("plot")
+        plot = self._imdb_data.plot
 
         if not plot:
             return None
 
         return str(plot[0].split("::")[0])
+
+
+def fetch_imdb_data(
+    raw_title: Optional[str] = None,
+    movie_id: Optional[str] = None,
+    raw_year: Optional[int] = None,
+    info: Optional[Sequence[str]] = None,
+) -> Tuple[Optional[Movie], bool]:
+    """Fetch the data from IMDb with blocking calls.
+
+    If `movie_id` is given, prefer that as a search query, falling back to `raw_title`
+    if that is given. If `movie_id` is given but is unrecognised by `IMDb` then we also
+    fall back to `raw_title`.
+
+    Only picklable values are taken and returned so that this can be run in a
+    `ProcessPoolExecutor`.
+
+    Args:
+        raw_title: the title of the movie
+        movie_id: the `IMDb` id of the movie
+        raw_year: an optional year for improved matching if only title is given
+        info: the `cinemagoer` info sets to fetch. Defaults to `["main"]` for a title
+            search or `cinemagoer`'s default info sets for a movie id.
+
+    Returns:
+        Tuple[Optional[Movie], bool]: an optional `IMDb` `Movie` object and whether the
+            match is low confidence
+    """
+    if movie_id:
+        try:
+            get_movie_result: Movie = (
+                ia.get_movie(movie_id, info=list(info))
+                if info
+                else ia.get_movie(movie_id)
+            )
+            if get_movie_result:
+                return get_movie_result, False
+        except IMDbDataAccessError:
+            pass
+
+    if not raw_title:
+        return None, False
+
+    results: List[Movie] = [
+        result for result in ia.search_movie(raw_title) if result.get("kind") == "movie"
+    ]
+
+    if not results:
+        return None, False
+
+    target, low_confidence = _find_match(results, raw_title, raw_year)
+
+    ia.update(target, info=list(info or DEFAULT_INFO))
+
+    return target, low_confidence
+
+
+async def fetch_imdb_data_async(
+    raw_title: Optional[str] = None,
+    movie_id: Optional[str] = None,
+    raw_year: Optional[int] = None,
+    session: Optional[ClientSession] = None,
+) -> Tuple[Optional[Movie], bool]:
+    """Fetch the data from the IMDb website over `aiohttp`.
+
+    The search terms are used in the same way as `fetch_imdb_data`. The plot is fetched
+    along with the rest of the data.
+
+    Args:
+        raw_title: the title of the movie
+        movie_id: the `IMDb` id of the movie
+        raw_year: an optional year for improved matching if only title is given
+        session: an optional instance of `aiohttp.ClientSession` in which to run the
+            requests
+
+    Returns:
+        Tuple[Optional[Movie], bool]: an optional `IMDb` `Movie` object and whether the
+            match is low confidence
+    """
+    client = ImdbClient(session=session)
+
+    if movie_id:
+        movie_data = await client.get_movie(movie_id)
+        if movie_data:
+            return _movie_from_dict(movie_data), False
+
+    if not raw_title:
+        return None, False
+
+    results = [
+        Movie(
+            movieID=result["id"],
+            data={"title": result["title"], "year": result["year"], "kind": "movie"},
+        )
+        for result in await client.search_movies(raw_title)
+    ]
+
+    if not results:
+        return None, False
+
+    target, low_confidence = _find_match(results, raw_title, raw_year)
+    movie_data = await client.get_movie(target.movieID)
+
+    if not movie_data:
+        return target, low_confidence
+
+    # the search result year is the year of the first release
+    movie_data["year"] = target.get("year") or movie_data["year"]
+    return _movie_from_dict(movie_data), low_confidence
+
+
+def fetch_imdb_data_offline(
+    raw_title: Optional[str] = None,
+    movie_id: Optional[str] = None,
+    raw_year: Optional[int] = None,
+) -> Tuple[Optional[Movie], bool]:
+    """Fetch the data from the local store opened with `configure_imdb_dataset`.
+
+    The search terms are used in the same way as `fetch_imdb_data`, except that titles
+    only match once normalised, eg. "amelie" matches "Amélie".
+
+    Args:
+        raw_title: the title of the movie
+        movie_id: the `IMDb` id of the movie
+        raw_year: an optional year for improved matching if only title is given
+
+    Raises:
+        ValueError: if no store is configured
+
+    Returns:
+        Tuple[Optional[Movie], bool]: an optional `IMDb` `Movie` object and whether the
+            match is low confidence
+    """
+    dataset = get_imdb_dataset()
+
+    if dataset is None:
+        raise ValueError(
+            "The dataset backend needs a store, configure one with "
+            "`configure_imdb_dataset`"
+        )
+
+    if movie_id:
+        movie_data = dataset.get_movie(movie_id)
+        if movie_data:
+            return _movie_from_dict(movie_data), False
+
+    if not raw_title:
+        return None, False
+
+    results = [_movie_from_dict(result) for result in dataset.search_movies(raw_title)]
+
+    if not results:
+        return None, False
+
+    return _find_match(results, raw_title, raw_year)
+
+
+def _find_match(
+    results: List[Movie], raw_title: str, raw_year: Optional[int] = None
+) -> Tuple[Movie, bool]:
+    """Find a match based on year or title.
+
+    Args:
+        results: A list of search results
+        raw_title: the title of the movie
+        raw_year: an optional year for improved matching
+
+    Returns:
+        Tuple[Movie, bool]: the matched movie and whether the match is low confidence
+    """
+    # first try matching on year
+    if raw_year:
+        for result in results:
+            if result.get("year") == raw_year:
+                return result, False
+
+    # then try matching on title
+    for result in results:
+        if result["title"].lower() == raw_title.lower():
+            return result, False
+
+    # finally pick the first result
+    return results[0], True
+
+
+def _missing_plot(cached: Dict[str, Any], info: Optional[Sequence[str]]) -> bool:
+    """Check if the plot is requested but not included in a cached result.
+
+    Args:
+        cached: a cached result returned by `Imdb.to_dict`
+        info: the requested info sets
+
+    Returns:
+        bool: whether the cached result is missing the plot
+    """
+    data = cached.get("data")
+    return bool(info and "plot" in info and data and "plot" not in data)
+
+
+def _data_from_movie(movie: Movie) -> ImdbData:
+    """Extract the data points from a `Movie`, so that it can be released.
+
+    Args:
+        movie: the `Movie` object
+
+    Returns:
+        ImdbData: the data points
+    """
+    year = movie.get("year")
+    rating = movie.get("rating")
+
+    return ImdbData(
+        id=str(movie.movieID) if movie.movieID is not None else None,
+        title=str(movie["title"]) if movie.get("title") else None,
+        year=int(year) if year else None,
+        genres=tuple(movie.get("genres", [])),
+        cast=tuple(str(person["name"]) for person in movie.get("cast", [])),
+        directors=tuple(str(person["name"]) for person in movie.get("directors", [])),
+        runtimes=tuple(str(runtime) for runtime in movie.get("runtimes", [])),
+        rating=float(rating) if rating else None,
+        plot=(tuple(movie.get("plot", [])) if "plot" in movie.current_info else None),
+        kind=movie.get("kind"),
+    )
+
+
+def _data_from_dict(data: Dict[str, Any]) -> ImdbData:
+    """Build the data points from the data returned by `Imdb.to_dict`.
+
+    Args:
+        data: the movie data points
+
+    Returns:
+        ImdbData: the data points
+    """
+    plot = data.get("plot")
+
+    return ImdbData(
+        id=data.get("id"),
+        title=data.get("title"),
+        year=data.get("year"),
+        genres=tuple(data.get("genres", [])),
+        cast=tuple(data.get("cast", [])),
+        directors=tuple(data.get("directors", [])),
+        runtimes=tuple(data.get("runtimes", [])),
+        rating=data.get("rating"),
+        plot=tuple(plot) if plot is not None else None,
+        kind=data.get("kind"),
+    )
+
+
+def _movie_from_dict(data: Dict[str, Any]) -> Movie:
+    """Build a `Movie` from the data returned by `Imdb.to_dict`.
+
+    Args:
+        data: the movie data points
+
+    Returns:
+        Movie: the `Movie` object
+    """
+    movie_data: Dict[str, Any] = {
+        "title": data.get("title"),
+        "year": data.get("year"),
+        "genres": data.get("genres", []),
+        "cast": [Person(name=name) for name in data.get("cast", [])],
+        "directors": [Person(name=name) for name in data.get("directors", [])],
+        "runtimes": data.get("runtimes", []),
+        "rating": data.get("rating"),
+        "kind": data.get("kind"),
+    }
+    current_info = ["main"]
+
+    if "plot" in data:
+        movie_data["plot"] = data["plot"]
+        current_info.append("plot")
+
+    movie = Movie(
+        movieID=data.get("id"),
+        data={key: value for key, value in movie_data.items() if value is not None},
+    )
+    movie.current_info = current_info
+    return movie
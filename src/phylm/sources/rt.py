@@ -1,14 +1,36 @@
 """Module to hold the Rt class definition."""
+from typing import Any
+from typing import Dict
+from typing import NamedTuple
 from typing import Optional
+from typing import Tuple
 
 from aiohttp import ClientSession
 from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from bs4.element import Tag
 
-from phylm.utils.web import async_soupify
+from phylm.utils.cache import get_result_cache
+from phylm.utils.executors import run_parser
+from phylm.utils.matching import Candidate
+from phylm.utils.matching import score_match
+from phylm.utils.web import DEFAULT_HEADERS
+from phylm.utils.web import async_get_text
+from phylm.utils.web import get_parser
+from phylm.utils.web import make_soup
 from phylm.utils.web import url_encode
 
 RT_BASE_MOVIE_URL = "https://www.rottentomatoes.com/search"
+SOURCE_NAME = "rt"
+RESULTS_STRAINER = SoupStrainer("search-page-media-row")
+
+
+class RtData(NamedTuple):
+    """The data points extracted from a Rotten Tomatoes search result."""
+
+    title: Optional[str]
+    year: Optional[str]
+    tomato_score: Optional[str]
 
 
 class Rt:
@@ -24,46 +46,80 @@ class Rt:
         self.raw_title = raw_title
         self.raw_year = raw_year
         self.low_confidence = False
-        self._rt_data: Optional[Tag] = None
-
-    def _parse_data(self, soup: BeautifulSoup) -> Optional[Tag]:
-        results = soup.find_all("search-page-media-row")
+        self._rt_data: Optional[RtData] = None
 
-        if not results:
-            return None
-
-        # first try matching on year
-        for result in results:
-            release_year = result["releaseyear"]
-            if self.raw_year and str(self.raw_year) == release_year:
-                return result
-
-        # then try matching on title
-        for result in results:
-            result_title: str = result.find_all("a")[-1].string.strip()
-            if result_title.lower() == self.raw_title.lower().strip():
-                return result
-
-        # finally pick the first result
-        self.low_confidence = True
-        return results[0]
-
-    async def _scrape_data(
-        self, session: Optional[ClientSession] = None
-    ) -> BeautifulSoup:
+    async def _scrape_data(self, session: Optional[ClientSession] = None) -> str:
         url_encoded_film = url_encode(self.raw_title)
         search_url = f"{RT_BASE_MOVIE_URL}?search={url_encoded_film}"
-        return await async_soupify(search_url, session)
+        return await async_get_text(
+            search_url, session=session, headers=DEFAULT_HEADERS, source=SOURCE_NAME
+        )
 
     async def load_source(self, session: Optional[ClientSession] = None) -> None:
         """Asynchronously load the data from the source.
 
+        If a result cache is configured and holds a result for this search then that
+        is used instead. If a parse executor is configured then the page is parsed
+        there.
+
         Args:
             session: an optional instance of `aiohttp.ClientSession` in which to run the
                 request
         """
-        raw_data = await self._scrape_data(session=session)
-        self._rt_data = self._parse_data(raw_data)
+        cache = get_result_cache()
+        if cache:
+            cached = cache.get(SOURCE_NAME, self.raw_title, self.raw_year)
+            if cached is not None:
+                self._restore(cached)
+                return
+
+        html = await self._scrape_data(session=session)
+        self._rt_data, self.low_confidence = await run_parser(
+            parse_results, html, self.raw_title, self.raw_year, get_parser()
+        )
+
+        if cache:
+            cache.set(SOURCE_NAME, self.to_dict(), self.raw_title, self.raw_year)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the search terms and the loaded data as a dictionary.
+
+        Returns:
+            a dictionary which can be passed to `from_dict`
+        """
+        return {
+            "raw_title": self.raw_title,
+            "raw_year": self.raw_year,
+            "low_confidence": self.low_confidence,
+            "data": self._rt_data._asdict() if self._rt_data else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Rt":
+        """Create a loaded instance from the output of `to_dict`.
+
+        Args:
+            data: a dictionary returned by `to_dict`
+
+        Returns:
+            a loaded `Rt` instance
+        """
+        rt = cls(raw_title=data["raw_title"], raw_year=data.get("raw_year"))
+        rt._restore(data)
+        return rt
+
+    def _restore(self, data: Dict[str, Any]) -> None:
+        self.low_confidence = bool(data.get("low_confidence"))
+        result = data.get("data")
+        self._rt_data = (
+            RtData(
+                title=result.get("title"),
+                year=result.get("year"),
+                tomato_score=result.get("tomato_score"),
+            )
+            if result
+            else None
+        )
 
     @property
     def title(self) -> Optional[str]:
@@ -75,12 +131,7 @@ class Rt:
         if not self._rt_data:
             return None
 
-        title_tag = self._rt_data.find_all("a")[-1]
-
-        if title_tag:
-            return str(title_tag.get_text()).strip()
-
-        return None
+        return self._rt_data.title
 
     @property
     def year(self) -> Optional[str]:
@@ -92,7 +143,7 @@ class Rt:
         if not self._rt_data:
             return None
 
-        return str(self._rt_data["releaseyear"])
+        return self._rt_data.year
 
     @property
     def tomato_score(self) -> Optional[str]:
@@ -104,4 +155,105 @@ class Rt:
         if not self._rt_data:
             return None
 
-        return str(self._rt_data["tomatometerscore"])
+        return self._rt_data.tomato_score
+
+    @property
+    def match_score(self) -> Optional[float]:
+        """Return how well the loaded movie matches the search terms.
+
+        See `phylm.utils.matching` for how the score is calculated. The score only
+        describes the loaded movie, it isn't used to select it from the search results.
+
+        Returns:
+            the score from 0 to 1, or `None` if nothing is loaded
+        """
+        if not self._rt_data:
+            return None
+
+        year = self.year
+        return score_match(
+            self.raw_title,
+            self.raw_year,
+            Candidate(self.title, int(year) if year and year.isdigit() else None),
+        )
+
+
+def parse_results(
+    html: str,
+    raw_title: str,
+    raw_year: Optional[int] = None,
+    parser: Optional[str] = None,
+) -> Tuple[Optional[RtData], bool]:
+    """Parse a search results page and extract the data points of the best match.
+
+    Only picklable values are taken and returned so that this can be run in a
+    `ProcessPoolExecutor`.
+
+    Args:
+        html: the search results page
+        raw_title: the given title of the movie
+        raw_year: an optional year for improved matching
+        parser: an optional `BeautifulSoup` parser name
+
+    Returns:
+        Tuple[Optional[RtData], bool]: the extracted data points, or `None` if there
+            are no results, and whether the match is low confidence
+    """
+    soup = make_soup(html, parse_only=RESULTS_STRAINER, parser=parser)
+    result, low_confidence = _select_result(soup, raw_title, raw_year)
+    return (_extract_data(result) if result else None), low_confidence
+
+
+def _select_result(
+    soup: BeautifulSoup, raw_title: str, raw_year: Optional[int] = None
+) -> Tuple[Optional[Tag], bool]:
+    """Select the best matching search result.
+
+    Args:
+        soup: the parsed search results
+        raw_title: the given title of the movie
+        raw_year: an optional year for improved matching
+
+    Returns:
+        Tuple[Optional[Tag], bool]: the selected result, if any, and whether the match
+            is low confidence
+    """
+    results = soup.find_all("search-page-media-row")
+
+    if not results:
+        return None, False
+
+    # first try matching on year
+    for result in results:
+        release_year = result["releaseyear"]
+        if raw_year and str(raw_year) == release_year:
+            return result, False
+
+    # then try matching on title
+    for result in results:
+        result_title: str = result.find_all("a")[-1].string.strip()
+        if result_title.lower() == raw_title.lower().strip():
+            return result, False
+
+    # finally pick the first result
+    return results[0], True
+
+
+def _extract_data(tag: Tag) -> RtData:
+    """Return the data points from a search result.
+
+    Args:
+        tag: the rt search result bs4 tag
+
+    Returns:
+        RtData: the extracted data points
+    """
+    links = tag.find_all("a")
+    release_year = tag.get("releaseyear")
+    tomato_score = tag.get("tomatometerscore")
+
+    return RtData(
+        title=str(links[-1].get_text()).strip() if links else None,
+        year=None if release_year is None else str(release_year),
+        tomato_score=None if tomato_score is None else str(tomato_score),
+    )
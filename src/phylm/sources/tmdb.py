@@ -4,10 +4,42 @@ from typing import Any
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Sequence
 
 from aiohttp import ClientSession
 
+from phylm.clients.tmdb import TmdbClient
 from phylm.tools import initialize_tmdb_client
+from phylm.utils.cache import get_result_cache
+from phylm.utils.matching import Candidate
+from phylm.utils.matching import score_match
+
+SOURCE_NAME = "tmdb"
+TMDB_FIELDS = (
+    "id",
+    "imdb_id",
+    "title",
+    "genres",
+    "runtime",
+    "release_date",
+    "vote_average",
+    "overview",
+)
+# the sub-resources which can be fetched along with the movie details
+TMDB_SUB_RESOURCES = (
+    "alternative_titles",
+    "credits",
+    "external_ids",
+    "images",
+    "keywords",
+    "recommendations",
+    "release_dates",
+    "reviews",
+    "similar",
+    "translations",
+    "videos",
+    "watch/providers",
+)
 
 
 class Tmdb:
@@ -32,8 +64,8 @@ class Tmdb:
             movie_id: the TMDB id of the movie.
             raw_year: an optional year for improved matching if only title is given.
             api_key: a TMDB api key. Must be supplied here or as an env var
-            session: a `aiohttp.ClientSession` instance. One will be created if not
-                supplied.
+            session: a `aiohttp.ClientSession` instance. If not supplied then a
+                session is opened for each load and closed at the end of it.
 
         Raises:
             ValueError: if neither `raw_title` nor `movie_id` is supplied.
@@ -49,31 +81,119 @@ class Tmdb:
         self._api_key = api_key
         self._tmdb_data: Dict[str, Any] = {}
 
-        self._client = initialize_tmdb_client(api_key, async_session=session)
-
-    async def _get_tmdb_data(self) -> Dict[str, Any]:
+    async def _get_tmdb_data(
+        self,
+        client: TmdbClient,
+        append_to_response: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
         if self.movie_id:
-            return await self._client.get_movie(self.movie_id)
+            return await client.get_movie(
+                self.movie_id, append_to_response=append_to_response
+            )
 
-        results = await self._client.search_movies_async(
+        results = await client.search_movies_async(
             self.raw_title, year=self.raw_year  # type: ignore
         )
 
         if not results:
             return {}
 
-        return await self._client.get_movie(results[0]["id"])
+        return await client.get_movie(
+            results[0]["id"], append_to_response=append_to_response
+        )
 
-    async def load_source(self, session: Optional[ClientSession] = None) -> None:
+    async def load_source(
+        self,
+        session: Optional[ClientSession] = None,
+        append_to_response: Optional[Sequence[str]] = None,
+    ) -> None:
         """Asynchronously load the data for from the source.
 
+        If a result cache is configured and holds a result for this search then that
+        is used instead, unless it doesn't include all of `append_to_response`.
+
         Args:
-            session: an optional `aiohttp.ClientSession` instance
+            session: an optional `aiohttp.ClientSession` instance. If neither this nor
+                the `session` given on initialization is supplied then a session is
+                opened for this load and closed before it returns.
+            append_to_response: optional sub-resources of the movie to fetch in the
+                same request as the movie details, eg. `["credits",
+                "watch/providers"]`. See `TMDB_SUB_RESOURCES` for the options.
+
+        Raises:
+            ValueError: if any of `append_to_response` isn't a recognised sub-resource
         """
-        if session:
-            self._client = initialize_tmdb_client(self._api_key, async_session=session)
+        unknown = set(append_to_response or []) - set(TMDB_SUB_RESOURCES)
+        if unknown:
+            raise ValueError(
+                f"Unrecognised TMDB sub-resources: {', '.join(sorted(unknown))}"
+            )
+
+        cache = get_result_cache()
+        if cache:
+            cached = cache.get(
+                SOURCE_NAME, self.raw_title, self.raw_year, self.movie_id
+            )
+            if cached is not None and _has_sub_resources(cached, append_to_response):
+                self._restore(cached)
+                return
+
+        client = initialize_tmdb_client(
+            self._api_key, async_session=session or self.session
+        )
+        async with client:
+            data = await self._get_tmdb_data(client, append_to_response)
+
+        self._tmdb_data = _extract_fields(data)
+
+        if cache:
+            cache.set(
+                SOURCE_NAME,
+                self.to_dict(),
+                self.raw_title,
+                self.raw_year,
+                self.movie_id,
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the search terms and the loaded data as a dictionary.
+
+        Returns:
+            a dictionary which can be passed to `from_dict`
+        """
+        data = _extract_fields(self._tmdb_data)
+
+        return {
+            "raw_title": self.raw_title,
+            "movie_id": self.movie_id,
+            "raw_year": self.raw_year,
+            "low_confidence": self.low_confidence,
+            "data": data or None,
+        }
 
-        self._tmdb_data = await self._get_tmdb_data()
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], api_key: Optional[str] = None) -> "Tmdb":
+        """Create a loaded instance from the output of `to_dict`.
+
+        Args:
+            data: a dictionary returned by `to_dict`
+            api_key: a TMDB api key. Must be supplied here or as an env var
+
+        Returns:
+            a loaded `Tmdb` instance
+        """
+        tmdb = cls(
+            raw_title=data.get("raw_title"),
+            movie_id=data.get("movie_id"),
+            raw_year=data.get("raw_year"),
+            api_key=api_key,
+        )
+        tmdb._restore(data)
+        return tmdb
+
+    def _restore(self, data: Dict[str, Any]) -> None:
+        self.low_confidence = bool(data.get("low_confidence"))
+        self._tmdb_data = dict(data.get("data") or {})
 
     @property
     def title(self) -> Optional[str]:
@@ -89,18 +209,20 @@ class Tmdb:
         """Return the TMDB id.
 
         Returns:
-            the id of the movie
+            the id of the movie, or `None` if nothing was found
         """
-        return str(self._tmdb_data.get("id"))
+        movie_id = self._tmdb_data.get("id")
+        return str(movie_id) if movie_id is not None else None
 
     @property
     def imdb_id(self) -> Optional[str]:
         """Return the IMDb id.
 
         Returns:
-            the IMDb id of the movie
+            the IMDb id of the movie, or `None` if nothing was found
         """
-        return str(self._tmdb_data.get("imdb_id"))
+        imdb_id = self._tmdb_data.get("imdb_id")
+        return str(imdb_id) if imdb_id is not None else None
 
     def genres(self, limit: int = 3) -> List[str]:
         """Return the genres.
@@ -165,6 +287,24 @@ class Tmdb:
 
         return float(rating)
 
+    @property
+    def match_score(self) -> Optional[float]:
+        """Return how well the loaded movie matches the search terms.
+
+        See `phylm.utils.matching` for how the score is calculated. The score only
+        describes the loaded movie, it isn't used to select it from the search results.
+
+        Returns:
+            the score from 0 to 1, or `None` if nothing is loaded or only a movie
+                id was given
+        """
+        if not self._tmdb_data or not self.raw_title:
+            return None
+
+        return score_match(
+            self.raw_title, self.raw_year, Candidate(self.title, self.year)
+        )
+
     @property
     def plot(self) -> Optional[str]:
         """Return the plot.
@@ -173,3 +313,78 @@ class Tmdb:
             the plot of the movie
         """
         return self._tmdb_data.get("overview")
+
+    def cast(self, limit: int = 5) -> List[str]:
+        """Return the cast.
+
+        Requires "credits" to have been loaded through `append_to_response`.
+
+        Args:
+            limit (int): an optional number of cast members to return
+
+        Returns:
+            a list of the movie's cast members
+        """
+        cast = self._tmdb_data.get("credits", {}).get("cast", [])
+        return [person["name"] for person in cast[:limit]]
+
+    def directors(self, limit: int = 3) -> List[str]:
+        """Return the director(s).
+
+        Requires "credits" to have been loaded through `append_to_response`.
+
+        Args:
+            limit (int): an optional number of directors to return
+
+        Returns:
+            a list of the movie's directors
+        """
+        crew = self._tmdb_data.get("credits", {}).get("crew", [])
+        directors = [person["name"] for person in crew if person["job"] == "Director"]
+        return directors[:limit]
+
+    def streaming_providers(self, regions: List[str]) -> Dict[str, Any]:
+        """Return the streaming providers.
+
+        Requires "watch/providers" to have been loaded through `append_to_response`.
+
+        Args:
+            regions: a list of regions to trim down the return list
+
+        Returns:
+            a dictionary of streaming providers, keyed by region name
+        """
+        results = self._tmdb_data.get("watch/providers", {}).get("results", {})
+        return {key: results.get(key.upper(), {}) for key in regions}
+
+
+def _extract_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the fields and sub-resources of a movie which are used.
+
+    Args:
+        data: the movie details returned by TMDB
+
+    Returns:
+        Dict[str, Any]: the fields in `TMDB_FIELDS` and any fetched sub-resources
+    """
+    return {key: data[key] for key in TMDB_FIELDS + TMDB_SUB_RESOURCES if key in data}
+
+
+def _has_sub_resources(
+    cached: Dict[str, Any], append_to_response: Optional[Sequence[str]]
+) -> bool:
+    """Check if a cached result includes all the requested sub-resources.
+
+    Args:
+        cached: a cached result returned by `Tmdb.to_dict`
+        append_to_response: the requested sub-resources
+
+    Returns:
+        bool: whether all the sub-resources are included
+    """
+    data = cached.get("data")
+
+    if not data or not append_to_response:
+        return True
+
+    return all(resource in data for resource in append_to_response)
@@ -1,14 +1,22 @@
 """Module to hold `phylm` tools."""
 from typing import TYPE_CHECKING
 from typing import Any
+from typing import AsyncIterator
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
+from aiohttp import ClientSession
+from aiohttp import TCPConnector
+
 if TYPE_CHECKING:
     from imdb.Movie import Movie
 
+from phylm.clients.tmdb import DEFAULT_CONCURRENCY
+from phylm.clients.tmdb import get_tmdb_client
 from phylm.clients.tmdb import initialize_tmdb_client
 from phylm.sources.imdb import ia
 
@@ -52,7 +60,7 @@ def search_tmdb_movies(
     Returns:
         List[Dict[str, Any]]: the search results
     """
-    client = initialize_tmdb_client(api_key=api_key)
+    client = get_tmdb_client(api_key=api_key)
 
     return client.search_movies(query=query, region=region)
 
@@ -73,6 +81,38 @@ def get_streaming_providers(
     Returns:
         Dict[str, Any]: a dictionary of streaming providers, keyed by region name
     """
-    client = initialize_tmdb_client(api_key=api_key)
+    client = get_tmdb_client(api_key=api_key)
 
     return client.get_streaming_providers(movie_id=tmdb_movie_id, regions=regions)
+
+
+async def iter_streaming_providers(
+    tmdb_movie_ids: Iterable[str],
+    regions: List[str],
+    api_key: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Return the streaming providers for many movies as they're fetched.
+
+    All the requests are made through one pooled `aiohttp.ClientSession`.
+
+    Args:
+        tmdb_movie_ids: an iterable of tmdb movie ids
+        regions: a list of regions to trim down the return lists
+        api_key: an api_key can either be provided here or through a TMDB_API_KEY env
+            var
+        concurrency: the maximum number of requests in flight at any one time
+
+    Yields:
+        a `(tmdb_movie_id, providers)` pair for each movie in order of completion,
+        where `providers` is a dictionary of streaming providers keyed by region name
+    """
+    connector = TCPConnector(limit_per_host=concurrency)
+
+    async with ClientSession(connector=connector) as session:
+        client = initialize_tmdb_client(api_key=api_key, async_session=session)
+
+        async for pair in client.iter_streaming_providers(
+            tmdb_movie_ids, regions, concurrency=concurrency
+        ):
+            yield pair
@@ -0,0 +1,115 @@
+"""Module to contain some asyncio helper functions."""
+import asyncio
+from functools import partial
+from typing import Any
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import Set
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+async def bounded_as_completed(
+    aws: Iterable[Awaitable[T]], limit: int
+) -> AsyncIterator[T]:
+    """Run awaitables with at most `limit` pending, yielding results as they complete.
+
+    Awaitables are taken from `aws` lazily, so generators are never exhausted ahead of
+    the work. Any pending work is cancelled if the consumer stops early or an error is
+    raised.
+
+    Args:
+        aws: an iterable of awaitables
+        limit: the maximum number of awaitables pending at any one time
+
+    Yields:
+        the result of each awaitable in order of completion
+    """
+    iterator = iter(aws)
+    pending: Set[asyncio.Future[T]] = set()
+
+    try:
+        while True:
+            for aw in iterator:
+                pending.add(asyncio.ensure_future(aw))
+                if len(pending) >= limit:
+                    break
+
+            if not pending:
+                return
+
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class _Call:
+    """A call shared by the callers of `SingleFlight.do` with the same key."""
+
+    def __init__(self, task: "asyncio.Future[Any]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Share a single in-flight call between concurrent callers with the same key.
+
+    The call runs in its own task, so a caller being cancelled doesn't cancel it for
+    the others. It's only cancelled once every caller waiting on it has been cancelled.
+    Calls are only shared within an event loop.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no calls in flight."""
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        """Return the number of calls in flight."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, make: Callable[[], Awaitable[T]]) -> T:
+        """Await the call in flight for `key`, or start one if there's none.
+
+        Args:
+            key: the key identifying identical calls
+            make: a callable returning a new awaitable for the call
+
+        Returns:
+            the result of the call
+        """
+        loop = asyncio.get_running_loop()
+        call = self._calls.get(key)
+
+        if call is None or call.task.done() or call.task.get_loop() is not loop:
+            call = _Call(asyncio.ensure_future(make()))
+            self._calls[key] = call
+            call.task.add_done_callback(partial(self._forget, key, call))
+
+        call.waiters += 1
+        try:
+            result: T = await asyncio.shield(call.task)
+            return result
+        except asyncio.CancelledError:
+            if call.waiters == 1:
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call, task: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+        # mark the error as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,528 @@
+"""Module to contain the HTTP response and source result caches."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC
+from abc import abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+
+DEFAULT_TTL = 60 * 60
+DEFAULT_RESULT_TTL = 24 * 60 * 60
+DEFAULT_MAXSIZE = 1024
+IGNORED_PARAMS = frozenset({"api_key"})
+
+
+class CacheMode(str, Enum):
+    """How cached responses are used."""
+
+    USE = "use"
+    """Return cached responses and store new ones."""
+
+    BYPASS = "bypass"
+    """Neither read from nor write to the cache."""
+
+    REFRESH = "refresh"
+    """Ignore cached responses but store new ones."""
+
+
+_cache_mode: ContextVar[CacheMode] = ContextVar("cache_mode", default=CacheMode.USE)
+
+
+class CacheBackend(ABC):
+    """Base class for a string key-value store with expiry."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the value for a key if it exists and has not expired.
+
+        Args:
+            key: the cache key
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store a value against a key.
+
+        Args:
+            key: the cache key
+            value: the value to store
+            ttl: an optional number of seconds after which the value expires
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a key.
+
+        Args:
+            key: the cache key
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all keys."""
+
+
+class MemoryCache(CacheBackend):
+    """An in-memory least recently used cache with expiry."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        """Initialize the cache.
+
+        Args:
+            maxsize: the maximum number of entries to hold before the least recently
+                used entry is evicted
+        """
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, Tuple[Optional[float], str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of entries, including any which have expired."""
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value for a key if it exists and has not expired.
+
+        Args:
+            key: the cache key
+
+        Returns:
+            the value if found
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store a value against a key.
+
+        Args:
+            key: the cache key
+            value: the value to store
+            ttl: an optional number of seconds after which the value expires
+        """
+        expires_at = None if ttl is None else time.monotonic() + ttl
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove a key.
+
+        Args:
+            key: the cache key
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all keys."""
+        with self._lock:
+            self._data.clear()
+
+
+class SqliteCache(CacheBackend):
+    """An on-disk cache backed by SQLite."""
+
+    def __init__(self, path: str, table: str = "http_cache") -> None:
+        """Initialize the cache, creating the database if it doesn't exist.
+
+        Args:
+            path: the path to the SQLite database file
+            table: the name of the table to store entries in
+
+        Raises:
+            ValueError: if `table` is not a valid table name
+        """
+        if not table.isidentifier():
+            raise ValueError(f"{table} is not a valid table name")
+
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value for a key if it exists and has not expired.
+
+        Args:
+            key: the cache key
+
+        Returns:
+            the value if found
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?",  # noqa: S608
+                (key,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+
+        return str(value)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store a value against a key.
+
+        Args:
+            key: the cache key
+            value: the value to store
+            ttl: an optional number of seconds after which the value expires
+        """
+        expires_at = None if ttl is None else time.time() + ttl
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?)",  # noqa: S608
+                (key, value, expires_at),
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove a key.
+
+        Args:
+            key: the cache key
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key = ?", (key,)  # noqa: S608
+            )
+
+    def clear(self) -> None:
+        """Remove all keys."""
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")  # noqa: S608
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+class HttpCache:
+    """Class to cache HTTP response bodies by method, url and params."""
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        default_ttl: Optional[float] = DEFAULT_TTL,
+        ttls: Optional[Dict[str, Optional[float]]] = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            backend: the backend to store responses in
+            default_ttl: the number of seconds for which a response is cached, `None`
+                means responses never expire
+            ttls: an optional mapping of source name to a ttl overriding the
+                `default_ttl` for that source, eg. `{"tmdb": 600}`
+        """
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+
+    def ttl_for(self, source: Optional[str] = None) -> Optional[float]:
+        """Return the ttl for a source.
+
+        Args:
+            source: an optional source name
+
+        Returns:
+            the number of seconds for which a response is cached
+        """
+        if source is not None and source in self.ttls:
+            return self.ttls[source]
+
+        return self.default_ttl
+
+    def get(
+        self, method: str, url: str, params: Optional[Mapping[str, Any]] = None
+    ) -> Optional[str]:
+        """Return a cached response body.
+
+        Args:
+            method: the HTTP method
+            url: the request url
+            params: the optional query params of the request
+
+        Returns:
+            the response body if cached and the current `CacheMode` allows reads
+        """
+        if _cache_mode.get() is not CacheMode.USE:
+            return None
+
+        return self.backend.get(make_key(method, url, params))
+
+    def set(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        body: str,
+        source: Optional[str] = None,
+    ) -> None:
+        """Cache a response body.
+
+        Args:
+            method: the HTTP method
+            url: the request url
+            params: the optional query params of the request
+            body: the response body
+            source: the optional source name, used to look up the ttl
+        """
+        if _cache_mode.get() is CacheMode.BYPASS:
+            return
+
+        self.backend.set(make_key(method, url, params), body, self.ttl_for(source))
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self.backend.clear()
+
+
+class ResultCache:
+    """Class to cache the extracted data of a source by its search terms."""
+
+    def __init__(
+        self, backend: CacheBackend, ttl: Optional[float] = DEFAULT_RESULT_TTL
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            backend: the backend to store results in
+            ttl: the number of seconds for which a result is cached, `None` means
+                results never expire
+        """
+        self.backend = backend
+        self.ttl = ttl
+
+    def get(
+        self,
+        source: str,
+        title: Optional[str] = None,
+        year: Optional[int] = None,
+        movie_id: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached result.
+
+        Args:
+            source: the source name
+            title: the title searched for
+            year: the year searched for
+            movie_id: the source id searched for
+
+        Returns:
+            the result if cached and the current `CacheMode` allows reads
+        """
+        if _cache_mode.get() is not CacheMode.USE:
+            return None
+
+        cached = self.backend.get(make_result_key(source, title, year, movie_id))
+        if cached is None:
+            return None
+
+        result: Dict[str, Any] = json.loads(cached)
+        return result
+
+    def set(
+        self,
+        source: str,
+        result: Dict[str, Any],
+        title: Optional[str] = None,
+        year: Optional[int] = None,
+        movie_id: Optional[str] = None,
+    ) -> None:
+        """Cache a result.
+
+        Args:
+            source: the source name
+            result: the JSON serializable result, as returned by `to_dict` on a source
+            title: the title searched for
+            year: the year searched for
+            movie_id: the source id searched for
+        """
+        if _cache_mode.get() is CacheMode.BYPASS:
+            return
+
+        self.backend.set(
+            make_result_key(source, title, year, movie_id),
+            json.dumps(result, separators=(",", ":")),
+            self.ttl,
+        )
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        self.backend.clear()
+
+
+_http_cache: Optional[HttpCache] = None
+_result_cache: Optional[ResultCache] = None
+
+
+def configure_http_cache(
+    backend: Optional[CacheBackend] = None,
+    default_ttl: Optional[float] = DEFAULT_TTL,
+    ttls: Optional[Dict[str, Optional[float]]] = None,
+) -> HttpCache:
+    """Enable caching of HTTP responses for all sources.
+
+    Args:
+        backend: the backend to store responses in, defaults to a `MemoryCache`
+        default_ttl: the number of seconds for which a response is cached
+        ttls: an optional mapping of source name to a ttl overriding the
+            `default_ttl` for that source, eg. `{"mtc": 86400}`
+
+    Returns:
+        HttpCache: the configured cache
+    """
+    global _http_cache
+    _http_cache = HttpCache(
+        backend=backend or MemoryCache(), default_ttl=default_ttl, ttls=ttls
+    )
+    return _http_cache
+
+
+def disable_http_cache() -> None:
+    """Disable caching of HTTP responses."""
+    global _http_cache
+    _http_cache = None
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """Return the configured HTTP cache.
+
+    Returns:
+        Optional[HttpCache]: the cache if one has been configured
+    """
+    return _http_cache
+
+
+def configure_result_cache(
+    backend: Optional[CacheBackend] = None,
+    ttl: Optional[float] = DEFAULT_RESULT_TTL,
+) -> ResultCache:
+    """Enable caching of the extracted data of every source.
+
+    Args:
+        backend: the backend to store results in, defaults to a `MemoryCache`
+        ttl: the number of seconds for which a result is cached
+
+    Returns:
+        ResultCache: the configured cache
+    """
+    global _result_cache
+    _result_cache = ResultCache(backend=backend or MemoryCache(), ttl=ttl)
+    return _result_cache
+
+
+def disable_result_cache() -> None:
+    """Disable caching of source results."""
+    global _result_cache
+    _result_cache = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Return the configured result cache.
+
+    Returns:
+        Optional[ResultCache]: the cache if one has been configured
+    """
+    return _result_cache
+
+
+@contextmanager
+def cache_mode(mode: CacheMode) -> Iterator[None]:
+    """Set how cached responses are used for requests made within the context.
+
+    The mode applies to the current thread or asyncio task and any tasks created
+    within the context.
+
+    Args:
+        mode: the `CacheMode` to use, eg. `CacheMode.REFRESH`
+
+    Yields:
+        None
+    """
+    token = _cache_mode.set(CacheMode(mode))
+    try:
+        yield
+    finally:
+        _cache_mode.reset(token)
+
+
+def make_key(method: str, url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Return a cache key for a request.
+
+    Params with a value of `None` and credentials such as `api_key` are ignored.
+
+    Args:
+        method: the HTTP method
+        url: the request url
+        params: the optional query params of the request
+
+    Returns:
+        str: the cache key
+    """
+    items = sorted(
+        (str(key), str(value))
+        for key, value in (params or {}).items()
+        if value is not None and key not in IGNORED_PARAMS
+    )
+    raw = json.dumps([method.upper(), url, items])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def make_result_key(
+    source: str,
+    title: Optional[str] = None,
+    year: Optional[int] = None,
+    movie_id: Optional[str] = None,
+) -> str:
+    """Return a cache key for the result of a source search.
+
+    Titles are compared ignoring case and surrounding whitespace.
+
+    Args:
+        source: the source name
+        title: the title searched for
+        year: the year searched for
+        movie_id: the source id searched for
+
+    Returns:
+        str: the cache key
+    """
+    normalized_title = title.strip().lower() if title else None
+    return json.dumps(["result", source, normalized_title, year, movie_id])
@@ -0,0 +1,241 @@
+"""Module to contain the executors used to keep work off the event loop."""
+import asyncio
+import threading
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import TypedDict
+from typing import TypeVar
+
+DEFAULT_IMDB_WORKERS = 8
+
+T = TypeVar("T")
+
+
+class ExecutorMetrics(TypedDict):
+    """A snapshot of the work submitted to a `MeteredExecutor`."""
+
+    max_workers: int
+    submitted: int
+    completed: int
+    failed: int
+    in_flight: int
+    queue_depth: int
+    max_queue_depth: int
+
+
+class MeteredExecutor(Executor):
+    """Wrap an executor to count the work submitted to it.
+
+    The queue depth is the number of submitted calls waiting for a free worker, ie. the
+    number of calls in flight beyond `max_workers`.
+    """
+
+    def __init__(self, executor: Executor, max_workers: int) -> None:
+        """Initialize the executor.
+
+        Args:
+            executor: the executor which runs the work
+            max_workers: the number of workers of `executor`
+        """
+        self.executor = executor
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._max_queue_depth = 0
+
+    def submit(  # type: ignore[override]
+        self, fn: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> "Future[T]":
+        """Submit a call to the wrapped executor.
+
+        Args:
+            fn: the callable
+            *args: the positional arguments for the callable
+            **kwargs: the keyword arguments for the callable
+
+        Returns:
+            a `Future` for the result of the call
+        """
+        with self._lock:
+            self._submitted += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue_depth())
+
+        future = self.executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._record_done)
+        return future
+
+    def shutdown(self, wait: bool = True, **kwargs: Any) -> None:
+        """Shut down the wrapped executor.
+
+        Args:
+            wait: whether to wait for pending calls to finish
+            **kwargs: any other keyword arguments for the wrapped `shutdown`
+        """
+        self.executor.shutdown(wait=wait, **kwargs)
+
+    def metrics(self) -> ExecutorMetrics:
+        """Return a snapshot of the work submitted to the executor.
+
+        Returns:
+            ExecutorMetrics: the current metrics
+        """
+        with self._lock:
+            return ExecutorMetrics(
+                max_workers=self.max_workers,
+                submitted=self._submitted,
+                completed=self._completed,
+                failed=self._failed,
+                in_flight=self._in_flight(),
+                queue_depth=self._queue_depth(),
+                max_queue_depth=self._max_queue_depth,
+            )
+
+    def _record_done(self, future: "Future[Any]") -> None:
+        with self._lock:
+            self._completed += 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+
+    def _in_flight(self) -> int:
+        return self._submitted - self._completed
+
+    def _queue_depth(self) -> int:
+        return max(self._in_flight() - self.max_workers, 0)
+
+
+_parse_executor: Optional[Executor] = None
+_imdb_executor: Optional[MeteredExecutor] = None
+
+
+def configure_parse_executor(
+    executor: Optional[Executor] = None, max_workers: Optional[int] = None
+) -> Executor:
+    """Parse scraped pages in an executor rather than on the event loop.
+
+    Only the page body is sent to the executor and only the small extracted result is
+    sent back, so a `ProcessPoolExecutor` can be used to parse in parallel without
+    blocking the event loop. Any previously configured executor is not shut down.
+
+    Args:
+        executor: an optional `concurrent.futures.Executor`, eg. a
+            `ThreadPoolExecutor`. Defaults to a `ProcessPoolExecutor`.
+        max_workers: the number of workers for the default `ProcessPoolExecutor`.
+            Ignored if an `executor` is given.
+
+    Returns:
+        the configured executor
+    """
+    global _parse_executor
+    _parse_executor = executor or ProcessPoolExecutor(max_workers=max_workers)
+    return _parse_executor
+
+
+def disable_parse_executor(shutdown: bool = True) -> None:
+    """Parse scraped pages on the event loop again.
+
+    Args:
+        shutdown: whether to shut down the configured executor
+    """
+    global _parse_executor
+
+    if _parse_executor is not None and shutdown:
+        _parse_executor.shutdown()
+
+    _parse_executor = None
+
+
+def get_parse_executor() -> Optional[Executor]:
+    """Return the configured parse executor.
+
+    Returns:
+        the configured executor or `None` if pages are parsed on the event loop
+    """
+    return _parse_executor
+
+
+async def run_parser(func: Callable[..., T], *args: Any) -> T:
+    """Run a parsing function in the parse executor if one is configured.
+
+    When using a `ProcessPoolExecutor` the function must be defined at the module level
+    and its arguments and return value must be picklable.
+
+    Args:
+        func: the parsing function
+        *args: the positional arguments for the function
+
+    Returns:
+        the return value of the function
+    """
+    if _parse_executor is None:
+        return func(*args)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_parse_executor, func, *args)
+
+
+def configure_imdb_executor(
+    executor: Optional[Executor] = None,
+    max_workers: int = DEFAULT_IMDB_WORKERS,
+    processes: bool = False,
+) -> MeteredExecutor:
+    """Run IMDb lookups in a dedicated executor.
+
+    IMDb data is fetched with blocking calls, which by default run in the event loop's
+    default executor alongside any other blocking work. A dedicated executor lets IMDb
+    lookups be sized independently. Any previously configured executor is not shut
+    down.
+
+    Args:
+        executor: an optional `concurrent.futures.Executor`. Defaults to a
+            `ThreadPoolExecutor`, or a `ProcessPoolExecutor` if `processes` is set.
+        max_workers: the number of workers for the default executor, or the number of
+            workers of the given `executor`, used to measure the queue depth
+        processes: whether the default executor should use processes
+            rather than threads
+
+    Returns:
+        the configured executor, wrapped to record metrics
+    """
+    global _imdb_executor
+
+    if executor is None:
+        executor = (
+            ProcessPoolExecutor(max_workers=max_workers)
+            if processes
+            else ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="phylm-imdb"
+            )
+        )
+
+    _imdb_executor = MeteredExecutor(executor, max_workers=max_workers)
+    return _imdb_executor
+
+
+def disable_imdb_executor(shutdown: bool = True) -> None:
+    """Run IMDb lookups in the event loop's default executor again.
+
+    Args:
+        shutdown: whether to shut down the configured executor
+    """
+    global _imdb_executor
+
+    if _imdb_executor is not None and shutdown:
+        _imdb_executor.shutdown()
+
+    _imdb_executor = None
+
+
+def get_imdb_executor() -> Optional[MeteredExecutor]:
+    """Return the configured IMDb executor.
+
+    Returns:
+        the configured executor or `None` if the default executor is used
+    """
+    return _imdb_executor
@@ -0,0 +1,318 @@
+"""Module to contain the scoring of search results against the searched title and year.
+
+A result is scored from 0 to 1 by combining:
+
+- the similarity of the titles, the mean of the token set ratio and the trigram ratio
+  of the normalised titles, both Sørensen-Dice coefficients
+- the distance between the years, scoring 1 for the same year and nothing for
+  `YEAR_TOLERANCE` or more years apart, only if a year is searched for
+- whether the result is a movie, if its kind is known
+
+The sources still select their result by year, then title, and finally the first
+result, with the `low_confidence` flag; the score is only reported alongside it.
+
+Scoring many results at once with `score_batch` is vectorised with NumPy if it's
+installed, otherwise the same scores are computed in pure Python.
+"""
+from typing import TYPE_CHECKING
+from typing import Dict
+from typing import FrozenSet
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from phylm.utils.title_index import normalize_title
+from phylm.utils.title_index import trigrams
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover
+    HAS_NUMPY = False
+
+TITLE_WEIGHT = 0.7
+YEAR_WEIGHT = 0.2
+KIND_WEIGHT = 0.1
+YEAR_TOLERANCE = 3
+MOVIE_KINDS = ("movie",)
+
+
+class Candidate(NamedTuple):
+    """A search result to score."""
+
+    title: Optional[str]
+    year: Optional[int] = None
+    kind: Optional[str] = None
+
+
+Query = Tuple[str, Optional[int]]
+_Features = Tuple[FrozenSet[str], FrozenSet[str]]
+
+
+def score_match(title: str, year: Optional[int], candidate: Candidate) -> float:
+    """Score a search result against the searched title and year.
+
+    Args:
+        title: the searched title
+        year: the searched year, if any
+        candidate: the search result
+
+    Returns:
+        float: the score, from 0 to 1 for the same title and year
+    """
+    return score_candidates(title, year, [candidate])[0]
+
+
+def score_candidates(
+    title: str, year: Optional[int], candidates: Sequence[Candidate]
+) -> List[float]:
+    """Score the results of a search against the searched title and year.
+
+    Args:
+        title: the searched title
+        year: the searched year, if any
+        candidates: the search results
+
+    Returns:
+        List[float]: the score of each result
+    """
+    return score_batch([(title, year)], [candidates])[0]
+
+
+def score_batch(
+    queries: Sequence[Query],
+    candidates: Sequence[Sequence[Candidate]],
+    use_numpy: Optional[bool] = None,
+) -> List[List[float]]:
+    """Score the results of many searches at once.
+
+    Args:
+        queries: the searched title and year of each search
+        candidates: the results of each search, in the same order as `queries`
+        use_numpy: whether to use NumPy. Defaults to using it if it's installed.
+
+    Raises:
+        ValueError: if the numbers of queries and lists of candidates differ, or NumPy
+            is requested but not installed
+
+    Returns:
+        List[List[float]]: the score of each result of each search
+    """
+    if len(queries) != len(candidates):
+        raise ValueError("There must be a list of candidates for each query")
+
+    if use_numpy is None:
+        use_numpy = HAS_NUMPY
+    elif use_numpy and not HAS_NUMPY:
+        raise ValueError("NumPy is not installed")
+
+    pairs = [
+        (query, candidate)
+        for query, query_candidates in zip(queries, candidates)
+        for candidate in query_candidates
+    ]
+    flat = _score_pairs_numpy(pairs) if use_numpy else _score_pairs(pairs)
+
+    scores = []
+    start = 0
+    for query_candidates in candidates:
+        scores.append(flat[start : start + len(query_candidates)])
+        start += len(query_candidates)
+
+    return scores
+
+
+def _features(title: Optional[str], cache: Dict[Optional[str], _Features]) -> _Features:
+    """Return the tokens and trigrams of a title once normalised.
+
+    Args:
+        title: the title
+        cache: the features of the titles already seen
+
+    Returns:
+        the tokens and the trigrams of the title
+    """
+    if title not in cache:
+        key = normalize_title(title or "")
+        cache[title] = (frozenset(key.split()), frozenset(trigrams(key)))
+
+    return cache[title]
+
+
+def _dice(shared: int, left: int, right: int) -> float:
+    return 2 * shared / (left + right) if left + right else 0.0
+
+
+def _year_score(year: Optional[int], candidate_year: Optional[int]) -> float:
+    if candidate_year is None:
+        return 0.0
+
+    return max(0.0, 1 - abs(year - candidate_year) / YEAR_TOLERANCE) if year else 0.0
+
+
+def _combine(
+    title_score: float, year: Optional[int], year_score: float, kind: Optional[str]
+) -> float:
+    """Combine the parts of a score, leaving out those which are unknown.
+
+    Args:
+        title_score: the similarity of the titles
+        year: the searched year, if any
+        year_score: the closeness of the years
+        kind: the kind of the result, if known
+
+    Returns:
+        float: the score
+    """
+    score = TITLE_WEIGHT * title_score
+    total = TITLE_WEIGHT
+
+    if year:
+        score += YEAR_WEIGHT * year_score
+        total += YEAR_WEIGHT
+
+    if kind is not None:
+        score += KIND_WEIGHT * (kind in MOVIE_KINDS)
+        total += KIND_WEIGHT
+
+    return score / total
+
+
+def _score_pairs(pairs: Sequence[Tuple[Query, Candidate]]) -> List[float]:
+    """Score each search result in pure Python.
+
+    Args:
+        pairs: the searched title and year with each search result
+
+    Returns:
+        List[float]: the score of each result
+    """
+    cache: Dict[Optional[str], _Features] = {}
+    scores = []
+
+    for (title, year), candidate in pairs:
+        tokens, grams = _features(title, cache)
+        candidate_tokens, candidate_grams = _features(candidate.title, cache)
+        title_score = (
+            _dice(len(tokens & candidate_tokens), len(tokens), len(candidate_tokens))
+            + _dice(len(grams & candidate_grams), len(grams), len(candidate_grams))
+        ) / 2
+        scores.append(
+            _combine(
+                title_score,
+                year,
+                _year_score(year, candidate.year),
+                candidate.kind,
+            )
+        )
+
+    return scores
+
+
+def _score_pairs_numpy(pairs: Sequence[Tuple[Query, Candidate]]) -> List[float]:
+    """Score each search result with NumPy.
+
+    The titles are turned into arrays of feature ids once each. The features shared by
+    each pair of titles are then counted all at once by sorting the pairs' features,
+    keyed by pair, and counting the keys which appear twice.
+
+    Args:
+        pairs: the searched title and year with each search result
+
+    Returns:
+        List[float]: the score of each result
+    """
+    if not pairs:
+        return []
+
+    cache: Dict[Optional[str], _Features] = {}
+    vocabulary: Dict[str, int] = {}
+    arrays: Dict[Optional[str], Tuple[NDArray[np.int64], NDArray[np.int64]]] = {}
+
+    def encode(title: Optional[str]) -> Tuple["NDArray[np.int64]", "NDArray[np.int64]"]:
+        if title not in arrays:
+            tokens, grams = _features(title, cache)
+            arrays[title] = (
+                np.array(
+                    [vocabulary.setdefault(f"t:{t}", len(vocabulary)) for t in tokens],
+                    dtype=np.int64,
+                ),
+                np.array(
+                    [vocabulary.setdefault(f"g:{g}", len(vocabulary)) for g in grams],
+                    dtype=np.int64,
+                ),
+            )
+        return arrays[title]
+
+    left = [encode(title) for (title, _), _ in pairs]
+    right = [encode(candidate.title) for _, candidate in pairs]
+
+    title_scores = (
+        _dice_numpy(
+            [ids[0] for ids in left], [ids[0] for ids in right], len(vocabulary)
+        )
+        + _dice_numpy(
+            [ids[1] for ids in left], [ids[1] for ids in right], len(vocabulary)
+        )
+    ) / 2
+
+    years = np.array([year or 0 for (_, year), _ in pairs], dtype=np.float64)
+    candidate_years = np.array(
+        [np.nan if c.year is None else c.year for _, c in pairs], dtype=np.float64
+    )
+    year_scores = np.nan_to_num(
+        np.clip(1 - np.abs(years - candidate_years) / YEAR_TOLERANCE, 0, 1)
+    )
+    has_year = years > 0
+    kinds = [candidate.kind for _, candidate in pairs]
+    has_kind = np.array([kind is not None for kind in kinds])
+    is_movie = np.array([kind in MOVIE_KINDS for kind in kinds])
+
+    scores = (
+        TITLE_WEIGHT * title_scores
+        + YEAR_WEIGHT * year_scores * has_year
+        + KIND_WEIGHT * is_movie * has_kind
+    ) / (TITLE_WEIGHT + YEAR_WEIGHT * has_year + KIND_WEIGHT * has_kind)
+
+    return [float(score) for score in scores]
+
+
+def _dice_numpy(
+    left: List["NDArray[np.int64]"],
+    right: List["NDArray[np.int64]"],
+    size: int,
+) -> "NDArray[np.float64]":
+    """Return the Sørensen-Dice coefficient of each pair of feature id arrays.
+
+    Args:
+        left: the unique feature ids of the first of each pair
+        right: the unique feature ids of the second of each pair
+        size: the number of distinct feature ids
+
+    Returns:
+        the coefficient of each pair
+    """
+    left_sizes = np.array([len(ids) for ids in left], dtype=np.int64)
+    right_sizes = np.array([len(ids) for ids in right], dtype=np.int64)
+    pair_ids = np.arange(len(left), dtype=np.int64)
+
+    keys = np.sort(
+        np.concatenate(
+            [
+                np.repeat(pair_ids, left_sizes) * size + np.concatenate(left),
+                np.repeat(pair_ids, right_sizes) * size + np.concatenate(right),
+            ]
+        )
+    )
+    shared = np.bincount(
+        keys[1:][keys[1:] == keys[:-1]] // size, minlength=len(left)
+    ).astype(np.float64)
+    totals = (left_sizes + right_sizes).astype(np.float64)
+
+    return np.divide(2 * shared, totals, out=np.zeros_like(totals), where=totals > 0)
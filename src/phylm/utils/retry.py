@@ -0,0 +1,287 @@
+"""Module to contain the timeouts, retries and hedging of requests per source."""
+import asyncio
+import math
+import random
+import threading
+from collections import deque
+from typing import Awaitable
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+from phylm.utils.throttle import parse_retry_after
+
+DEFAULT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+T = TypeVar("T")
+
+
+class RequestPolicy:
+    """The timeouts, retries and hedging of the requests made for a source.
+
+    Failed attempts are retried after a jittered exponential backoff: a random delay of
+    up to `backoff * 2 ** attempt` seconds, capped at `max_backoff`, or the response's
+    `Retry-After` if that's longer. With `hedge` set, a duplicate request is made if
+    the first hasn't responded after `hedge_after` seconds, or after the 95th
+    percentile of the source's recent latencies if it isn't given, and whichever
+    responds first is used.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        retries: int = 0,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        retry_statuses: Tuple[int, ...] = DEFAULT_RETRY_STATUSES,
+        hedge: bool = False,
+        hedge_after: Optional[float] = None,
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            timeout: the total number of seconds allowed for each attempt
+            connect_timeout: the number of seconds allowed to connect to the host
+            read_timeout: the number of seconds allowed between reads of the response
+            retries: the number of times to retry a failed attempt
+            backoff: the base number of seconds to back off for between attempts
+            max_backoff: the maximum number of seconds to back off for
+            retry_statuses: the response statuses which are retried
+            hedge: whether to make a duplicate request when the first is slow
+            hedge_after: the number of seconds after which to make the duplicate
+                request. Defaults to the 95th percentile of recent latencies.
+
+        Raises:
+            ValueError: if `retries` is negative
+        """
+        if retries < 0:
+            raise ValueError("`retries` must not be negative")
+
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = retry_statuses
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+
+    def backoff_for(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Return the number of seconds to wait before retrying.
+
+        Args:
+            attempt: the number of the failed attempt, starting at 0
+            retry_after: the value of the `Retry-After` header of the failed response
+
+        Returns:
+            float: the number of seconds
+        """
+        cap = min(self.backoff * 2**attempt, self.max_backoff)
+        delay = random.uniform(0, cap)  # noqa: S311
+        requested = parse_retry_after(retry_after)
+
+        return max(delay, requested) if requested is not None else delay
+
+
+class LatencyTracker:
+    """Keep a rolling window of the latencies of successful requests."""
+
+    def __init__(self, size: int = LATENCY_WINDOW) -> None:
+        """Initialize the tracker.
+
+        Args:
+            size: the number of recent latencies to keep
+        """
+        self._latencies: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of latencies recorded."""
+        return len(self._latencies)
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of a request.
+
+        Args:
+            seconds: the latency
+        """
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return a quantile of the recorded latencies.
+
+        Args:
+            q: the quantile, between 0 and 1
+
+        Returns:
+            Optional[float]: the latency, or `None` if none have been recorded
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        if not latencies:
+            return None
+
+        return latencies[max(math.ceil(q * len(latencies)) - 1, 0)]
+
+
+class RequestPolicies:
+    """Keep the `RequestPolicy` and recent latencies for each source."""
+
+    def __init__(
+        self,
+        default: Optional[RequestPolicy] = None,
+        sources: Optional[Dict[str, RequestPolicy]] = None,
+    ) -> None:
+        """Initialize the policies.
+
+        Args:
+            default: the policy for sources without their own. Defaults to a policy
+                without timeouts, retries or hedging.
+            sources: an optional mapping of source name to policy, eg.
+                `{"rt": RequestPolicy(timeout=5, retries=2)}`
+        """
+        self.default = default or RequestPolicy()
+        self.sources = sources or {}
+        self._latencies: Dict[Optional[str], LatencyTracker] = {}
+        self._lock = threading.Lock()
+
+    def for_source(self, source: Optional[str] = None) -> RequestPolicy:
+        """Return the policy for a source.
+
+        Args:
+            source: the source name
+
+        Returns:
+            RequestPolicy: the source's policy, or the default
+        """
+        if source is None:
+            return self.default
+
+        return self.sources.get(source, self.default)
+
+    def latencies(self, source: Optional[str] = None) -> LatencyTracker:
+        """Return the recent latencies of a source.
+
+        Args:
+            source: the source name
+
+        Returns:
+            LatencyTracker: the source's latencies
+        """
+        with self._lock:
+            if source not in self._latencies:
+                self._latencies[source] = LatencyTracker()
+
+            return self._latencies[source]
+
+    def hedge_delay(self, source: Optional[str] = None) -> Optional[float]:
+        """Return the number of seconds after which to hedge a request.
+
+        Args:
+            source: the source name
+
+        Returns:
+            Optional[float]: the number of seconds, or `None` if the request shouldn't
+                be hedged, either because hedging isn't enabled or because too few
+                latencies have been recorded to estimate the 95th percentile
+        """
+        policy = self.for_source(source)
+
+        if not policy.hedge:
+            return None
+
+        if policy.hedge_after is not None:
+            return policy.hedge_after
+
+        latencies = self.latencies(source)
+
+        if len(latencies) < HEDGE_MIN_SAMPLES:
+            return None
+
+        return latencies.quantile(HEDGE_QUANTILE)
+
+
+async def hedged(make: Callable[[], Awaitable[T]], delay: Optional[float]) -> T:
+    """Await a request, duplicating it if it hasn't finished after `delay` seconds.
+
+    The result of whichever request succeeds first is returned and the other is
+    cancelled. If both fail the error of the first is raised.
+
+    Args:
+        make: a callable returning a new awaitable for the request
+        delay: the number of seconds after which to duplicate the request, or `None`
+            to never duplicate it
+
+    Returns:
+        the result of the request
+    """
+    if delay is None:
+        return await make()
+
+    first = asyncio.ensure_future(make())
+    tasks = {first}
+
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            tasks.add(asyncio.ensure_future(make()))
+
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+
+        return first.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+_request_policies: Optional[RequestPolicies] = None
+
+
+def configure_request_policies(
+    default: Optional[RequestPolicy] = None,
+    sources: Optional[Dict[str, RequestPolicy]] = None,
+) -> RequestPolicies:
+    """Apply timeouts, retries and hedging to the requests made by the sources.
+
+    Args:
+        default: the policy for sources without their own. Defaults to a policy
+            without timeouts, retries or hedging.
+        sources: an optional mapping of source name to policy, eg.
+            `{"rt": RequestPolicy(timeout=5, retries=2)}`
+
+    Returns:
+        the configured `RequestPolicies`
+    """
+    global _request_policies
+    _request_policies = RequestPolicies(default=default, sources=sources)
+    return _request_policies
+
+
+def disable_request_policies() -> None:
+    """Make requests without timeouts, retries or hedging again."""
+    global _request_policies
+    _request_policies = None
+
+
+def get_request_policies() -> Optional[RequestPolicies]:
+    """Return the configured request policies.
+
+    Returns:
+        the configured `RequestPolicies` or `None` if none are configured
+    """
+    return _request_policies
@@ -0,0 +1,336 @@
+"""Module to contain the client side rate limiting of requests per host."""
+import asyncio
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque
+from typing import Dict
+from typing import Optional
+from urllib.parse import urlparse
+
+DEFAULT_RATE = 5.0
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_BACKOFF = 1.0
+THROTTLED_STATUSES = (429, 503)
+DECREASE_FACTOR = 0.5
+
+
+class HostThrottle:
+    """Limit the rate and concurrency of requests to a single host.
+
+    Requests are rate limited through a token bucket which refills at `rate` tokens a
+    second up to `burst` tokens. The number of concurrent requests is adapted with
+    additive increase, multiplicative decrease (AIMD): every successful response raises
+    the limit by roughly one per round of requests, up to `max_concurrency`, and every
+    throttled response (429 or 503) halves it, down to `min_concurrency`. A throttled
+    response also pauses all requests to the host until its `Retry-After` has passed,
+    or for `backoff` seconds if it has none.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: Optional[int] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        min_concurrency: int = 1,
+        backoff: float = DEFAULT_BACKOFF,
+    ) -> None:
+        """Initialize the throttle.
+
+        Args:
+            rate: the sustained number of requests a second
+            burst: the maximum number of requests which can be made at once after a
+                quiet period. Defaults to `max_concurrency`.
+            max_concurrency: the maximum number of concurrent requests
+            min_concurrency: the minimum number of concurrent requests
+            backoff: the number of seconds to pause for after a throttled response
+                without a `Retry-After` header
+
+        Raises:
+            ValueError: if `rate` isn't positive or the concurrency limits are invalid
+        """
+        if rate <= 0:
+            raise ValueError("`rate` must be positive")
+
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError(
+                "`min_concurrency` must be at least 1 and at most `max_concurrency`"
+            )
+
+        self.rate = rate
+        self.burst = burst or max_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.backoff = backoff
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._waiters: Deque[asyncio.Future[None]] = deque()
+
+    async def acquire(self) -> None:
+        """Wait until a request can be made to the host.
+
+        Every call must be followed by a call to `release` once the response has been
+        received.
+        """
+        while True:
+            with self._lock:
+                wait = self._blocked_for()
+                if not wait and self.in_flight < int(self.limit):
+                    wait = self._take_token()
+                    if not wait:
+                        self.in_flight += 1
+                        return
+
+            if wait:
+                await asyncio.sleep(wait)
+                continue
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                self._wake()
+                raise
+
+    def release(
+        self, status: Optional[int] = None, retry_after: Optional[str] = None
+    ) -> None:
+        """Release a request made after `acquire` and adapt to its response.
+
+        Args:
+            status: the response status, or `None` if no response was received
+            retry_after: the value of the `Retry-After` header of the response
+        """
+        with self._lock:
+            self.in_flight -= 1
+            self._record(status, retry_after)
+
+        self._wake()
+
+    def wait(self) -> None:
+        """Block until a request can be made to the host.
+
+        Used for synchronous requests, which are rate limited but not counted towards
+        the concurrency limit. Should be followed by a call to `record`.
+        """
+        while True:
+            with self._lock:
+                wait = self._blocked_for() or self._take_token()
+
+            if not wait:
+                return
+
+            time.sleep(wait)
+
+    def record(
+        self, status: Optional[int] = None, retry_after: Optional[str] = None
+    ) -> None:
+        """Adapt to the response of a request made after `wait`.
+
+        Args:
+            status: the response status, or `None` if no response was received
+            retry_after: the value of the `Retry-After` header of the response
+        """
+        with self._lock:
+            self._record(status, retry_after)
+
+        self._wake()
+
+    def _record(self, status: Optional[int], retry_after: Optional[str]) -> None:
+        if status is None:
+            return
+
+        if status in THROTTLED_STATUSES:
+            self.limit = max(self.limit * DECREASE_FACTOR, self.min_concurrency)
+            delay = parse_retry_after(retry_after)
+            pause = self.backoff if delay is None else delay
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+            return
+
+        if status < 500:
+            self.limit = min(self.limit + 1 / self.limit, self.max_concurrency)
+
+    def _blocked_for(self) -> float:
+        return max(self.blocked_until - time.monotonic(), 0.0)
+
+    def _take_token(self) -> float:
+        """Take a token from the bucket if one is available.
+
+        Returns:
+            float: `0` if a token was taken, otherwise the seconds until one is
+                available
+        """
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._updated) * self.rate, self.burst)
+        self._updated = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        return (1 - self._tokens) / self.rate
+
+    def _wake(self) -> None:
+        """Wake as many waiting requests as there are free concurrency slots."""
+        free = int(self.limit) - self.in_flight
+
+        while self._waiters and free > 0:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.get_loop().call_soon_threadsafe(_set_result, waiter)
+                free -= 1
+
+
+def _set_result(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class RateLimiter:
+    """Keep a `HostThrottle` for every host requests are made to."""
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: Optional[int] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        min_concurrency: int = 1,
+        hosts: Optional[Dict[str, HostThrottle]] = None,
+    ) -> None:
+        """Initialize the rate limiter.
+
+        Args:
+            rate: the default sustained number of requests a second to each host
+            burst: the default maximum number of requests which can be made at once
+                to each host after a quiet period
+            max_concurrency: the default maximum number of concurrent requests to each
+                host
+            min_concurrency: the default minimum number of concurrent requests to each
+                host
+            hosts: an optional mapping of host name to `HostThrottle` to override the
+                defaults for that host, eg. `{"api.themoviedb.org": HostThrottle(40)}`
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.hosts: Dict[str, HostThrottle] = {
+            host.lower(): throttle for host, throttle in (hosts or {}).items()
+        }
+        self._lock = threading.Lock()
+
+    def for_host(self, host: str) -> HostThrottle:
+        """Return the throttle for a host, creating it with the defaults if needed.
+
+        Args:
+            host: the host name
+
+        Returns:
+            HostThrottle: the throttle for the host
+        """
+        host = host.lower()
+
+        with self._lock:
+            if host not in self.hosts:
+                self.hosts[host] = HostThrottle(
+                    rate=self.rate,
+                    burst=self.burst,
+                    max_concurrency=self.max_concurrency,
+                    min_concurrency=self.min_concurrency,
+                )
+
+            return self.hosts[host]
+
+    def for_url(self, url: str) -> HostThrottle:
+        """Return the throttle for the host of a url.
+
+        Args:
+            url: the url
+
+        Returns:
+            HostThrottle: the throttle for the host
+        """
+        return self.for_host(urlparse(url).netloc)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the number of seconds to wait from a `Retry-After` header.
+
+    Args:
+        value: the header value, either a number of seconds or a HTTP date
+
+    Returns:
+        Optional[float]: the number of seconds, or `None` if the value isn't valid
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+
+    if value.isdigit():
+        return float(value)
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+    return max(date.timestamp() - time.time(), 0.0)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def configure_rate_limiter(
+    rate: float = DEFAULT_RATE,
+    burst: Optional[int] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    min_concurrency: int = 1,
+    hosts: Optional[Dict[str, HostThrottle]] = None,
+) -> RateLimiter:
+    """Rate limit all the requests made by the sources and tools, per host.
+
+    Args:
+        rate: the default sustained number of requests a second to each host
+        burst: the default maximum number of requests which can be made at once to
+            each host after a quiet period. Defaults to `max_concurrency`.
+        max_concurrency: the default maximum number of concurrent requests to each host
+        min_concurrency: the default minimum number of concurrent requests to each host
+        hosts: an optional mapping of host name to `HostThrottle` to override the
+            defaults for that host
+
+    Returns:
+        the configured `RateLimiter`
+    """
+    global _rate_limiter
+    _rate_limiter = RateLimiter(
+        rate=rate,
+        burst=burst,
+        max_concurrency=max_concurrency,
+        min_concurrency=min_concurrency,
+        hosts=hosts,
+    )
+    return _rate_limiter
+
+
+def disable_rate_limiter() -> None:
+    """Disable rate limiting of requests."""
+    global _rate_limiter
+    _rate_limiter = None
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Return the configured rate limiter.
+
+    Returns:
+        the configured `RateLimiter` or `None` if requests aren't rate limited
+    """
+    return _rate_limiter
@@ -0,0 +1,367 @@
+"""Module to contain a local index of movie titles to resolve ids without searching.
+
+The index is an SQLite database holding each title once normalised, keyed together with
+its year, and the trigram postings of the titles for fuzzy matching. Opening it reads
+nothing up front, so an index of millions of titles is ready to use instantly.
+"""
+import re
+import sqlite3
+import threading
+import unicodedata
+from itertools import islice
+from pathlib import Path
+from types import TracebackType
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Type
+from typing import Union
+
+DEFAULT_MIN_SCORE = 0.5
+# a title which merely shares its first word with another scores around 0.5
+DEFAULT_RESOLVE_MIN_SCORE = 0.8
+DEFAULT_LIMIT = 10
+BATCH_SIZE = 10_000
+# keep well within SQLite's limit on the number of query parameters
+MAX_QUERY_TRIGRAMS = 500
+NON_ALPHANUMERIC_PATTERN = re.compile(r"[^0-9a-z]+")
+
+PathLike = Union[str, Path]
+
+SCHEMA = """
+CREATE TABLE titles (
+    id INTEGER PRIMARY KEY,
+    movie_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    key TEXT NOT NULL,
+    year INTEGER,
+    votes INTEGER NOT NULL,
+    grams INTEGER NOT NULL
+);
+CREATE TABLE trigrams (
+    trigram TEXT NOT NULL,
+    title INTEGER NOT NULL,
+    PRIMARY KEY (trigram, title)
+) WITHOUT ROWID;
+"""
+INDEXES = "CREATE INDEX titles_key_year ON titles (key, year);"
+
+
+def normalize_title(title: str) -> str:
+    """Normalise a title for lookups.
+
+    Accents are stripped, the title is lowercased and any runs of punctuation or
+    whitespace become a single space, eg. "Amélie: The Film" becomes "amelie the film".
+
+    Args:
+        title: the title
+
+    Returns:
+        str: the normalised title
+    """
+    decomposed = unicodedata.normalize("NFKD", title)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return NON_ALPHANUMERIC_PATTERN.sub(" ", stripped.lower()).strip()
+
+
+def trigrams(key: str) -> Set[str]:
+    """Return the trigrams of a normalised title.
+
+    The title is padded so that short titles and the start and end of the title have
+    trigrams of their own, eg. "alien" has "  a", " al", "ali", "lie", "ien" and "en ".
+
+    Args:
+        key: the normalised title
+
+    Returns:
+        Set[str]: the trigrams
+    """
+    if not key:
+        return set()
+
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleEntry(NamedTuple):
+    """A title to add to the index."""
+
+    movie_id: str
+    title: str
+    year: Optional[int] = None
+    votes: int = 0
+    """The popularity of the movie, used to order otherwise equal matches."""
+
+
+class TitleMatch(NamedTuple):
+    """A title found in the index."""
+
+    movie_id: str
+    title: str
+    year: Optional[int]
+    score: float
+    """The similarity of the titles, from 0 to 1 for an exact match."""
+
+
+class TitleIndex:
+    """A read-only index of titles built with `TitleIndex.build`."""
+
+    def __init__(self, path: PathLike) -> None:
+        """Open the index.
+
+        Args:
+            path: the path to the SQLite database file
+
+        Raises:
+            ValueError: if the file isn't a title index
+        """
+        self.path = Path(path)
+
+        if not self.path.is_file():
+            raise ValueError(f"{self.path} is not a title index")
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+        )
+
+    @classmethod
+    def build(cls, path: PathLike, entries: Iterable[TitleEntry]) -> "TitleIndex":
+        """Build an index of titles, replacing any index at `path`.
+
+        Args:
+            path: the path to the SQLite database file
+            entries: the titles to index. A movie can be added under several titles,
+                eg. its original title as well.
+
+        Returns:
+            TitleIndex: the opened index
+        """
+        index_path = Path(path)
+        index_path.unlink(missing_ok=True)
+
+        conn = sqlite3.connect(index_path)
+        try:
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.executescript(SCHEMA)
+
+            rows = _rows(entries)
+            while True:
+                batch = list(islice(rows, BATCH_SIZE))
+                if not batch:
+                    break
+                conn.executemany(
+                    "INSERT INTO titles VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (row for row, _ in batch),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO trigrams VALUES (?, ?)",
+                    ((gram, row[0]) for row, grams in batch for gram in grams),
+                )
+
+            conn.executescript(INDEXES)
+            conn.commit()
+        finally:
+            conn.close()
+
+        return cls(index_path)
+
+    def __len__(self) -> int:
+        """Return the number of titles in the index."""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM titles").fetchone()
+
+        return int(count)
+
+    def __enter__(self) -> "TitleIndex":
+        """Return the index to use in a `with` block.
+
+        Returns:
+            the index
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        """Close the index at the end of a `with` block."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def lookup(self, title: str, year: Optional[int] = None) -> List[TitleMatch]:
+        """Return the titles matching `title` once normalised.
+
+        Args:
+            title: the title to look up
+            year: an optional year, the titles of which are returned first
+
+        Returns:
+            List[TitleMatch]: the matching titles, then ordered by popularity
+        """
+        key = normalize_title(title)
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT movie_id, title, year FROM titles WHERE key = ? "
+                "ORDER BY (? IS NOT NULL AND year IS NOT ?), votes DESC",
+                (key, year, year),
+            ).fetchall()
+
+        return [
+            TitleMatch(movie_id, match_title, match_year, 1.0)
+            for movie_id, match_title, match_year in rows
+        ]
+
+    def search(
+        self,
+        title: str,
+        limit: int = DEFAULT_LIMIT,
+        min_score: float = DEFAULT_MIN_SCORE,
+    ) -> List[TitleMatch]:
+        """Return the titles most similar to `title`.
+
+        Titles are scored by the proportion of trigrams they share with `title`, the
+        Sørensen-Dice coefficient of their trigrams.
+
+        Args:
+            title: the title to search for
+            limit: the maximum number of titles to return
+            min_score: the minimum score of the titles to return
+
+        Returns:
+            List[TitleMatch]: the matching titles, most similar then most popular first
+        """
+        grams = sorted(trigrams(normalize_title(title)))[:MAX_QUERY_TRIGRAMS]
+
+        if not grams:
+            return []
+
+        placeholders = ", ".join("?" * len(grams))
+        query = (
+            "SELECT t.movie_id, t.title, t.year, 2.0 * COUNT(*) / (? + t.grams) AS score "  # noqa: S608
+            "FROM trigrams g JOIN titles t ON t.id = g.title "
+            f"WHERE g.trigram IN ({placeholders}) GROUP BY g.title "
+            "HAVING score >= ? ORDER BY score DESC, t.votes DESC LIMIT ?"
+        )
+
+        with self._lock:
+            rows = self._conn.execute(
+                query, (len(grams), *grams, min_score, limit)
+            ).fetchall()
+
+        return [TitleMatch(*row) for row in rows]
+
+    def resolve(
+        self,
+        title: str,
+        year: Optional[int] = None,
+        min_score: float = DEFAULT_RESOLVE_MIN_SCORE,
+    ) -> Optional[Tuple[TitleMatch, bool]]:
+        """Resolve a title to a single match, in the same way as a search on a source.
+
+        Matching titles are looked up first, and the first of them with the given year
+        is picked, otherwise the most popular. Only if no title matches are similar
+        titles searched for, and the most similar of them is picked with low
+        confidence. A similar title is never picked if it's from another year than the
+        given one.
+
+        Args:
+            title: the title to resolve
+            year: an optional year for improved matching
+            min_score: the minimum score of similar titles
+
+        Returns:
+            Optional[Tuple[TitleMatch, bool]]: the match and whether it is low
+                confidence, or `None` if there are no matches
+        """
+        exact = self.lookup(title, year)
+
+        if exact:
+            # titles of the given year are looked up first
+            return exact[0], False
+
+        for candidate in self.search(title, min_score=min_score):
+            if not year or candidate.year in (year, None):
+                return candidate, True
+
+        return None
+
+
+def _rows(
+    entries: Iterable[TitleEntry],
+) -> Iterator[Tuple[Tuple[int, str, str, str, Optional[int], int, int], Set[str]]]:
+    """Number the entries and add their normalised titles and trigrams.
+
+    Args:
+        entries: the titles to index
+
+    Yields:
+        each row of the `titles` table with the trigrams of the title
+    """
+    for number, entry in enumerate(entries, start=1):
+        key = normalize_title(entry.title)
+        if not key:
+            continue
+        grams = trigrams(key)
+        yield (
+            number,
+            entry.movie_id,
+            entry.title,
+            key,
+            entry.year,
+            entry.votes,
+            len(grams),
+        ), grams
+
+
+_title_index: Optional[TitleIndex] = None
+
+
+def configure_title_index(path: PathLike) -> TitleIndex:
+    """Open an index for the sources to resolve titles with before searching.
+
+    Any previously configured index is closed.
+
+    Args:
+        path: the path to an index built with `TitleIndex.build`
+
+    Returns:
+        the opened index
+    """
+    global _title_index
+
+    if _title_index is not None:
+        _title_index.close()
+
+    _title_index = TitleIndex(path)
+    return _title_index
+
+
+def disable_title_index() -> None:
+    """Close the configured index."""
+    global _title_index
+
+    if _title_index is not None:
+        _title_index.close()
+
+    _title_index = None
+
+
+def get_title_index() -> Optional[TitleIndex]:
+    """Return the configured index.
+
+    Returns:
+        the configured `TitleIndex` or `None` if none is configured
+    """
+    return _title_index
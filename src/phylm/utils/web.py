@@ -1,10 +1,32 @@
 """Module to contain some web helper functions."""
+import asyncio
+import time
+from functools import partial
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Mapping
 from typing import Optional
+from typing import Tuple
 from urllib.parse import quote_plus
 
 import requests
+from aiohttp import ClientError
+from aiohttp import ClientResponse
 from aiohttp import ClientSession
+from aiohttp import ClientTimeout
 from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
+from bs4.builder import builder_registry
+
+from phylm.utils.aio import SingleFlight
+from phylm.utils.cache import get_http_cache
+from phylm.utils.retry import LatencyTracker
+from phylm.utils.retry import RequestPolicy
+from phylm.utils.retry import get_request_policies
+from phylm.utils.retry import hedged
+from phylm.utils.throttle import get_rate_limiter
 
 # DEFAULT_HEADERS = {"User-agent": "Mozilla/5.0"}
 DEFAULT_HEADERS = {
@@ -16,45 +38,470 @@ DEFAULT_HEADERS = {
 }
 
 
-def soupify(url: str) -> BeautifulSoup:
-    """Get a webpage and return the BeautifulSoup representation.
+PREFERRED_PARSERS = ("lxml", "html.parser")
+
+
+def _default_parser() -> str:
+    """Return the fastest available `BeautifulSoup` parser.
+
+    Returns:
+        str: the parser name
+    """
+    for parser in PREFERRED_PARSERS:
+        if builder_registry.lookup(parser):
+            return parser
+
+    return "html.parser"  # pragma: no cover
+
+
+_parser = _default_parser()
+_coalesce_requests = True
+_single_flight = SingleFlight()
+
+
+def set_parser(parser: Optional[str] = None) -> None:
+    """Set the `BeautifulSoup` parser used to parse scraped pages.
 
     Args:
-        url (str): the url for scraping
+        parser: the name of an installed `BeautifulSoup` parser, eg. "lxml",
+            "html5lib" or "html.parser". If not given the fastest available parser
+            is used.
+
+    Raises:
+        ValueError: if the parser is not installed
+    """
+    global _parser
+
+    if parser is None:
+        _parser = _default_parser()
+        return
+
+    if not builder_registry.lookup(parser):
+        raise ValueError(f"{parser} is not an installed BeautifulSoup parser")
+
+    _parser = parser
+
+
+def get_parser() -> str:
+    """Return the name of the `BeautifulSoup` parser used to parse scraped pages.
 
     Returns:
-        a `BeautifulSoup` representation of the given url
+        str: the parser name
     """
-    search = requests.get(url, headers=DEFAULT_HEADERS).text
-    return BeautifulSoup(search, "html.parser")
+    return _parser
 
 
-async def async_soupify(
-    url: str, session: Optional[ClientSession] = None
+def set_request_coalescing(enabled: bool = True) -> None:
+    """Set whether concurrent identical requests share a single request in flight.
+
+    Requests are identical if they have the same url, query params and headers.
+
+    Args:
+        enabled: whether to coalesce requests
+    """
+    global _coalesce_requests
+    _coalesce_requests = enabled
+
+
+def get_request_coalescing() -> bool:
+    """Return whether concurrent identical requests are coalesced.
+
+    Returns:
+        bool: whether requests are coalesced
+    """
+    return _coalesce_requests
+
+
+def make_soup(
+    html: str,
+    parse_only: Optional[SoupStrainer] = None,
+    parser: Optional[str] = None,
 ) -> BeautifulSoup:
-    """Asynchronously get a webpage and return the BeautifulSoup representation.
+    """Parse a html document with the configured parser.
 
     Args:
-        url: the url for scraping
+        html: the html document
+        parse_only: an optional `SoupStrainer` so that only the matching elements
+            (and their descendants) are built into the tree
+        parser: an optional parser name to use instead of the configured parser
+
+    Returns:
+        a `BeautifulSoup` representation of the document
+    """
+    return BeautifulSoup(html, parser or _parser, parse_only=parse_only)
+
+
+def get_text(
+    url: str,
+    session: Optional[requests.Session] = None,
+    params: Optional[Mapping[str, Any]] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    source: Optional[str] = None,
+    raise_for_status: bool = False,
+) -> str:
+    """Get a url and return the response body, using the HTTP cache if configured.
+
+    Only successful responses are cached. The request waits for the rate limiter of the
+    url's host, and is made with the timeouts and retries of the source's request
+    policy, if they're configured. Blocking requests are never hedged.
+
+    Args:
+        url: the url to request
+        session: an optional instance of `requests.Session` in which to run the request
+        params: optional query params for the request
+        headers: optional headers for the request
+        source: the optional name of the source making the request, used to look up
+            the cache ttl and request policy
+        raise_for_status: whether to raise an error for an unsuccessful response
+
+    Returns:
+        the response body
+    """
+    cache = get_http_cache()
+    if cache:
+        cached = cache.get("GET", url, params)
+        if cached is not None:
+            return cached
+
+    policies = get_request_policies()
+    policy = policies.for_source(source) if policies else RequestPolicy()
+
+    kwargs: Dict[str, Any] = {"headers": headers}
+    if params is not None:
+        kwargs["params"] = params
+    if policy.timeout or policy.connect_timeout or policy.read_timeout:
+        kwargs["timeout"] = (
+            policy.connect_timeout or policy.timeout,
+            policy.read_timeout or policy.timeout,
+        )
+
+    res = _get_with_retries(session, url, kwargs, policy)
+
+    if raise_for_status:
+        res.raise_for_status()
+
+    text: str = res.text
+    if cache and res.ok:
+        cache.set("GET", url, params, text, source=source)
+
+    return text
+
+
+def _get_with_retries(
+    session: Optional[requests.Session],
+    url: str,
+    kwargs: Dict[str, Any],
+    policy: RequestPolicy,
+) -> requests.Response:
+    """Make a blocking request, retrying it as allowed by the request policy.
+
+    Args:
+        session: an optional instance of `requests.Session` in which to run the request
+        url: the url to request
+        kwargs: the keyword arguments for the request
+        policy: the request policy
+
+    Returns:
+        the last response
+    """
+    for attempt in range(policy.retries):
+        try:
+            res = _get(session, url, kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            time.sleep(policy.backoff_for(attempt))
+            continue
+
+        if res.status_code not in policy.retry_statuses:
+            return res
+
+        time.sleep(policy.backoff_for(attempt, res.headers.get("Retry-After")))
+
+    return _get(session, url, kwargs)
+
+
+def _get(
+    session: Optional[requests.Session], url: str, kwargs: Dict[str, Any]
+) -> requests.Response:
+    """Make a single blocking request, waiting for the rate limiter if configured.
+
+    Args:
+        session: an optional instance of `requests.Session` in which to run the request
+        url: the url to request
+        kwargs: the keyword arguments for the request
+
+    Returns:
+        the response
+    """
+    limiter = get_rate_limiter()
+    throttle = limiter.for_url(url) if limiter else None
+    if throttle:
+        throttle.wait()
+
+    status: Optional[int] = None
+    retry_after: Optional[str] = None
+    try:
+        res: requests.Response = (session or requests).get(url, **kwargs)
+        if throttle:
+            status, retry_after = res.status_code, res.headers.get("Retry-After")
+    finally:
+        if throttle:
+            throttle.record(status, retry_after)
+
+    return res
+
+
+async def async_get_text(
+    url: str,
+    session: Optional[ClientSession] = None,
+    params: Optional[Mapping[str, Any]] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    source: Optional[str] = None,
+    raise_for_status: bool = False,
+) -> str:
+    """Asynchronously get a url and return the response body.
+
+    The HTTP cache is used if configured. Only successful responses are cached. The
+    request waits for the rate limiter of the url's host, and is made with the
+    timeouts, retries and hedging of the source's request policy, if they're
+    configured. Concurrent identical requests in the same session share a single
+    request in flight unless request coalescing is disabled.
+
+    Args:
+        url: the url to request
         session: an optional instance of `aiohttp.ClientSession` in which to run the
             request. If a session is passed here then it will remain open after this
             function returns.
+        params: optional query params for the request
+        headers: optional headers for the request
+        source: the optional name of the source making the request, used to look up
+            the cache ttl and request policy
+        raise_for_status: whether to raise an error for an unsuccessful response
 
     Returns:
-        a `BeautifulSoup` representation of the given url
+        the response body
+    """
+    cache = get_http_cache()
+    if cache:
+        cached = cache.get("GET", url, params)
+        if cached is not None:
+            return cached
+
+    fetch = partial(_async_fetch, url, session, params, headers, source)
+
+    if _coalesce_requests:
+        key = _flight_key(url, session, params, headers)
+        resp, text = await _single_flight.do(key, fetch)
+    else:
+        resp, text = await fetch()
+
+    if raise_for_status:
+        resp.raise_for_status()
+
+    return text
+
+
+async def _async_fetch(
+    url: str,
+    session: Optional[ClientSession],
+    params: Optional[Mapping[str, Any]],
+    headers: Optional[Mapping[str, str]],
+    source: Optional[str],
+) -> Tuple[ClientResponse, str]:
+    """Make a request with the source's request policy and cache a successful response.
+
+    Args:
+        url: the url to request
+        session: an optional instance of `aiohttp.ClientSession` in which to run the
+            request
+        params: optional query params for the request
+        headers: optional headers for the request
+        source: the optional name of the source making the request
+
+    Returns:
+        the last response and its body
     """
+    policies = get_request_policies()
+    policy = policies.for_source(source) if policies else RequestPolicy()
+    hedge_delay = policies.hedge_delay(source) if policies else None
+    latencies = policies.latencies(source) if policies else None
+
+    kwargs: Dict[str, Any] = {}
+    if policy.timeout or policy.connect_timeout or policy.read_timeout:
+        kwargs["timeout"] = ClientTimeout(
+            total=policy.timeout,
+            sock_connect=policy.connect_timeout,
+            sock_read=policy.read_timeout,
+        )
+
     keep_session = False
     if session:
         keep_session = True
 
     session = session or ClientSession()
-    async with session.get(url, headers=DEFAULT_HEADERS) as resp:
-        html = await resp.text()
+    make_request = partial(_async_get, session, url, params, headers, kwargs, latencies)
+    try:
+        resp, text = await _async_get_with_retries(make_request, policy, hedge_delay)
+    finally:
+        if not keep_session:
+            await session.close()
+
+    cache = get_http_cache()
+    if cache and resp.status < 400:
+        cache.set("GET", url, params, text, source=source)
+
+    return resp, text
+
+
+def _flight_key(
+    url: str,
+    session: Optional[ClientSession],
+    params: Optional[Mapping[str, Any]],
+    headers: Optional[Mapping[str, str]],
+) -> Tuple[str, Optional[int], str, str]:
+    """Return the key identifying identical requests.
+
+    Requests are only identical if they're made in the same session, as the shared
+    request runs in the session of the caller which started it and closing it would
+    fail the request for every other caller. Requests made without a session share a
+    session opened for the request.
+
+    Args:
+        url: the url to request
+        session: the optional session in which to run the request
+        params: optional query params for the request
+        headers: optional headers for the request
+
+    Returns:
+        the key
+    """
+    return (
+        url,
+        id(session) if session is not None else None,
+        repr(sorted((params or {}).items())),
+        repr(sorted((headers or {}).items())),
+    )
+
+
+async def _async_get_with_retries(
+    make_request: Callable[[], Awaitable[Tuple[ClientResponse, str]]],
+    policy: RequestPolicy,
+    hedge_delay: Optional[float],
+) -> Tuple[ClientResponse, str]:
+    """Make a request, hedging and retrying it as allowed by the request policy.
+
+    Args:
+        make_request: a callable returning a new awaitable for a single request
+        policy: the request policy
+        hedge_delay: the number of seconds after which to hedge each attempt, or
+            `None` to not hedge
+
+    Returns:
+        the last response and its body
+    """
+    for attempt in range(policy.retries):
+        try:
+            resp, text = await hedged(make_request, hedge_delay)
+        except (ClientError, asyncio.TimeoutError):
+            await asyncio.sleep(policy.backoff_for(attempt))
+            continue
+
+        if resp.status not in policy.retry_statuses:
+            return resp, text
 
-    if not keep_session:
-        await session.close()
+        retry_after = resp.headers.get("Retry-After")
+        await asyncio.sleep(policy.backoff_for(attempt, retry_after))
 
-    return BeautifulSoup(html, "html.parser")
+    return await hedged(make_request, hedge_delay)
+
+
+async def _async_get(
+    session: ClientSession,
+    url: str,
+    params: Optional[Mapping[str, Any]],
+    headers: Optional[Mapping[str, str]],
+    kwargs: Dict[str, Any],
+    latencies: Optional[LatencyTracker],
+) -> Tuple[ClientResponse, str]:
+    """Make a single request, waiting for the rate limiter if configured.
+
+    Args:
+        session: the `aiohttp.ClientSession` in which to run the request
+        url: the url to request
+        params: optional query params for the request
+        headers: optional headers for the request
+        kwargs: any other keyword arguments for the request
+        latencies: an optional tracker in which to record the latency of a successful
+            response
+
+    Returns:
+        the response and its body
+    """
+    limiter = get_rate_limiter()
+    throttle = limiter.for_url(url) if limiter else None
+    if throttle:
+        await throttle.acquire()
+
+    status: Optional[int] = None
+    retry_after: Optional[str] = None
+    start = time.monotonic()
+    try:
+        async with session.get(url, params=params, headers=headers, **kwargs) as resp:
+            status = resp.status
+            if throttle:
+                retry_after = resp.headers.get("Retry-After")
+            text = await resp.text()
+    finally:
+        if throttle:
+            throttle.release(status, retry_after)
+
+    if latencies is not None and resp.status < 400:
+        latencies.record(time.monotonic() - start)
+
+    return resp, text
+
+
+def soupify(
+    url: str,
+    source: Optional[str] = None,
+    parse_only: Optional[SoupStrainer] = None,
+) -> BeautifulSoup:
+    """Get a webpage and return the BeautifulSoup representation.
+
+    Args:
+        url (str): the url for scraping
+        source: the optional name of the source making the request
+        parse_only: an optional `SoupStrainer` to limit the elements that are parsed
+
+    Returns:
+        a `BeautifulSoup` representation of the given url
+    """
+    search = get_text(url, headers=DEFAULT_HEADERS, source=source)
+    return make_soup(search, parse_only=parse_only)
+
+
+async def async_soupify(
+    url: str,
+    session: Optional[ClientSession] = None,
+    source: Optional[str] = None,
+    parse_only: Optional[SoupStrainer] = None,
+) -> BeautifulSoup:
+    """Asynchronously get a webpage and return the BeautifulSoup representation.
+
+    Args:
+        url: the url for scraping
+        session: an optional instance of `aiohttp.ClientSession` in which to run the
+            request. If a session is passed here then it will remain open after this
+            function returns.
+        source: the optional name of the source making the request
+        parse_only: an optional `SoupStrainer` to limit the elements that are parsed
+
+    Returns:
+        a `BeautifulSoup` representation of the given url
+    """
+    html = await async_get_text(
+        url, session=session, headers=DEFAULT_HEADERS, source=source
+    )
+    return make_soup(html, parse_only=parse_only)
 
 
 def url_encode(string: str) -> str:
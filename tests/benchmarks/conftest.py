@@ -0,0 +1,69 @@
+"""Fixtures for the benchmarks.
+
+The benchmarks replay the recorded cassettes through a local `MockServer`. They are
+configured through env vars:
+
+- `PHYLM_BENCHMARK_LATENCY`: the seconds each response is delayed by, default `0.05`
+- `PHYLM_BENCHMARK_FILMS`: the number of films loaded at once, default `100`
+
+They are skipped unless pytest is run with `--benchmark-only`, eg. through
+`nox --session=benchmarks`.
+"""
+import os
+from pathlib import Path
+from typing import Iterator
+from typing import List
+
+import pytest
+
+from phylm.mock_server import Behaviour
+from phylm.mock_server import MockServer
+from phylm.mock_server import point_sources_at
+from phylm.utils.web import set_request_coalescing
+from tests.conftest import FIXTURES_DIR
+
+SOURCE_DIRS = ("imdb", "mtc", "rt", "tmdb")
+LATENCY = float(os.environ.get("PHYLM_BENCHMARK_LATENCY", "0.05"))
+FILMS = int(os.environ.get("PHYLM_BENCHMARK_FILMS", "100"))
+BENCHMARKS_DIR = Path(__file__).parent
+
+
+def cassettes() -> List[Path]:
+    """Return the cassettes of all the sources."""
+    return [
+        path
+        for source in SOURCE_DIRS
+        for path in sorted(Path(FIXTURES_DIR, source).glob("*.yaml"))
+    ]
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: List[pytest.Item]
+) -> None:
+    """Skip the benchmarks unless they're run with `--benchmark-only`."""
+    if config.getoption("benchmark_only", default=False):
+        return
+
+    skip = pytest.mark.skip(reason="benchmarks only run with --benchmark-only")
+    for item in items:
+        if BENCHMARKS_DIR in item.path.parents:
+            item.add_marker(skip)
+
+
+@pytest.fixture(name="mock_server", scope="session")
+def mock_server_fixture() -> Iterator[MockServer]:
+    """Serve the cassettes with the configured latency and point the sources at them.
+
+    Request coalescing is turned off so that every film makes its own requests, even
+    those which are the same for every film, eg. fetching the matched TMDb movie.
+    """
+    os.environ.setdefault("TMDB_API_KEY", "benchmark")
+    set_request_coalescing(False)
+
+    try:
+        with MockServer(
+            cassettes(), Behaviour(latency=LATENCY)
+        ) as server, point_sources_at(server.url):
+            yield server
+    finally:
+        set_request_coalescing()
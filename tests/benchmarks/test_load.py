@@ -0,0 +1,72 @@
+"""Benchmarks for loading films through the local cassette server."""
+import asyncio
+import time
+import tracemalloc
+from typing import Any
+from typing import List
+
+import pytest
+
+from phylm import Phylm
+from phylm.batch import load_many
+from phylm.phylm import SOURCES
+from tests.benchmarks.conftest import FILMS
+
+pytest.importorskip("pytest_benchmark")
+pytestmark = pytest.mark.usefixtures("mock_server")
+
+
+async def _load_many(count: int) -> List[Phylm]:
+    # the server serves the recorded responses for any title
+    titles = [f"The Matrix {number}" for number in range(count)]
+    return [p async for p in load_many(titles, list(SOURCES))]
+
+
+def test_load_sources(benchmark: Any) -> None:
+    """The wall time of loading every source of a film."""
+
+    def load() -> Phylm:
+        return asyncio.run(Phylm("The Matrix").load_sources(list(SOURCES)))
+
+    phylm = benchmark(load)
+
+    assert phylm.imdb.title == "The Matrix"
+    assert phylm.mtc.rating == "73"
+    assert phylm.tmdb.id == "603"
+
+
+def test_throughput(benchmark: Any) -> None:
+    """The number of films loaded a second with `FILMS` films in a batch."""
+    durations = []
+
+    def load() -> List[Phylm]:
+        start = time.perf_counter()
+        films = asyncio.run(_load_many(FILMS))
+        durations.append(time.perf_counter() - start)
+        return films
+
+    films = benchmark.pedantic(load, rounds=3)
+
+    benchmark.extra_info["films"] = FILMS
+    benchmark.extra_info["films_per_second"] = FILMS / min(durations)
+    assert len(films) == FILMS
+
+
+def test_peak_memory(benchmark: Any) -> None:
+    """The peak memory allocated while loading `FILMS` films in a batch."""
+    peaks = []
+
+    def load() -> List[Phylm]:
+        tracemalloc.start()
+        try:
+            films = asyncio.run(_load_many(FILMS))
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+        return films
+
+    benchmark.pedantic(load, rounds=1)
+
+    benchmark.extra_info["films"] = FILMS
+    benchmark.extra_info["peak_memory_bytes"] = max(peaks)
+    assert max(peaks) > 0
@@ -0,0 +1,69 @@
+"""Benchmarks for parsing the responses of each source."""
+import json
+from typing import Any
+
+import pytest
+from imdb.Movie import Movie
+from yarl import URL
+
+from phylm.mock_server import read_cassette
+from phylm.sources import Tmdb
+from phylm.sources import mtc
+from phylm.sources import rt
+from phylm.sources.imdb import _data_from_movie
+from phylm.sources.imdb import ia
+from tests.conftest import FIXTURES_DIR
+
+pytest.importorskip("pytest_benchmark")
+
+
+def _body(cassette: str, path: str) -> str:
+    """Return the body of the recorded response to a path."""
+    for response in read_cassette(f"{FIXTURES_DIR}/{cassette}"):
+        if URL(response.url).path == path:
+            return response.body.decode()
+
+    raise LookupError(f"{path} is not recorded in {cassette}")
+
+
+def test_mtc(benchmark: Any) -> None:
+    """Parse a Metacritic search results page."""
+    html = _body("mtc/matrix.yaml", "/search/movie/The+Matrix/results")
+
+    data, _ = benchmark(mtc.parse_results, html, "The Matrix")
+
+    assert data is not None
+
+
+def test_rt(benchmark: Any) -> None:
+    """Parse a Rotten Tomatoes search results page."""
+    html = _body("rt/matrix.yaml", "/search")
+
+    data, _ = benchmark(rt.parse_results, html, "The Matrix")
+
+    assert data is not None
+
+
+def test_imdb(benchmark: Any) -> None:
+    """Parse an IMDb reference page into the extracted data points."""
+    html = _body("imdb/the_matrix.yaml", "/title/tt0133093/reference")
+
+    def parse() -> Any:
+        parsed = ia.mProxy.movie_parser.parse(html)
+        return _data_from_movie(Movie(movieID="0133093", data=parsed["data"]))
+
+    data = benchmark(parse)
+
+    assert data.title == "The Matrix"
+
+
+def test_tmdb(benchmark: Any) -> None:
+    """Parse a TMDB movie response into a loaded source."""
+    body = _body("tmdb/the_matrix.yaml", "/3/movie/603")
+
+    def parse() -> Tmdb:
+        return Tmdb.from_dict({"raw_title": "The Matrix", "data": json.loads(body)})
+
+    tmdb = benchmark(parse)
+
+    assert tmdb.title == "The Matrix"
@@ -1,10 +1,14 @@
 """Module to hold fixtures etc. for pytest."""
 from typing import AsyncGenerator
+from typing import Iterator
 
 import pytest
 import vcr
 from aiohttp import ClientSession
 
+from phylm.utils.cache import ResultCache
+from phylm.utils.cache import configure_result_cache
+from phylm.utils.cache import disable_result_cache
 from tests.utils.vcr_serializers import ResponseBodyCompressor
 
 my_vcr = vcr.VCR()
@@ -25,4 +29,11 @@ async def async_session() -> AsyncGenerator[ClientSession, None]:
     await session.close()
 
 
+@pytest.fixture(name="result_cache")
+def result_cache_fixture() -> Iterator[ResultCache]:
+    """Enable an in-memory result cache for the duration of a test."""
+    yield configure_result_cache()
+    disable_result_cache()
+
+
 FIXTURES_DIR = "tests/fixtures/vcr_cassettes"
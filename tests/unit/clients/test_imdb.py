@@ -0,0 +1,102 @@
+"""Tests for the IMDb client."""
+import pytest
+import vcr
+
+from phylm.clients.imdb import ImdbClient
+from phylm.clients.imdb import parse_title_page
+from tests.conftest import FIXTURES_DIR
+
+VCR_FIXTURES_DIR = f"{FIXTURES_DIR}/clients/imdb"
+pytestmark = pytest.mark.asyncio
+
+
+class TestSearchMovies:
+    """Tests for the `search_movies` method."""
+
+    @vcr.use_cassette(f"{VCR_FIXTURES_DIR}/the_matrix.yaml")
+    async def test_results(self) -> None:
+        """
+        Given a search query,
+        When the `search_movies` method is invoked with the query,
+        Then only the movie suggestions are returned
+        """
+        client = ImdbClient()
+
+        results = await client.search_movies("The Matrix")
+
+        assert [result["title"] for result in results] == [
+            "The Matrix",
+            "The Matrix Reloaded",
+            "The Matrix Resurrections",
+        ]
+        assert results[0] == {"id": "0133093", "title": "The Matrix", "year": 1999}
+
+    @vcr.use_cassette(f"{VCR_FIXTURES_DIR}/no_results.yaml")
+    async def test_no_results(self) -> None:
+        """An empty list is returned when there are no suggestions."""
+        client = ImdbClient()
+
+        results = await client.search_movies("asldkjnkasnxlajsnxkasjxnas")
+
+        assert results == []
+
+
+class TestGetMovie:
+    """Tests for the `get_movie` method."""
+
+    @vcr.use_cassette(f"{VCR_FIXTURES_DIR}/get_the_matrix.yaml")
+    async def test_success(self) -> None:
+        """
+        Given a movie id,
+        When the `get_movie` method is invoked with the id,
+        Then the movie data is parsed from the title page
+        """
+        client = ImdbClient()
+
+        movie = await client.get_movie("tt0133093")
+
+        assert movie is not None
+        assert movie["id"] == "0133093"
+        assert movie["title"] == "The Matrix"
+        assert movie["year"] == 1999
+        assert movie["genres"] == ["Action", "Sci-Fi"]
+        assert movie["cast"][0] == "Keanu Reeves"
+        assert movie["directors"] == ["Lana Wachowski", "Lilly Wachowski"]
+        assert movie["runtimes"] == ["136"]
+        assert movie["rating"] == 8.7
+        assert movie["plot"][0].startswith("When a beautiful stranger")
+
+    @vcr.use_cassette(f"{VCR_FIXTURES_DIR}/get_invalid_id.yaml")
+    async def test_not_found(self) -> None:
+        """`None` is returned for an unrecognised id."""
+        client = ImdbClient()
+
+        assert await client.get_movie("9999999999") is None
+
+
+class TestParseTitlePage:
+    """Tests for the `parse_title_page` function."""
+
+    def test_no_linked_data(self) -> None:
+        """`None` is returned if the page has no linked data."""
+        assert parse_title_page("<html></html>", "0133093") is None
+
+    def test_single_values(self) -> None:
+        """Single genres and people and hour long runtimes are handled."""
+        page = (
+            '<script type="application/ld+json">{"name": "Am&eacute;lie", '
+            '"genre": "Comedy", "director": {"name": "Jean-Pierre Jeunet"}, '
+            '"duration": "PT2H"}</script>'
+        )
+
+        movie = parse_title_page(page, "0211915")
+
+        assert movie is not None
+        assert movie["title"] == "Amélie"
+        assert movie["genres"] == ["Comedy"]
+        assert movie["directors"] == ["Jean-Pierre Jeunet"]
+        assert movie["cast"] == []
+        assert movie["runtimes"] == ["120"]
+        assert movie["rating"] is None
+        assert movie["year"] is None
+        assert movie["plot"] == []
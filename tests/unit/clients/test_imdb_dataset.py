@@ -0,0 +1,154 @@
+"""Tests for the offline IMDb dataset store."""
+import gzip
+import shutil
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from phylm.clients.imdb_dataset import DATASET_FILES
+from phylm.clients.imdb_dataset import ImdbDataset
+from phylm.clients.imdb_dataset import build_imdb_dataset
+from phylm.clients.imdb_dataset import build_imdb_title_index
+from phylm.clients.imdb_dataset import configure_imdb_dataset
+from phylm.clients.imdb_dataset import disable_imdb_dataset
+from phylm.clients.imdb_dataset import get_imdb_dataset
+
+DATASET_DIR = Path("tests/fixtures/imdb_dataset")
+
+
+@pytest.fixture(name="dataset")
+def dataset_fixture(tmp_path: Path) -> Iterator[ImdbDataset]:
+    """Build a store from the sample datasets."""
+    with build_imdb_dataset(DATASET_DIR, tmp_path / "store") as dataset:
+        yield dataset
+
+
+class TestBuild:
+    """Tests for the `build_imdb_dataset` function."""
+
+    def test_only_movies(self, dataset: ImdbDataset) -> None:
+        """Only movies are kept."""
+        assert len(dataset) == 5
+        assert dataset.get_movie("tt9999990") is None
+
+    def test_gzipped(self, tmp_path: Path) -> None:
+        """The gzipped datasets are read as downloaded."""
+        dataset_dir = tmp_path / "datasets"
+        dataset_dir.mkdir()
+        for name in DATASET_FILES:
+            with (DATASET_DIR / f"{name}.tsv").open("rb") as src, gzip.open(
+                dataset_dir / f"{name}.tsv.gz", "wb"
+            ) as dst:
+                shutil.copyfileobj(src, dst)
+
+        with build_imdb_dataset(dataset_dir, tmp_path / "store") as dataset:
+            movie = dataset.get_movie("tt0078748")
+
+        assert movie is not None
+        assert movie["title"] == "Alien"
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        """A missing dataset file is reported."""
+        with pytest.raises(FileNotFoundError, match="No title.basics.tsv.gz"):
+            build_imdb_dataset(tmp_path, tmp_path / "store")
+
+    def test_not_a_store(self, tmp_path: Path) -> None:
+        """A directory without a store can't be opened."""
+        with pytest.raises(ValueError, match="is not an IMDb dataset store"):
+            ImdbDataset(tmp_path)
+
+
+class TestBuildTitleIndex:
+    """Tests for the `build_imdb_title_index` function."""
+
+    def test_titles(self, tmp_path: Path) -> None:
+        """Movies are indexed under their titles and original titles."""
+        with build_imdb_title_index(DATASET_DIR, tmp_path / "titles.db") as index:
+            assert len(index) == 6
+            assert [match.movie_id for match in index.lookup("the matrix")] == [
+                "0133093",
+                "9999991",
+            ]
+            assert [
+                match.title for match in index.lookup("Le Fabuleux Destin d'Amélie")
+            ] == []
+            assert [
+                match.movie_id
+                for match in index.lookup("Le fabuleux destin d'Amélie Poulain")
+            ] == ["0211915"]
+
+
+class TestGetMovie:
+    """Tests for the `get_movie` method."""
+
+    def test_movie(self, dataset: ImdbDataset) -> None:
+        """A movie is found by id with its credits in order."""
+        assert dataset.get_movie("0133093") == {
+            "id": "0133093",
+            "title": "The Matrix",
+            "year": 1999,
+            "genres": ["Action", "Sci-Fi"],
+            "cast": ["Keanu Reeves", "Laurence Fishburne", "Carrie-Anne Moss"],
+            "directors": ["Lana Wachowski", "Lilly Wachowski"],
+            "runtimes": ["136"],
+            "rating": 8.7,
+        }
+
+    def test_prefixed_id(self, dataset: ImdbDataset) -> None:
+        """The `tt` prefix of the id is optional."""
+        assert dataset.get_movie("tt0133093") == dataset.get_movie("0133093")
+
+    @pytest.mark.parametrize("movie_id", ["0000001", "9999999", "blort"])
+    def test_unknown(self, dataset: ImdbDataset, movie_id: str) -> None:
+        """`None` is returned for an unknown id."""
+        assert dataset.get_movie(movie_id) is None
+
+
+class TestSearchMovies:
+    """Tests for the `search_movies` method."""
+
+    def test_most_votes_first(self, dataset: ImdbDataset) -> None:
+        """Movies with the same title are ordered by their number of votes."""
+        results = dataset.search_movies("the matrix")
+
+        assert [(result["id"], result["year"]) for result in results] == [
+            ("0133093", 1999),
+            ("9999991", 2012),
+        ]
+
+    def test_normalised(self, dataset: ImdbDataset) -> None:
+        """Titles match once normalised."""
+        assert [result["title"] for result in dataset.search_movies("AMELIE")] == [
+            "Amélie"
+        ]
+
+    def test_original_title(self, dataset: ImdbDataset) -> None:
+        """Movies are also found by their original title."""
+        results = dataset.search_movies("Le Fabuleux Destin d'Amélie Poulain")
+
+        assert [result["id"] for result in results] == ["0211915"]
+
+    @pytest.mark.parametrize("title", ["The Matrixy", "Matrix", "", "?"])
+    def test_no_results(self, dataset: ImdbDataset, title: str) -> None:
+        """Only whole titles match."""
+        assert dataset.search_movies(title) == []
+
+
+class TestConfigure:
+    """Tests for configuring the global store."""
+
+    def test_configure_and_disable(self, tmp_path: Path) -> None:
+        """The global store can be configured and disabled."""
+        build_imdb_dataset(DATASET_DIR, tmp_path).close()
+
+        assert get_imdb_dataset() is None
+
+        dataset = configure_imdb_dataset(tmp_path)
+
+        assert get_imdb_dataset() is dataset
+        assert len(dataset) == 5
+
+        disable_imdb_dataset()
+
+        assert get_imdb_dataset() is None
@@ -1,14 +1,25 @@
 """Tests for the Tmdb client."""
+import asyncio
+import gc
 import os
+import weakref
+from typing import List
 from unittest.mock import MagicMock
 from unittest.mock import Mock
 from unittest.mock import patch
 
 import pytest
 import vcr
+from aiohttp import ClientResponseError
+from aiohttp import ClientSession
+from aiohttp import TCPConnector
 from requests.exceptions import HTTPError
 
+from phylm.clients.tmdb import DEFAULT_POOL_SIZE
 from phylm.clients.tmdb import TmdbClient
+from phylm.clients.tmdb import TmdbClientRegistry
+from phylm.clients.tmdb import close_tmdb_clients
+from phylm.clients.tmdb import get_tmdb_client
 from phylm.clients.tmdb import initialize_tmdb_client
 from phylm.errors import NoTMDbApiKeyError
 from tests.conftest import FIXTURES_DIR
@@ -181,6 +192,31 @@ class TestGetMovie:
 
         assert results["success"] is False
 
+    @pytest.mark.asyncio()
+    async def test_append_to_response(self) -> None:
+        """Sub-resources are fetched in the same request."""
+        client = TmdbClient(api_key="not_a_key")
+
+        with vcr.use_cassette(
+            f"{VCR_FIXTURES_DIR}/get_the_matrix_appended.yaml",
+            filter_query_parameters=["api_key"],
+        ) as cass:
+            results = await client.get_movie(
+                "603", append_to_response=["credits", "watch/providers"]
+            )
+
+        assert results["title"] == "The Matrix"
+        assert results["credits"]["cast"][0]["name"] == "Keanu Reeves"
+        assert "GB" in results["watch/providers"]["results"]
+
+        cass.rewind()
+
+        assert len(cass) == 1
+        assert cass.requests[0].query == [
+            ("append_to_response", "credits,watch/providers"),
+            ("language", "en-US"),
+        ]
+
 
 class TestStreamingProviders:
     """Tests for the `get_streaming_providers` method."""
@@ -240,6 +276,86 @@ class TestStreamingProviders:
             client.get_streaming_providers(movie_id="-1", regions=["gb"])
 
 
+@pytest.mark.asyncio()
+class TestStreamingProvidersAsync:
+    """Tests for the async streaming providers methods."""
+
+    async def test_results(self) -> None:
+        """Providers are returned keyed by region name."""
+        async with ClientSession() as session:
+            client = TmdbClient(api_key="dummy_key", async_session=session)
+
+            with vcr.use_cassette(
+                f"{VCR_FIXTURES_DIR}/providers_async.yaml",
+                filter_query_parameters=["api_key"],
+            ):
+                results = await client.get_streaming_providers_async(
+                    movie_id="603", regions=["gb", "fr"]
+                )
+
+        assert "flatrate" in results["gb"]
+        assert "fr" in results
+
+    async def test_not_found(self) -> None:
+        """An error is raised for an unrecognised movie id."""
+        async with ClientSession() as session:
+            client = TmdbClient(api_key="dummy_key", async_session=session)
+
+            with vcr.use_cassette(
+                f"{VCR_FIXTURES_DIR}/providers_async.yaml",
+                filter_query_parameters=["api_key"],
+            ), pytest.raises(ClientResponseError):
+                await client.get_streaming_providers_async(
+                    movie_id="-1", regions=["gb"]
+                )
+
+    async def test_no_session(self) -> None:
+        """An error is raised if there's no async session."""
+        client = TmdbClient(api_key="dummy_key")
+        await client.async_session.close()  # type: ignore
+        client.async_session = None
+
+        with pytest.raises(RuntimeError, match="No `async_session` available"):
+            await client.get_streaming_providers_async(movie_id="603", regions=["gb"])
+
+    async def test_iter(self) -> None:
+        """
+        Given many movie ids,
+        When `iter_streaming_providers` is invoked with the ids,
+        Then the providers for every id are yielded, with none for unrecognised ids
+        """
+        async with ClientSession() as session:
+            client = TmdbClient(api_key="dummy_key", async_session=session)
+
+            with vcr.use_cassette(
+                f"{VCR_FIXTURES_DIR}/providers_async.yaml",
+                filter_query_parameters=["api_key"],
+            ):
+                results = {
+                    movie_id: providers
+                    async for movie_id, providers in client.iter_streaming_providers(
+                        ["603", "674324", "-1"], regions=["gb"], concurrency=2
+                    )
+                }
+
+        assert set(results) == {"603", "674324", "-1"}
+        assert "flatrate" in results["603"]["gb"]
+        assert results["674324"] == {"gb": {}}
+        assert results["-1"] == {"gb": {}}
+
+    async def test_iter_error(self) -> None:
+        """Errors other than not found are raised."""
+        client = TmdbClient(api_key="dummy_key", async_session=MagicMock())
+        error = ClientResponseError(MagicMock(), (), status=500)
+
+        with patch.object(
+            client, "get_streaming_providers_async", side_effect=error
+        ), pytest.raises(ClientResponseError):
+            _ = [
+                pair async for pair in client.iter_streaming_providers(["603"], ["gb"])
+            ]
+
+
 class TestInitializeTmdbClient:
     """Tests for the `initialize_tmdb_client` function."""
 
@@ -322,6 +438,9 @@ class TestAsyncSession:
     ) -> None:
         """Ensure a ClientSession is created under the right conditions."""
         mock_asyncio.get_running_loop.return_value = True
+        mock_response = mock_client_session.return_value.get.return_value.__aenter__
+        mock_response.return_value.status = 200
+        mock_response.return_value.text.return_value = "{}"
 
         client = TmdbClient(api_key="dummy_key")
 
@@ -330,3 +449,113 @@ class TestAsyncSession:
         await client.get_movie("abc")
 
         mock_client_session.return_value.get.assert_called_once()
+
+
+class TestLifecycle:
+    """Tests for opening and closing the client's sessions."""
+
+    @patch(f"{MODULE_PATH}.Session", autospec=True)
+    def test_session_lazy(self, mock_session: MagicMock) -> None:
+        """The blocking session is only opened when needed and can be closed."""
+        with TmdbClient(api_key="dummy_key") as client:
+            mock_session.assert_not_called()
+            assert client.session is client.session
+
+        mock_session.assert_called_once()
+        mock_session.return_value.close.assert_called_once()
+
+    @pytest.mark.asyncio()
+    async def test_async_with(self) -> None:
+        """A session opened by the client is closed at the end of the block."""
+        async with TmdbClient(api_key="dummy_key") as client:
+            session = client.async_session
+            assert session is not None
+            assert isinstance(session.connector, TCPConnector)
+            assert session.connector.limit_per_host == DEFAULT_POOL_SIZE
+
+        assert session.closed
+        assert client.async_session is None
+
+    @pytest.mark.asyncio()
+    async def test_given_session_left_open(self) -> None:
+        """A session passed to the client is left open."""
+        async with ClientSession() as session:
+            async with TmdbClient(api_key="dummy_key", async_session=session):
+                pass
+
+            assert not session.closed
+
+
+class TestTmdbClientRegistry:
+    """Tests for the `TmdbClientRegistry` class."""
+
+    def test_per_api_key(self) -> None:
+        """A client is shared per api key."""
+        registry = TmdbClientRegistry()
+
+        first = registry.get("key_a")
+
+        assert registry.get("key_a") is first
+        assert registry.get("key_b") is not first
+        assert first.async_session is None
+        assert len(registry) == 2
+
+    @patch.dict(os.environ, {"TMDB_API_KEY": ""}, clear=True)
+    def test_no_key(self) -> None:
+        """Raises an error if no key available."""
+        with pytest.raises(NoTMDbApiKeyError):
+            TmdbClientRegistry().get()
+
+    @pytest.mark.asyncio()
+    async def test_per_event_loop(self) -> None:
+        """Clients used in an event loop get their own session."""
+        registry = TmdbClientRegistry()
+        blocking = await asyncio.get_running_loop().run_in_executor(
+            None, registry.get, "key_a"
+        )
+
+        async with registry:
+            client = registry.get("key_a")
+
+            assert client is not blocking
+            assert client.async_session is not None
+            assert registry.get("key_a") is client
+
+        assert client.async_session is None
+        assert len(registry) == 0
+
+    def test_closed_loops_released(self) -> None:
+        """
+        Given clients opened in several event loops,
+        When the loops are closed,
+        Then the clients are discarded, their sessions closed and the loops freed
+        """
+        registry = TmdbClientRegistry()
+        sessions: List[ClientSession] = []
+
+        async def open_client() -> "weakref.ref[asyncio.AbstractEventLoop]":
+            session = registry.get("key_a").async_session
+            assert session is not None
+            sessions.append(session)
+            return weakref.ref(asyncio.get_running_loop())
+
+        loops = [asyncio.run(open_client()) for _ in range(3)]
+
+        assert len(registry) == 0
+        assert all(session.closed for session in sessions)
+        sessions.clear()
+        gc.collect()
+        assert all(loop() is None for loop in loops)
+
+    @pytest.mark.asyncio()
+    async def test_get_tmdb_client(self) -> None:
+        """The module level registry is shared and can be closed."""
+        client = get_tmdb_client("nice_key")
+
+        assert get_tmdb_client("nice_key") is client
+
+        await close_tmdb_clients()
+
+        assert client.async_session is None
+        assert get_tmdb_client("nice_key") is not client
+        await close_tmdb_clients()
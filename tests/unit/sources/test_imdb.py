@@ -1,11 +1,35 @@
 """Module for `Imdb` tests."""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator
+from typing import List
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
 import pytest
+import vcr
+from imdb.Movie import Movie
+from imdb.Person import Person
 
+from phylm.clients.imdb_dataset import build_imdb_dataset
+from phylm.clients.imdb_dataset import configure_imdb_dataset
+from phylm.clients.imdb_dataset import disable_imdb_dataset
 from phylm.sources.imdb import Imdb
+from phylm.sources.imdb import get_backend
+from phylm.sources.imdb import set_backend
+from phylm.utils.executors import MeteredExecutor
+from phylm.utils.executors import configure_imdb_executor
+from phylm.utils.executors import disable_imdb_executor
+from phylm.utils.title_index import TitleEntry
+from phylm.utils.title_index import TitleIndex
+from phylm.utils.title_index import configure_title_index
+from phylm.utils.title_index import disable_title_index
 from tests.conftest import FIXTURES_DIR
 from tests.conftest import my_vcr
 
 VCR_FIXTURES_DIR = f"{FIXTURES_DIR}/imdb"
+WEB_VCR_FIXTURES_DIR = f"{FIXTURES_DIR}/clients/imdb"
+DATASET_DIR = "tests/fixtures/imdb_dataset"
 IMDB_IA_PATH = "phylm.sources.imdb.ia"
 pytestmark = pytest.mark.asyncio
 my_vcr.serializer = "response_body_compressor"
@@ -421,6 +445,22 @@ class TestPlot:
 
     #     assert imdb.plot is None
 
+    @my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/the_matrix_and_plot.yaml")
+    async def test_plot_prefetched(self) -> None:
+        """
+        Given the plot info is requested at load time,
+        When the plot is retrieved,
+        Then it is returned without any further requests
+        """
+        imdb = Imdb("The Matrix")
+        await imdb.load_source(info=["main", "plot"])
+
+        with patch(IMDB_IA_PATH) as mock_ia:
+            plot = imdb.plot
+
+        assert "Neo" in str(plot)
+        mock_ia.update.assert_not_called()
+
     @my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/no_results.yaml")
     async def test_no_movie_results(self) -> None:
         """
@@ -494,6 +534,175 @@ class TestMovieId:
         assert imdb.title == "The Matrix"
 
 
+class TestToDict:
+    """Tests for the `to_dict` and `from_dict` methods."""
+
+    @my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/the_matrix_by_id.yaml")
+    async def test_round_trip(self) -> None:
+        """A loaded instance can be recreated from its dictionary."""
+        imdb = Imdb(movie_id="0133093")
+        await imdb.load_source()
+
+        restored = Imdb.from_dict(imdb.to_dict())
+
+        assert restored.movie_id == "0133093"
+        assert restored.id == "0133093"
+        assert restored.title == "The Matrix"
+        assert restored.year == 1999
+        assert restored.rating == imdb.rating
+        assert restored.runtime == imdb.runtime
+        assert restored.genres() == imdb.genres()
+        assert restored.cast() == imdb.cast()
+        assert restored.directors() == imdb.directors()
+        assert restored.plot == imdb.plot
+
+    @patch(IMDB_IA_PATH)
+    async def test_match_score_round_trip(self, mock_ia: MagicMock) -> None:
+        """The kind is kept so the match score of a restored instance is the same."""
+        mock_ia.get_movie.return_value = Movie(
+            movieID="0108778",
+            data={"title": "Friends", "year": 1994, "kind": "tv series"},
+        )
+        imdb = Imdb("Friends", movie_id="0108778")
+        await imdb.load_source()
+
+        restored = Imdb.from_dict(imdb.to_dict())
+
+        assert imdb.match_score == pytest.approx(0.7 / 0.8)
+        assert restored.match_score == imdb.match_score
+
+    async def test_without_plot(self) -> None:
+        """The plot is only included once it has been fetched."""
+        imdb = Imdb.from_dict(
+            {
+                "raw_title": "The Matrix",
+                "data": {"id": "0133093", "title": "The Matrix", "year": 1999},
+            }
+        )
+
+        assert "plot" not in imdb.to_dict()["data"]
+        assert imdb.title == "The Matrix"
+        assert imdb.cast() == []
+
+    @my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/no_results.yaml")
+    async def test_no_results(self) -> None:
+        """An instance without results can be recreated."""
+        imdb = Imdb("asldkjnkasnxlajsnxkasjxnas")
+        await imdb.load_source()
+
+        restored = Imdb.from_dict(imdb.to_dict())
+
+        assert restored.title is None
+
+
+class TestExtractedData:
+    """Tests for the data extracted when loading."""
+
+    @patch(IMDB_IA_PATH)
+    async def test_movie_released(self, mock_ia: MagicMock) -> None:
+        """
+        Given a match from `cinemagoer`,
+        When the source is loaded,
+        Then its data points are extracted and the `Movie` isn't kept
+        """
+        mock_ia.get_movie.return_value = Movie(
+            movieID="0133093",
+            data={
+                "title": "The Matrix",
+                "year": 1999,
+                "genres": ["Action", "Sci-Fi"],
+                "cast": [Person(name="Keanu Reeves")],
+                "directors": [Person(name="Lana Wachowski")],
+                "runtimes": ["136"],
+                "rating": 8.7,
+                "kind": "movie",
+            },
+        )
+        imdb = Imdb(movie_id="0133093")
+
+        await imdb.load_source()
+
+        assert not any(isinstance(value, Movie) for value in vars(imdb).values())
+        assert imdb.cast() == ["Keanu Reeves"]
+        assert imdb.directors() == ["Lana Wachowski"]
+        assert imdb.runtime == "136"
+        assert imdb.rating == 8.7
+
+    @patch(IMDB_IA_PATH)
+    async def test_plot_fetched_once(self, mock_ia: MagicMock) -> None:
+        """A plot fetched after loading is kept with the data points."""
+
+        def update(movie: Movie, info: List[str]) -> None:  # noqa: ARG001
+            movie["plot"] = ["A hacker learns the truth.::someone"]
+
+        mock_ia.update.side_effect = update
+        imdb = Imdb.from_dict({"movie_id": "0133093", "data": {"id": "0133093"}})
+
+        assert imdb.plot == "A hacker learns the truth."
+        assert imdb.plot == "A hacker learns the truth."
+        mock_ia.update.assert_called_once()
+        assert imdb.to_dict()["data"]["plot"] == ["A hacker learns the truth.::someone"]
+
+
+class TestMatchScore:
+    """Tests for the `match_score` property."""
+
+    def test_match_score(self) -> None:
+        """The loaded result is scored against the search terms."""
+        imdb = Imdb.from_dict(
+            {
+                "raw_title": "Amelie",
+                "raw_year": 2001,
+                "data": {"id": "0211915", "title": "Amélie", "year": 2001},
+            }
+        )
+
+        assert imdb.match_score == pytest.approx(1)
+
+    def test_movie_id(self) -> None:
+        """There's no score if only a movie id was given."""
+        imdb = Imdb.from_dict(
+            {"movie_id": "0211915", "data": {"id": "0211915", "title": "Amélie"}}
+        )
+
+        assert imdb.match_score is None
+
+
+class TestResultCache:
+    """Tests for loading with the result cache configured."""
+
+    @pytest.mark.usefixtures("result_cache")
+    async def test_cached_result(self) -> None:
+        """A second search for the same id is served from the cache."""
+        with my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/the_matrix_by_id.yaml") as cass:
+            await Imdb(movie_id="0133093").load_source()
+            play_count = cass.play_count
+            imdb = Imdb(movie_id="0133093")
+            await imdb.load_source()
+
+            assert cass.play_count == play_count
+
+        assert imdb.title == "The Matrix"
+        assert "Neo" in str(imdb.plot)
+
+    @pytest.mark.usefixtures("result_cache")
+    @patch(f"{IMDB_IA_PATH}.update")
+    async def test_cached_result_without_plot(self, mock_update: MagicMock) -> None:
+        """A cached result without the plot isn't used when the plot is requested."""
+        with my_vcr.use_cassette(
+            f"{VCR_FIXTURES_DIR}/the_matrix.yaml", allow_playback_repeats=True
+        ):
+            await Imdb("The Matrix").load_source()
+            await Imdb("The Matrix").load_source()
+
+            assert mock_update.call_count == 1
+
+            await Imdb("The Matrix").load_source(info=["main", "plot"])
+
+        assert mock_update.call_count == 2
+        assert mock_update.call_args.kwargs == {"info": ["main", "plot"]}
+
+
 #     @patch(IMDB_IA_PATH)
 #     async def test_valid_movie_id_with_raw_title(
 #         self,
@@ -511,3 +720,259 @@ class TestMovieId:
 
 #         assert imdb.title == "The Matrix"
 #         mock_ia.search_movie.assert_not_called()
+
+
+class TestExecutor:
+    """Tests for running the IMDb lookups in a dedicated executor."""
+
+    @my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/the_matrix.yaml")
+    async def test_given_executor(self) -> None:
+        """The lookup is run in the given executor."""
+        with MeteredExecutor(ThreadPoolExecutor(1), max_workers=1) as executor:
+            imdb = Imdb("The Matrix")
+            await imdb.load_source(executor=executor)
+
+        assert imdb.title == "The Matrix"
+        assert executor.metrics()["completed"] == 1
+
+    @my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/the_matrixy.yaml")
+    async def test_configured_executor(self) -> None:
+        """The lookup is run in the configured executor."""
+        executor = configure_imdb_executor(max_workers=1)
+
+        try:
+            imdb = Imdb("The Matrixy")
+            await imdb.load_source()
+        finally:
+            disable_imdb_executor()
+
+        assert imdb.title == "The Matrix"
+        assert imdb.low_confidence is True
+        assert executor.metrics()["completed"] == 1
+
+
+class TestWebBackend:
+    """Tests for loading with the "web" backend."""
+
+    @pytest.fixture(autouse=True)
+    def _web_backend(self) -> Iterator[None]:
+        """Use the "web" backend for the duration of a test."""
+        set_backend("web")
+        yield
+        set_backend()
+
+    def test_invalid_backend(self) -> None:
+        """An unrecognised backend is rejected."""
+        with pytest.raises(ValueError, match="blort is not a recognised IMDb backend"):
+            set_backend("blort")
+
+        assert get_backend() == "web"
+
+    @vcr.use_cassette(f"{WEB_VCR_FIXTURES_DIR}/the_matrix.yaml")
+    async def test_exact_match(self) -> None:
+        """
+        Given a raw title,
+        When there is an exact match from IMDb,
+        Then the match is loaded over `aiohttp`, including the plot
+        """
+        imdb = Imdb("The Matrix", raw_year=1999)
+        await imdb.load_source()
+
+        assert imdb.title == "The Matrix"
+        assert imdb.id == "0133093"
+        assert imdb.year == 1999
+        assert imdb.genres() == ["Action", "Sci-Fi"]
+        assert imdb.cast(1) == ["Keanu Reeves"]
+        assert imdb.directors() == ["Lana Wachowski", "Lilly Wachowski"]
+        assert imdb.runtime == "136"
+        assert imdb.rating == 8.7
+        assert imdb.plot is not None
+        assert imdb.plot.startswith("When a beautiful stranger")
+        assert imdb.low_confidence is False
+
+    @vcr.use_cassette(f"{WEB_VCR_FIXTURES_DIR}/the_matrixy.yaml")
+    async def test_no_exact_match(self) -> None:
+        """The first result is selected with low confidence."""
+        imdb = Imdb("The Matrixy")
+        await imdb.load_source()
+
+        assert imdb.title == "The Matrix"
+        assert imdb.low_confidence is True
+
+    @vcr.use_cassette(f"{WEB_VCR_FIXTURES_DIR}/no_results.yaml")
+    async def test_no_results(self) -> None:
+        """Nothing is loaded if there are no results."""
+        imdb = Imdb("asldkjnkasnxlajsnxkasjxnas")
+        await imdb.load_source()
+
+        assert imdb.title is None
+
+    @vcr.use_cassette(f"{WEB_VCR_FIXTURES_DIR}/get_the_matrix.yaml")
+    async def test_movie_id(self) -> None:
+        """A movie id is loaded without a search."""
+        imdb = Imdb(movie_id="0133093")
+        await imdb.load_source()
+
+        assert imdb.title == "The Matrix"
+
+    @vcr.use_cassette(f"{WEB_VCR_FIXTURES_DIR}/get_invalid_id.yaml")
+    async def test_invalid_movie_id(self) -> None:
+        """Nothing is loaded for an unrecognised movie id with no title."""
+        imdb = Imdb(movie_id="9999999999")
+        await imdb.load_source()
+
+        assert imdb.title is None
+
+
+class TestDatasetBackend:
+    """Tests for loading with the "dataset" backend."""
+
+    @pytest.fixture(autouse=True)
+    def _dataset_backend(self, tmp_path: Path) -> Iterator[None]:
+        """Use the "dataset" backend with the sample datasets for a test."""
+        build_imdb_dataset(DATASET_DIR, tmp_path).close()
+        configure_imdb_dataset(tmp_path)
+        set_backend("dataset")
+        yield
+        set_backend()
+        disable_imdb_dataset()
+
+    def test_no_store(self) -> None:
+        """The backend can't be used without a store."""
+        disable_imdb_dataset()
+
+        with pytest.raises(ValueError, match="The dataset backend needs a store"):
+            set_backend("dataset")
+
+    async def test_exact_match(self) -> None:
+        """
+        Given a raw title,
+        When there is an exact match in the store,
+        Then the match is loaded without any requests
+        """
+        imdb = Imdb("The Matrix")
+
+        with patch(IMDB_IA_PATH) as mock_ia:
+            await imdb.load_source()
+
+        mock_ia.search_movie.assert_not_called()
+        assert imdb.title == "The Matrix"
+        assert imdb.id == "0133093"
+        assert imdb.year == 1999
+        assert imdb.genres() == ["Action", "Sci-Fi"]
+        assert imdb.cast(1) == ["Keanu Reeves"]
+        assert imdb.directors() == ["Lana Wachowski", "Lilly Wachowski"]
+        assert imdb.runtime == "136"
+        assert imdb.rating == 8.7
+        assert imdb.low_confidence is False
+
+    async def test_year_match(self) -> None:
+        """The year is used to pick between movies with the same title."""
+        imdb = Imdb("The Matrix", raw_year=2012)
+        await imdb.load_source()
+
+        assert imdb.id == "9999991"
+        assert imdb.low_confidence is False
+
+    async def test_normalised_match(self) -> None:
+        """A title matching only once normalised is low confidence."""
+        imdb = Imdb("amelie")
+        await imdb.load_source()
+
+        assert imdb.title == "Amélie"
+        assert imdb.low_confidence is True
+
+    async def test_no_results(self) -> None:
+        """Nothing is loaded if there are no results."""
+        imdb = Imdb("The Matrixy")
+        await imdb.load_source()
+
+        assert imdb.title is None
+
+    async def test_movie_id(self) -> None:
+        """A movie id is preferred over the title."""
+        imdb = Imdb("Alien", movie_id="0133093")
+        await imdb.load_source()
+
+        assert imdb.title == "The Matrix"
+
+    async def test_invalid_movie_id(self) -> None:
+        """An unrecognised movie id falls back to the title."""
+        imdb = Imdb("Alien", movie_id="0000001")
+        await imdb.load_source()
+
+        assert imdb.title == "Alien"
+
+
+class TestTitleIndex:
+    """Tests for resolving titles with a title index."""
+
+    @pytest.fixture(autouse=True)
+    def _title_index(self, tmp_path: Path) -> Iterator[None]:
+        """Configure a title index for the duration of a test."""
+        entries = [
+            TitleEntry("0133093", "The Matrix", 1999, 2000000),
+            TitleEntry("9999991", "The Matrix", 2012, 12),
+        ]
+        TitleIndex.build(tmp_path / "titles.db", entries).close()
+        configure_title_index(tmp_path / "titles.db")
+        yield
+        disable_title_index()
+
+    @patch(IMDB_IA_PATH)
+    async def test_resolved(self, mock_ia: MagicMock) -> None:
+        """
+        Given a title in the index,
+        When the source is loaded,
+        Then the movie is fetched by id without a search
+        """
+        mock_ia.get_movie.return_value = Movie(
+            movieID="9999991", data={"title": "The Matrix", "year": 2012}
+        )
+        imdb = Imdb("The Matrix", raw_year=2012)
+
+        await imdb.load_source()
+
+        mock_ia.search_movie.assert_not_called()
+        mock_ia.get_movie.assert_called_once_with("9999991", info=["main"])
+        assert imdb.year == 2012
+        assert imdb.low_confidence is False
+
+    @patch(IMDB_IA_PATH)
+    async def test_resolved_low_confidence(self, mock_ia: MagicMock) -> None:
+        """A title only similar to one in the index is low confidence."""
+        mock_ia.get_movie.return_value = Movie(
+            movieID="0133093", data={"title": "The Matrix", "year": 1999}
+        )
+        imdb = Imdb("The Matrixy")
+
+        await imdb.load_source()
+
+        mock_ia.search_movie.assert_not_called()
+        assert imdb.title == "The Matrix"
+        assert imdb.low_confidence is True
+
+    @patch(IMDB_IA_PATH)
+    async def test_miss(self, mock_ia: MagicMock) -> None:
+        """A title missing from the index is searched for."""
+        mock_ia.search_movie.return_value = []
+        imdb = Imdb("Alien")
+
+        await imdb.load_source()
+
+        mock_ia.search_movie.assert_called_once_with("Alien")
+        mock_ia.get_movie.assert_not_called()
+        assert imdb.title is None
+
+    @patch(IMDB_IA_PATH)
+    async def test_movie_id(self, mock_ia: MagicMock) -> None:
+        """A given movie id isn't replaced by the index."""
+        mock_ia.get_movie.return_value = Movie(
+            movieID="0078748", data={"title": "Alien", "year": 1979}
+        )
+        imdb = Imdb("The Matrix", movie_id="0078748")
+
+        await imdb.load_source()
+
+        mock_ia.get_movie.assert_called_once_with("0078748")
+        assert imdb.title == "Alien"
@@ -1,7 +1,11 @@
 """Tests for the Mtc class."""
+from concurrent.futures import ProcessPoolExecutor
+
 import pytest
 
 from phylm.sources.mtc import Mtc
+from phylm.utils.executors import configure_parse_executor
+from phylm.utils.executors import disable_parse_executor
 from tests.conftest import FIXTURES_DIR
 from tests.conftest import my_vcr
 
@@ -175,3 +179,93 @@ class TestRating:
         await mtc.load_source()
 
         assert mtc.rating is None
+
+
+class TestToDict:
+    """Tests for the `to_dict` and `from_dict` methods."""
+
+    @my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/matrix.yaml")
+    async def test_round_trip(self) -> None:
+        """A loaded instance can be recreated from its dictionary."""
+        mtc = Mtc("The Matrix")
+        await mtc.load_source()
+
+        restored = Mtc.from_dict(mtc.to_dict())
+
+        assert restored.raw_title == "The Matrix"
+        assert restored.title == "The Matrix"
+        assert restored.year == 1999
+        assert restored.rating == "73"
+        assert restored.low_confidence is False
+
+    @my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/no_results.yaml")
+    async def test_no_results(self) -> None:
+        """An instance without results can be recreated."""
+        mtc = Mtc("asldkjaskdnlaskdjaslkjdas")
+        await mtc.load_source()
+
+        restored = Mtc.from_dict(mtc.to_dict())
+
+        assert restored.title is None
+
+
+class TestMatchScore:
+    """Tests for the `match_score` property."""
+
+    def test_match_score(self) -> None:
+        """The loaded result is scored against the search terms."""
+        data = {"title": "The Matrix", "year": 1999, "rating": "73"}
+
+        exact = Mtc.from_dict(
+            {"raw_title": "the matrix", "raw_year": 1999, "data": data}
+        )
+        other_year = Mtc.from_dict(
+            {"raw_title": "The Matrix", "raw_year": 2010, "data": data}
+        )
+
+        assert exact.match_score == pytest.approx(1)
+        assert other_year.match_score is not None
+        assert other_year.match_score < 1
+
+    def test_not_loaded(self) -> None:
+        """There's no score if nothing is loaded."""
+        assert Mtc("The Matrix").match_score is None
+
+
+class TestResultCache:
+    """Tests for loading with the result cache configured."""
+
+    @pytest.mark.usefixtures("result_cache")
+    async def test_cached_result(self) -> None:
+        """A second search for the same title is served from the cache."""
+        with my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/matrix.yaml") as cass:
+            await Mtc("The Matrix").load_source()
+            mtc = Mtc(" the matrix ")
+            await mtc.load_source()
+
+            assert cass.play_count == 1
+
+        assert mtc.title == "The Matrix"
+        assert mtc.rating == "73"
+
+
+class TestParseExecutor:
+    """Tests for loading with a parse executor configured."""
+
+    @my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/matrix.yaml")
+    async def test_process_pool(self) -> None:
+        """
+        Given a process pool parse executor,
+        When the source is loaded,
+        Then the page is parsed in the pool with the same result
+        """
+        configure_parse_executor(ProcessPoolExecutor(max_workers=1))
+        mtc = Mtc("The Matrix")
+
+        try:
+            await mtc.load_source()
+        finally:
+            disable_parse_executor()
+
+        assert mtc.title == "The Matrix"
+        assert mtc.low_confidence is False
@@ -1,7 +1,11 @@
 """Tests for the Rt class."""
+from concurrent.futures import ProcessPoolExecutor
+
 import pytest
 
 from phylm.sources.rt import Rt
+from phylm.utils.executors import configure_parse_executor
+from phylm.utils.executors import disable_parse_executor
 from tests.conftest import FIXTURES_DIR
 from tests.conftest import my_vcr
 
@@ -162,3 +166,90 @@ class TestTomatoScore:
         await rot_tom.load_source()
 
         assert rot_tom.tomato_score is None
+
+
+class TestToDict:
+    """Tests for the `to_dict` and `from_dict` methods."""
+
+    @my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/matrix.yaml")
+    async def test_round_trip(self) -> None:
+        """A loaded instance can be recreated from its dictionary."""
+        rot_tom = Rt("The Matrix")
+        await rot_tom.load_source()
+
+        restored = Rt.from_dict(rot_tom.to_dict())
+
+        assert restored.title == rot_tom.title
+        assert restored.year == rot_tom.year
+        assert restored.tomato_score == "88"
+        assert restored.low_confidence is rot_tom.low_confidence
+
+
+class TestMatchScore:
+    """Tests for the `match_score` property."""
+
+    def test_match_score(self) -> None:
+        """The loaded result is scored against the search terms."""
+        rt = Rt.from_dict(
+            {
+                "raw_title": "The Matrix",
+                "raw_year": 1999,
+                "data": {"title": "The Matrix", "year": "1999", "tomato_score": "88"},
+            }
+        )
+
+        assert rt.match_score == pytest.approx(1)
+
+    def test_no_year(self) -> None:
+        """A result without a year scores lower if a year is searched for."""
+        rt = Rt.from_dict(
+            {
+                "raw_title": "The Matrix",
+                "raw_year": 1999,
+                "data": {"title": "The Matrix", "year": None, "tomato_score": "88"},
+            }
+        )
+
+        assert rt.match_score == pytest.approx(0.7 / 0.9)
+
+    def test_not_loaded(self) -> None:
+        """There's no score if nothing is loaded."""
+        assert Rt("The Matrix").match_score is None
+
+
+class TestResultCache:
+    """Tests for loading with the result cache configured."""
+
+    @pytest.mark.usefixtures("result_cache")
+    async def test_cached_result(self) -> None:
+        """A second search for the same title is served from the cache."""
+        with my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/matrix.yaml") as cass:
+            await Rt("The Matrix").load_source()
+            rot_tom = Rt("The Matrix")
+            await rot_tom.load_source()
+
+            assert cass.play_count == 1
+
+        assert rot_tom.tomato_score == "88"
+
+
+class TestParseExecutor:
+    """Tests for loading with a parse executor configured."""
+
+    @my_vcr.use_cassette(f"{VCR_FIXTURES_DIR}/matrix.yaml")
+    async def test_process_pool(self) -> None:
+        """
+        Given a process pool parse executor,
+        When the source is loaded,
+        Then the page is parsed in the pool with the same result
+        """
+        configure_parse_executor(ProcessPoolExecutor(max_workers=1))
+        rt = Rt("The Matrix")
+
+        try:
+            await rt.load_source()
+        finally:
+            disable_parse_executor()
+
+        assert rt.title == "The Matrix"
+        assert rt.low_confidence is False
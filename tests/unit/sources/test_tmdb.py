@@ -1,10 +1,13 @@
 """Module for TMDB tests."""
+from typing import Any
+from typing import List
 from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import Mock
 from unittest.mock import patch
 
 import pytest
+from aiohttp import ClientSession
 
 from phylm.sources.tmdb import Tmdb
 from tests.conftest import FIXTURES_DIR
@@ -50,6 +53,8 @@ class TestInit:
         await tmdb.load_source()
 
         assert tmdb.title is None
+        assert tmdb.id is None
+        assert tmdb.imdb_id is None
 
 
 class TestYearMatching:
@@ -78,7 +83,7 @@ class TestLoadSource:
 
         await tmdb.load_source()
 
-        get_movie_mock.assert_awaited_once_with("abc")
+        get_movie_mock.assert_awaited_once_with("abc", append_to_response=None)
 
     @patch(f"{MODULE_PATH}.initialize_tmdb_client")
     async def test_title_and_year(self, mock_initialize_client: MagicMock) -> None:
@@ -97,7 +102,7 @@ class TestLoadSource:
         await tmdb.load_source()
 
         search_movies_mock.assert_awaited_once_with("The Matrix", year=1999)
-        get_movie_mock.assert_awaited_once_with("abc")
+        get_movie_mock.assert_awaited_once_with("abc", append_to_response=None)
 
     @patch(f"{MODULE_PATH}.initialize_tmdb_client")
     async def test_no_results(self, mock_initialize_client: MagicMock) -> None:
@@ -129,11 +134,110 @@ class TestLoadSource:
         mock_session = Mock()
         await tmdb.load_source(session=mock_session)
 
-        assert mock_initialize_client.call_count == 2
-        assert mock_initialize_client.call_args_list[1][1] == {
-            "async_session": mock_session
+        mock_initialize_client.assert_called_once_with(None, async_session=mock_session)
+        get_movie_mock.assert_awaited_once_with("abc", append_to_response=None)
+
+    @patch(f"{MODULE_PATH}.initialize_tmdb_client")
+    async def test_client_closed(self, mock_initialize_client: MagicMock) -> None:
+        """The client is closed at the end of the load."""
+        mock_initialize_client.return_value.get_movie = AsyncMock()
+
+        await Tmdb(movie_id="abc", api_key="nice_key").load_source()
+
+        mock_initialize_client.assert_called_once_with("nice_key", async_session=None)
+        mock_initialize_client.return_value.__aexit__.assert_awaited_once()
+
+    @vcr.use_cassette(f"{VCR_FIXTURES_DIR}/the_matrix.yaml")
+    async def test_own_session_closed(self) -> None:
+        """A session opened for the load is closed before it returns."""
+        sessions: List[ClientSession] = []
+
+        def _session(**kwargs: Any) -> ClientSession:
+            session = ClientSession(**kwargs)
+            sessions.append(session)
+            return session
+
+        with patch("phylm.clients.tmdb.ClientSession", _session):
+            await Tmdb("The Matrix").load_source()
+
+        assert len(sessions) == 1
+        assert sessions[0].closed
+
+    @patch(f"{MODULE_PATH}.initialize_tmdb_client")
+    async def test_append_to_response(self, mock_initialize_client: MagicMock) -> None:
+        """Sub-resources are requested along with the movie."""
+        get_movie_mock = AsyncMock()
+        mock_initialize_client.return_value.get_movie = get_movie_mock
+
+        tmdb = Tmdb(movie_id="abc")
+
+        await tmdb.load_source(append_to_response=["credits"])
+
+        get_movie_mock.assert_awaited_once_with("abc", append_to_response=["credits"])
+
+    async def test_unrecognised_sub_resource(self) -> None:
+        """An unrecognised sub-resource is rejected."""
+        tmdb = Tmdb(movie_id="abc")
+
+        with pytest.raises(ValueError, match="Unrecognised TMDB sub-resources: blort"):
+            await tmdb.load_source(append_to_response=["credits", "blort"])
+
+
+class TestSubResources:
+    """Tests for the data points from appended sub-resources."""
+
+    @pytest.fixture(name="tmdb")
+    def tmdb_fixture(self) -> Tmdb:
+        """Return an instance loaded with credits and watch providers."""
+        return Tmdb.from_dict(
+            {
+                "movie_id": "603",
+                "data": {
+                    "title": "The Matrix",
+                    "credits": {
+                        "cast": [
+                            {"name": "Keanu Reeves"},
+                            {"name": "Carrie-Anne Moss"},
+                        ],
+                        "crew": [
+                            {"name": "Don Davis", "job": "Original Music Composer"},
+                            {"name": "Lana Wachowski", "job": "Director"},
+                        ],
+                    },
+                    "watch/providers": {"results": {"GB": {"link": "foo"}}},
+                },
+            }
+        )
+
+    def test_cast(self, tmdb: Tmdb) -> None:
+        """The cast is returned from the credits."""
+        assert tmdb.cast(limit=1) == ["Keanu Reeves"]
+
+    def test_directors(self, tmdb: Tmdb) -> None:
+        """Only the directors are returned from the crew."""
+        assert tmdb.directors() == ["Lana Wachowski"]
+
+    def test_streaming_providers(self, tmdb: Tmdb) -> None:
+        """The providers are returned for the given regions."""
+        assert tmdb.streaming_providers(["gb", "us"]) == {
+            "gb": {"link": "foo"},
+            "us": {},
         }
 
+    def test_round_trip(self, tmdb: Tmdb) -> None:
+        """Sub-resources are kept by `to_dict`."""
+        restored = Tmdb.from_dict(tmdb.to_dict())
+
+        assert restored.cast() == ["Keanu Reeves", "Carrie-Anne Moss"]
+
+    def test_not_loaded(self) -> None:
+        """Nothing is returned if the sub-resources weren't loaded."""
+        tmdb = Tmdb.from_dict({"movie_id": "603", "data": {"title": "The Matrix"}})
+
+        assert tmdb.cast() == []
+        assert tmdb.directors() == []
+        assert tmdb.streaming_providers(["gb"]) == {"gb": {}}
+
 
 class TestId:
     """Tests for the `id` property."""
@@ -217,3 +321,95 @@ class TestPlot:
         await tmdb.load_source()
 
         assert tmdb.plot
+
+
+class TestToDict:
+    """Tests for the `to_dict` and `from_dict` methods."""
+
+    @vcr.use_cassette(f"{VCR_FIXTURES_DIR}/the_matrix.yaml")
+    async def test_round_trip(self) -> None:
+        """A loaded instance can be recreated from its dictionary."""
+        tmdb = Tmdb("The Matrix")
+        await tmdb.load_source()
+
+        restored = Tmdb.from_dict(tmdb.to_dict())
+
+        assert restored.title == "The Matrix"
+        assert restored.id == "603"
+        assert restored.imdb_id == "tt0133093"
+        assert restored.genres() == ["Action", "Science Fiction"]
+        assert restored.runtime == 136
+        assert restored.year == 1999
+        assert restored.rating == 8.2
+        assert restored.plot == tmdb.plot
+
+    @vcr.use_cassette(f"{VCR_FIXTURES_DIR}/the_matrix.yaml")
+    async def test_unused_fields_dropped(self) -> None:
+        """Only the fields used by the properties are kept."""
+        tmdb = Tmdb("The Matrix")
+        await tmdb.load_source()
+
+        data = tmdb.to_dict()["data"]
+
+        assert "title" in data
+        assert "production_companies" not in data
+
+
+class TestMatchScore:
+    """Tests for the `match_score` property."""
+
+    def test_match_score(self) -> None:
+        """The loaded result is scored against the search terms."""
+        tmdb = Tmdb.from_dict(
+            {
+                "raw_title": "The Matrix Reloaded",
+                "raw_year": 2003,
+                "data": {"title": "The Matrix", "release_date": "1999-03-30"},
+            }
+        )
+
+        assert tmdb.match_score is not None
+        assert 0 < tmdb.match_score < 1
+
+    def test_movie_id(self) -> None:
+        """There's no score if only a movie id was given."""
+        tmdb = Tmdb.from_dict(
+            {"movie_id": "603", "data": {"title": "The Matrix", "id": 603}}
+        )
+
+        assert tmdb.match_score is None
+
+
+class TestResultCache:
+    """Tests for loading with the result cache configured."""
+
+    @pytest.mark.usefixtures("result_cache")
+    async def test_cached_result(self) -> None:
+        """A second search for the same title is served from the cache."""
+        with vcr.use_cassette(f"{VCR_FIXTURES_DIR}/the_matrix.yaml") as cass:
+            await Tmdb("The Matrix").load_source()
+            play_count = cass.play_count
+            tmdb = Tmdb("The Matrix")
+            await tmdb.load_source()
+
+            assert cass.play_count == play_count
+
+        assert tmdb.title == "The Matrix"
+
+    @pytest.mark.usefixtures("result_cache")
+    @patch(f"{MODULE_PATH}.initialize_tmdb_client")
+    async def test_cached_result_without_sub_resources(
+        self, mock_initialize_client: MagicMock
+    ) -> None:
+        """A cached result isn't used if it doesn't have the requested sub-resources."""
+        get_movie_mock = AsyncMock(return_value={"title": "The Matrix"})
+        mock_initialize_client.return_value.get_movie = get_movie_mock
+
+        await Tmdb(movie_id="603").load_source()
+        await Tmdb(movie_id="603").load_source()
+
+        assert get_movie_mock.await_count == 1
+
+        await Tmdb(movie_id="603").load_source(append_to_response=["credits"])
+
+        assert get_movie_mock.await_count == 2
@@ -0,0 +1,329 @@
+"""Tests for the `batch` module."""
+import asyncio
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from phylm import Phylm
+from phylm.batch import PhylmBatch
+from phylm.batch import iter_sources
+from phylm.batch import load_many
+
+MODULE_PATH = "phylm.batch"
+pytestmark = pytest.mark.asyncio
+
+
+class ConcurrencyTracker:
+    """Stand in for `Phylm.load_source` which records peak concurrency."""
+
+    def __init__(self) -> None:
+        """Initialize the tracker."""
+        self.running: Dict[str, int] = {}
+        self.peak: Dict[str, int] = {}
+        self.sessions: List[Any] = []
+        self.options: List[Dict[str, Any]] = []
+
+    async def __call__(self, source: str, session: Any = None, **options: Any) -> None:
+        """Pretend to load a source."""
+        self.sessions.append(session)
+        self.options.append(options)
+        self.running[source] = self.running.get(source, 0) + 1
+        self.peak[source] = max(self.peak.get(source, 0), self.running[source])
+        await asyncio.sleep(0.01)
+        self.running[source] -= 1
+
+
+class TestInit:
+    """Tests for the `__init__` method."""
+
+    def test_invalid_concurrency(self) -> None:
+        """An error is raised for a concurrency less than 1."""
+        with pytest.raises(ValueError, match="`concurrency` must be at least 1"):
+            PhylmBatch(["imdb"], concurrency=0)
+
+    def test_invalid_source_limits(self) -> None:
+        """An error is raised for a source limit less than 1."""
+        with pytest.raises(ValueError, match="`source_limits` must all be at least 1"):
+            PhylmBatch(["imdb"], source_limits={"imdb": 0})
+
+
+class TestLoadMany:
+    """Tests for the `load_many` method."""
+
+    async def test_not_opened(self) -> None:
+        """An error is raised if the batch is used outside of `async with`."""
+        batch = PhylmBatch(["mtc"])
+
+        with pytest.raises(RuntimeError, match="must be opened"):
+            await batch.load("The Matrix")
+
+    async def test_loads_every_film(self) -> None:
+        """Every film is loaded through one shared session."""
+        tracker = ConcurrencyTracker()
+
+        with patch.object(Phylm, "load_source", tracker):
+            async with PhylmBatch(["mtc", "rt"]) as batch:
+                results = [p async for p in batch.load_many(["A", "B", "C"])]
+                session = batch.session
+
+        assert sorted(p.title for p in results) == ["A", "B", "C"]
+        assert len(tracker.sessions) == 6
+        assert all(s is session for s in tracker.sessions)
+        assert session.closed
+
+    async def test_existing_phylm_instances(self) -> None:
+        """`Phylm` instances are loaded as given."""
+        phylm = Phylm(title="The Matrix", year=1999)
+
+        with patch.object(Phylm, "load_source", ConcurrencyTracker()):
+            async with PhylmBatch(["mtc"]) as batch:
+                results = [p async for p in batch.load_many([phylm])]
+
+        assert results == [phylm]
+
+    async def test_concurrency(self) -> None:
+        """No more than `concurrency` films are loaded at once."""
+        tracker = ConcurrencyTracker()
+
+        with patch.object(Phylm, "load_source", tracker):
+            async with PhylmBatch(["mtc"], concurrency=2) as batch:
+                results = [p async for p in batch.load_many(["A"] * 10)]
+
+        assert len(results) == 10
+        assert tracker.peak["mtc"] == 2
+
+    async def test_source_limits(self) -> None:
+        """No more than the source limit of loads for that source run at once."""
+        tracker = ConcurrencyTracker()
+
+        with patch.object(Phylm, "load_source", tracker):
+            async with PhylmBatch(
+                ["mtc", "rt"], concurrency=5, source_limits={"rt": 1}
+            ) as batch:
+                results = [p async for p in batch.load_many(["A"] * 10)]
+
+        assert len(results) == 10
+        assert tracker.peak["mtc"] == 5
+        assert tracker.peak["rt"] == 1
+
+    async def test_given_session(self) -> None:
+        """A given session is used and remains open."""
+        session = MagicMock(closed=False)
+        tracker = ConcurrencyTracker()
+
+        with patch.object(Phylm, "load_source", tracker):
+            async with PhylmBatch(["mtc"], session=session) as batch:
+                _ = [p async for p in batch.load_many(["A"])]
+
+        assert tracker.sessions == [session]
+        session.close.assert_not_called()
+
+    async def test_source_options(self) -> None:
+        """The IMDb info sets and TMDB sub-resources are passed to every load."""
+        tracker = ConcurrencyTracker()
+
+        with patch.object(Phylm, "load_source", tracker):
+            async with PhylmBatch(
+                ["imdb", "tmdb"],
+                imdb_info=["main", "plot"],
+                tmdb_append_to_response=["credits"],
+            ) as batch:
+                _ = [p async for p in batch.load_many(["A"])]
+
+        assert (
+            tracker.options
+            == [{"imdb_info": ["main", "plot"], "tmdb_append_to_response": ["credits"]}]
+            * 2
+        )
+
+    async def test_error(self) -> None:
+        """An error from a film load is raised and the remaining loads cancelled."""
+
+        async def load_source(phylm: Phylm, *_: Any, **__: Any) -> None:
+            if phylm.title == "bad":
+                raise RuntimeError("boom")
+            await asyncio.sleep(1)
+
+        with patch.object(Phylm, "load_source", load_source):
+            async with PhylmBatch(["mtc"]) as batch:
+                with pytest.raises(RuntimeError, match="boom"):
+                    _ = [p async for p in batch.load_many(["good", "bad"])]
+
+    async def test_partial(self) -> None:
+        """With `partial` set, an error is recorded on the film instead."""
+        error = RuntimeError("boom")
+
+        async def load_source(phylm: Phylm, source: str, **__: Any) -> None:
+            if phylm.title == "bad" and source == "rt":
+                raise error
+
+        with patch.object(Phylm, "load_source", load_source):
+            async with PhylmBatch(["mtc", "rt"], partial=True) as batch:
+                results = {p.title: p async for p in batch.load_many(["good", "bad"])}
+
+        assert results["good"].errors == {}
+        assert results["bad"].errors == {"rt": error}
+
+    async def test_films_taken_lazily(self) -> None:
+        """Films are only taken from the iterable as capacity frees up."""
+        taken: List[str] = []
+
+        def films() -> Iterator[str]:
+            for title in ["A", "B", "C", "D", "E"]:
+                taken.append(title)
+                yield title
+
+        with patch.object(Phylm, "load_source", ConcurrencyTracker()):
+            async with PhylmBatch(["mtc"], concurrency=2) as batch:
+                results = batch.load_many(films())
+                await results.__anext__()
+
+                assert len(taken) == 2
+
+                await results.aclose()
+
+    async def test_stop_early(self) -> None:
+        """Pending loads are cancelled when the consumer stops early."""
+        cancelled: List[str] = []
+
+        async def load_source(phylm: Phylm, *_: Any, **__: Any) -> None:
+            try:
+                await asyncio.sleep(0 if phylm.title == "fast" else 1)
+            except asyncio.CancelledError:
+                cancelled.append(phylm.title)
+                raise
+
+        with patch.object(Phylm, "load_source", load_source):
+            async with PhylmBatch(["mtc"]) as batch:
+                results = batch.load_many(["fast", "slow"])
+                phylm = await results.__anext__()
+                await results.aclose()
+                await asyncio.sleep(0.01)
+
+        assert phylm.title == "fast"
+        assert cancelled == ["slow"]
+
+
+class TestIterSources:
+    """Tests for the `iter_sources` method."""
+
+    async def test_yields_each_source(self) -> None:
+        """A `(phylm, source)` pair is yielded for every source load."""
+        tracker = ConcurrencyTracker()
+
+        with patch.object(Phylm, "load_source", tracker):
+            async with PhylmBatch(["mtc", "rt"]) as batch:
+                results = [pair async for pair in batch.iter_sources(["A", "B"])]
+
+        assert sorted((p.title, source) for p, source in results) == [
+            ("A", "mtc"),
+            ("A", "rt"),
+            ("B", "mtc"),
+            ("B", "rt"),
+        ]
+
+    async def test_concurrency(self) -> None:
+        """No more than `concurrency` films have sources in flight at once."""
+        films: Dict[str, int] = {}
+        peak = 0
+
+        async def load_source(phylm: Phylm, source: str, **__: Any) -> None:
+            nonlocal peak
+            films[phylm.title] = films.get(phylm.title, 0) + 1
+            peak = max(peak, len(films))
+            await asyncio.sleep(0.01 if source == "mtc" else 0)
+            films[phylm.title] -= 1
+            if not films[phylm.title]:
+                del films[phylm.title]
+
+        with patch.object(Phylm, "load_source", load_source):
+            async with PhylmBatch(
+                ["imdb", "mtc", "rt", "tmdb"], concurrency=2
+            ) as batch:
+                results = [pair async for pair in batch.iter_sources("ABCDEF")]
+
+        assert len(results) == 24
+        assert peak == 2
+
+    async def test_source_limits(self) -> None:
+        """Source limits are respected."""
+        tracker = ConcurrencyTracker()
+
+        with patch.object(Phylm, "load_source", tracker):
+            async with PhylmBatch(
+                ["mtc", "rt"], concurrency=4, source_limits={"mtc": 1}
+            ) as batch:
+                results = [pair async for pair in batch.iter_sources(["A"] * 8)]
+
+        assert len(results) == 16
+        assert tracker.peak["mtc"] == 1
+        assert tracker.peak["rt"] == 4
+
+
+class TestLoadManyFunction:
+    """Tests for the module level `load_many` function."""
+
+    @patch(f"{MODULE_PATH}.PhylmBatch", autospec=True)
+    async def test_success(self, mock_batch: MagicMock) -> None:
+        """A batch is opened with the given options and results are yielded."""
+        phylm = Phylm(title="The Matrix")
+
+        async def _load_many(*_: Any) -> Any:
+            yield phylm
+
+        batch = mock_batch.return_value.__aenter__.return_value
+        batch.load_many = _load_many
+
+        results = [
+            p
+            async for p in load_many(
+                ["The Matrix"], ["imdb"], concurrency=3, source_limits={"imdb": 1}
+            )
+        ]
+
+        assert results == [phylm]
+        mock_batch.assert_called_once_with(
+            ["imdb"],
+            concurrency=3,
+            source_limits={"imdb": 1},
+            partial=False,
+            imdb_info=None,
+            tmdb_append_to_response=None,
+        )
+
+
+class TestIterSourcesFunction:
+    """Tests for the module level `iter_sources` function."""
+
+    @patch(f"{MODULE_PATH}.PhylmBatch", autospec=True)
+    async def test_success(self, mock_batch: MagicMock) -> None:
+        """A batch is opened with the given options and pairs are yielded."""
+        phylm = Phylm(title="The Matrix")
+
+        async def _iter_sources(*_: Any) -> Any:
+            yield phylm, "imdb"
+
+        batch = mock_batch.return_value.__aenter__.return_value
+        batch.iter_sources = _iter_sources
+
+        results = [
+            pair
+            async for pair in iter_sources(
+                ["The Matrix"], ["imdb"], partial=True, imdb_info=["main"]
+            )
+        ]
+
+        assert results == [(phylm, "imdb")]
+        mock_batch.assert_called_once_with(
+            ["imdb"],
+            concurrency=10,
+            source_limits=None,
+            partial=True,
+            imdb_info=["main"],
+            tmdb_append_to_response=None,
+        )
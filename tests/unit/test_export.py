@@ -0,0 +1,211 @@
+"""Tests for the export module."""
+import datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from phylm.errors import UnrecognizedSourceError
+from phylm.export import ArrowExporter
+from phylm.export import export_many
+from phylm.export import export_schema
+from phylm.phylm import Phylm
+from tests.conftest import FIXTURES_DIR
+from tests.conftest import my_vcr
+from tests.conftest import vcr
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+pytestmark = pytest.mark.asyncio
+my_vcr.serializer = "response_body_compressor"
+
+
+async def _no_load(*_: Any, **__: Any) -> None:
+    return None
+
+
+class TestExportSchema:
+    """Tests for the `export_schema` function."""
+
+    def test_types(self) -> None:
+        """The columns of each source are typed."""
+        schema = export_schema(["imdb", "mtc"])
+
+        assert schema.names[:4] == ["title", "year", "imdb_id", "tmdb_id"]
+        assert schema.field("imdb_rating").type == pa.float64()
+        assert schema.field("imdb_year").type == pa.int32()
+        assert schema.field("imdb_genres").type == pa.list_(pa.string())
+        assert schema.field("imdb_cast").type == pa.list_(pa.string())
+        assert schema.field("mtc_rating").type == pa.int32()
+        assert schema.names[-2:] == ["imdb_error", "mtc_error"]
+        assert "rt_title" not in schema.names
+
+    def test_unrecognised_source(self) -> None:
+        """An unrecognised source is rejected."""
+        with pytest.raises(UnrecognizedSourceError):
+            export_schema(["imdb", "letterboxd"])
+
+
+class TestArrowExporter:
+    """Tests for the `ArrowExporter` class."""
+
+    async def test_scores_typed(self) -> None:
+        """
+        Given a film with its Metacritic and Rotten Tomatoes sources loaded,
+        When it's exported,
+        Then the scores are exported as numbers
+        """
+        phylm = Phylm("The Matrix")
+        with my_vcr.use_cassette(f"{FIXTURES_DIR}/mtc/matrix.yaml"):
+            await phylm.load_source("mtc")
+        with my_vcr.use_cassette(f"{FIXTURES_DIR}/rt/matrix.yaml"):
+            await phylm.load_source("rt")
+        exporter = ArrowExporter(["mtc", "rt"])
+
+        assert exporter.add(phylm) is None
+        batch = exporter.flush()
+
+        assert batch is not None
+        row = batch.to_pylist()[0]
+        assert row["title"] == "The Matrix"
+        assert row["mtc_title"] == "The Matrix"
+        assert row["mtc_rating"] == 73
+        assert row["mtc_low_confidence"] is False
+        assert row["rt_year"] == 1999
+        assert isinstance(row["rt_tomato_score"], int)
+        assert row["mtc_error"] is None
+
+    @vcr.use_cassette(f"{FIXTURES_DIR}/tmdb/the_matrix.yaml")
+    async def test_list_columns(self) -> None:
+        """Genres and the release date are exported with their own types."""
+        phylm = Phylm("The Matrix")
+        await phylm.load_source("tmdb")
+
+        with ArrowExporter(["tmdb"]) as exporter:
+            exporter.add(phylm)
+            batch = exporter.flush()
+
+        assert batch is not None
+        row = batch.to_pylist()[0]
+        assert row["tmdb_genres"] == ["Action", "Science Fiction"]
+        assert row["tmdb_release_date"] == datetime.date(1999, 3, 30)
+        assert row["tmdb_rating"] == 8.2
+
+    async def test_no_results(self) -> None:
+        """The columns of a source which found nothing are null."""
+        phylm = Phylm("asldkjnkasnxlajsnxkasjxnas")
+        with vcr.use_cassette(f"{FIXTURES_DIR}/tmdb/no_results.yaml"):
+            await phylm.load_source("tmdb")
+        with my_vcr.use_cassette(f"{FIXTURES_DIR}/imdb/no_results.yaml"):
+            await phylm.load_source("imdb")
+        exporter = ArrowExporter(["imdb", "tmdb"])
+
+        exporter.add(phylm)
+        batch = exporter.flush()
+
+        assert batch is not None
+        row = batch.to_pylist()[0]
+        assert row["imdb_movie_id"] is None
+        assert row["imdb_title"] is None
+        assert row["tmdb_movie_id"] is None
+        assert row["tmdb_title"] is None
+        assert row["tmdb_error"] is None
+
+    def test_not_loaded(self) -> None:
+        """The columns of a source which isn't loaded are null."""
+        phylm = Phylm("The Matrix", year=1999)
+        phylm.errors["imdb"] = ValueError("Oops")
+        exporter = ArrowExporter(["imdb"])
+
+        exporter.add(phylm)
+        batch = exporter.flush()
+
+        assert batch is not None
+        row = batch.to_pylist()[0]
+        assert row["year"] == 1999
+        assert row["imdb_title"] is None
+        assert row["imdb_genres"] is None
+        assert row["imdb_error"] == "ValueError: Oops"
+
+    def test_batches(self, tmp_path: Path) -> None:
+        """
+        Given a path and a batch size,
+        When films are added,
+        Then a batch is returned and written each time one fills up
+        """
+        path = tmp_path / "films.parquet"
+
+        with ArrowExporter(["mtc"], path=path, batch_size=2) as exporter:
+            assert exporter.add(Phylm("Alien")) is None
+            batch = exporter.add(Phylm("Aliens"))
+            assert batch is not None
+            assert batch.num_rows == 2
+            assert exporter.add(Phylm("Alien 3")) is None
+
+        table = pq.read_table(path)
+        assert exporter.rows == 3
+        assert table.schema == exporter.schema
+        assert table.column("title").to_pylist() == ["Alien", "Aliens", "Alien 3"]
+
+    def test_empty(self, tmp_path: Path) -> None:
+        """A file with the schema is written when no films are added."""
+        path = tmp_path / "films.parquet"
+
+        with ArrowExporter(["rt"], path=path) as exporter:
+            assert exporter.flush() is None
+
+        table = pq.read_table(path)
+        assert table.num_rows == 0
+        assert table.schema == exporter.schema
+
+    def test_invalid_batch_size(self) -> None:
+        """The batch size must be at least 1."""
+        with pytest.raises(ValueError, match="`batch_size` must be at least 1"):
+            ArrowExporter(["rt"], batch_size=0)
+
+
+class TestExportMany:
+    """Tests for the `export_many` function."""
+
+    async def test_export(self, tmp_path: Path) -> None:
+        """
+        Given many films,
+        When they're exported,
+        Then each batch is yielded as it completes and written to the file
+        """
+        path = tmp_path / "films.parquet"
+        titles = ["Alien", "Aliens", "Alien 3"]
+
+        with patch.object(Phylm, "load_source", _no_load):
+            batches = [
+                batch
+                async for batch in export_many(
+                    titles, ["imdb", "tmdb"], path=path, batch_size=2
+                )
+            ]
+
+        assert [batch.num_rows for batch in batches] == [2, 1]
+        assert sorted(pq.read_table(path).column("title").to_pylist()) == sorted(titles)
+
+    async def test_tmdb_append_to_response(self) -> None:
+        """The TMDB sub-resources are fetched to fill the credits columns."""
+        phylm = Phylm("The Matrix", tmdb_id="603")
+
+        with vcr.use_cassette(
+            f"{FIXTURES_DIR}/clients/tmdb/get_the_matrix_appended.yaml",
+            filter_query_parameters=["api_key"],
+        ):
+            batches = [
+                batch
+                async for batch in export_many(
+                    [phylm],
+                    ["tmdb"],
+                    tmdb_append_to_response=["credits", "watch/providers"],
+                )
+            ]
+
+        row = batches[0].to_pylist()[0]
+        assert row["tmdb_cast"][0] == "Keanu Reeves"
+        assert row["tmdb_directors"] == ["Lana Wachowski", "Lilly Wachowski"]
@@ -1,17 +1,125 @@
 """Test cases for the __main__ module."""
+import json
+from typing import Any
+from unittest.mock import patch
+
 import pytest
 from click.testing import CliRunner
 
 from phylm import __main__
+from phylm.phylm import Phylm
+from tests.conftest import FIXTURES_DIR
+from tests.conftest import my_vcr
+
+MTC_VCR_FIXTURES_DIR = f"{FIXTURES_DIR}/mtc"
+my_vcr.serializer = "response_body_compressor"
 
 
 @pytest.fixture()
 def runner() -> CliRunner:
     """Fixture for invoking command-line interfaces."""
-    return CliRunner()
+    return CliRunner(mix_stderr=False)
 
 
 def test_main_succeeds(runner: CliRunner) -> None:
     """It exits with a status code of zero."""
     result = runner.invoke(__main__.main)
     assert result.exit_code == 0
+
+
+class TestEnrich:
+    """Tests for the `enrich` command."""
+
+    @my_vcr.use_cassette(f"{MTC_VCR_FIXTURES_DIR}/matrix.yaml")
+    def test_lines(self, runner: CliRunner) -> None:
+        """
+        Given a title per line on stdin,
+        When the command is run,
+        Then a JSON line is written for each film with its loaded sources
+        """
+        result = runner.invoke(
+            __main__.main, ["enrich", "--sources", "mtc"], input="The Matrix\n\n"
+        )
+
+        assert result.exit_code == 0
+        lines = result.stdout.splitlines()
+        assert len(lines) == 1
+        record = json.loads(lines[0])
+        assert record["title"] == "The Matrix"
+        assert record["errors"] == {}
+        assert record["sources"]["mtc"]["data"] == {
+            "title": "The Matrix",
+            "year": 1999,
+            "rating": "73",
+        }
+        assert record["sources"]["mtc"]["low_confidence"] is False
+
+    def test_csv(self, runner: CliRunner) -> None:
+        """A CSV file is read with the optional columns."""
+        films = []
+
+        async def load_source(phylm: Phylm, *_: Any, **__: Any) -> None:
+            films.append(phylm)
+
+        with patch.object(Phylm, "load_source", load_source):
+            result = runner.invoke(
+                __main__.main,
+                ["enrich", "--format", "csv", "--sources", "imdb"],
+                input="title,year,imdb_id\nThe Matrix,1999,0133093\nAlien,,\n",
+            )
+
+        assert result.exit_code == 0
+        assert [(f.title, f.year, f.imdb_id) for f in films] == [
+            ("The Matrix", 1999, "0133093"),
+            ("Alien", None, None),
+        ]
+
+    def test_csv_invalid_year(self, runner: CliRunner) -> None:
+        """An invalid year is reported."""
+        with patch.object(Phylm, "load_source"):
+            result = runner.invoke(
+                __main__.main,
+                ["enrich", "--format", "csv"],
+                input="title,year\nThe Matrix,soon\n",
+            )
+
+        assert result.exit_code == 1
+        assert "Line 2: soon is not a valid year" in result.stderr
+
+    def test_csv_without_title(self, runner: CliRunner) -> None:
+        """A CSV file must have a title column."""
+        result = runner.invoke(
+            __main__.main, ["enrich", "--format", "csv"], input="name\nThe Matrix\n"
+        )
+
+        assert result.exit_code == 1
+        assert "must have a title column" in result.stderr
+
+    def test_errors(self, runner: CliRunner) -> None:
+        """A source which fails is reported without stopping the other films."""
+
+        async def load_source(phylm: Phylm, *_: Any, **__: Any) -> None:
+            if phylm.title == "bad":
+                raise RuntimeError("boom")
+
+        with patch.object(Phylm, "load_source", load_source):
+            result = runner.invoke(
+                __main__.main, ["enrich", "--sources", "rt"], input="bad\ngood\n"
+            )
+
+        assert result.exit_code == 0
+        records = {
+            record["title"]: record
+            for record in map(json.loads, result.stdout.splitlines())
+        }
+        assert records["bad"]["errors"] == {"rt": "RuntimeError: boom"}
+        assert records["good"]["errors"] == {}
+        assert records["good"]["sources"] == {}
+
+    @pytest.mark.parametrize("sources", ["imdb,blort", " , "])
+    def test_invalid_sources(self, runner: CliRunner, sources: str) -> None:
+        """Unrecognised sources are rejected."""
+        result = runner.invoke(__main__.main, ["enrich", "--sources", sources])
+
+        assert result.exit_code == 2
+        assert "Invalid value for '--sources'" in result.stderr
@@ -0,0 +1,189 @@
+"""Tests for the mock_server module."""
+import random
+from typing import Optional
+from typing import Tuple
+
+import pytest
+import requests
+from aiohttp import ClientSession
+
+from phylm import Phylm
+from phylm.clients import imdb as imdb_client
+from phylm.clients import tmdb as tmdb_client
+from phylm.mock_server import Behaviour
+from phylm.mock_server import MockServer
+from phylm.mock_server import RecordedResponse
+from phylm.mock_server import constant_latency
+from phylm.mock_server import lognormal_latency
+from phylm.mock_server import point_sources_at
+from phylm.mock_server import uniform_latency
+from phylm.sources import mtc
+from phylm.sources import rt
+from phylm.sources.imdb import WEB_BACKEND
+from phylm.sources.imdb import ia
+from phylm.sources.imdb import set_backend
+from tests.conftest import FIXTURES_DIR
+
+pytestmark = pytest.mark.asyncio
+
+MTC_MATRIX = f"{FIXTURES_DIR}/mtc/matrix.yaml"
+MTC_SEARCH_PATH = "/mtc/search/movie/The+Matrix/results"
+CASSETTES = [
+    f"{FIXTURES_DIR}/imdb/the_matrix.yaml",
+    MTC_MATRIX,
+    f"{FIXTURES_DIR}/rt/matrix.yaml",
+    f"{FIXTURES_DIR}/tmdb/the_matrix.yaml",
+]
+
+
+async def _get(url: str) -> Tuple[int, Optional[str]]:
+    """Return the status and `Retry-After` of the response to a request."""
+    async with ClientSession() as session, session.get(url) as resp:
+        return resp.status, resp.headers.get("Retry-After")
+
+
+class TestLatency:
+    """Tests for the latency distributions."""
+
+    def test_distributions(self) -> None:
+        """Each distribution draws latencies of its shape."""
+        rng = random.Random(1)
+
+        assert constant_latency(0.1)(rng) == 0.1
+        assert all(0.1 <= uniform_latency(0.1, 0.2)(rng) <= 0.2 for _ in range(100))
+        assert all(lognormal_latency(0.1)(rng) > 0 for _ in range(100))
+
+
+class TestMockServer:
+    """Tests for the `MockServer` class."""
+
+    async def test_all_sources(self) -> None:
+        """
+        Given the recorded cassettes of every source,
+        When a film is loaded with the sources pointed at the server,
+        Then every source is loaded from the recorded responses
+        """
+        async with MockServer(CASSETTES) as server:
+            with point_sources_at(server.url):
+                phylm = await Phylm("The Matrix").load_sources(
+                    ["imdb", "mtc", "rt", "tmdb"]
+                )
+
+        assert phylm.imdb.title == "The Matrix"
+        assert phylm.mtc.rating == "73"
+        assert phylm.rt.title == "The Matrix"
+        assert phylm.tmdb.id == "603"
+        assert set(server.requests) == {"imdb", "mtc", "rt", "tmdb"}
+        assert server.statuses == {200: sum(server.requests.values())}
+
+    async def test_imdb_web_backend(self) -> None:
+        """The IMDb source is also served with the "web" backend."""
+        set_backend(WEB_BACKEND)
+        try:
+            async with MockServer(
+                [f"{FIXTURES_DIR}/clients/imdb/the_matrix.yaml"]
+            ) as server:
+                with point_sources_at(server.url):
+                    phylm = await Phylm("The Matrix").load_sources(["imdb"])
+        finally:
+            set_backend()
+
+        assert phylm.imdb.title == "The Matrix"
+        assert phylm.imdb.year == 1999
+        assert server.statuses == {200: 2}
+
+    async def test_fallback(self) -> None:
+        """An unrecorded request to a known endpoint gets the recorded response."""
+        async with MockServer([MTC_MATRIX]) as server:
+            alien = await _get(f"{server.url}/mtc/search/movie/Alien/results")
+            unknown = await _get(f"{server.url}/mtc/unknown")
+
+        assert alien == (200, None)
+        assert unknown == (404, None)
+
+    async def test_no_fallback(self) -> None:
+        """Without fallback an unrecorded request gets a 404."""
+        async with MockServer([MTC_MATRIX], fallback=False) as server:
+            alien = await _get(f"{server.url}/mtc/search/movie/Alien/results")
+
+        assert alien == (404, None)
+
+    async def test_errors(self) -> None:
+        """Requests fail at the error rate."""
+        async with MockServer([MTC_MATRIX], Behaviour(error_rate=1.0)) as server:
+            response = await _get(f"{server.url}{MTC_SEARCH_PATH}")
+
+        assert response == (500, None)
+
+    async def test_throttled(self) -> None:
+        """Requests are throttled at the throttle rate with a `Retry-After`."""
+        behaviour = Behaviour(throttle_rate=1.0, retry_after=3)
+
+        async with MockServer([MTC_MATRIX], behaviour) as server:
+            response = await _get(f"{server.url}{MTC_SEARCH_PATH}")
+
+        assert response == (429, "3")
+
+    async def test_rate_limit(self) -> None:
+        """Requests above the rate limit of a source are throttled."""
+        source_behaviour = {"mtc": Behaviour(rate_limit=1)}
+
+        async with MockServer(
+            [MTC_MATRIX], source_behaviour=source_behaviour
+        ) as server:
+            statuses = [
+                (await _get(f"{server.url}{MTC_SEARCH_PATH}"))[0] for _ in range(3)
+            ]
+
+        assert statuses == [200, 429, 429]
+
+    def test_in_thread(self) -> None:
+        """The server can run in a background thread."""
+        server = MockServer()
+        server.add_response(
+            RecordedResponse(
+                url="https://www.rottentomatoes.com/search?search=Alien",
+                status=200,
+                content_type="text/html",
+                body=b"<html></html>",
+            )
+        )
+
+        with server:
+            res = requests.get(f"{server.url}/rt/search?search=Alien", timeout=5)
+
+        assert res.status_code == 200
+        assert res.text == "<html></html>"
+
+    def test_unknown_host(self) -> None:
+        """Only responses for the sites of the sources can be added."""
+        with pytest.raises(ValueError, match="example.com is not the host"):
+            MockServer().add_response(
+                RecordedResponse("https://example.com/", 200, "text/html", b"")
+            )
+
+
+class TestPointSourcesAt:
+    """Tests for the `point_sources_at` function."""
+
+    def test_restored(self) -> None:
+        """The base urls are pointed at the server and then restored."""
+        urls = dict(ia.urls)
+
+        with point_sources_at("http://127.0.0.1:8080/"):
+            assert mtc.MTC_BASE_MOVIE_URL == "http://127.0.0.1:8080/mtc/search/movie"
+            assert rt.RT_BASE_MOVIE_URL == "http://127.0.0.1:8080/rt/search"
+            assert tmdb_client.TMDB_BASE_URL == "http://127.0.0.1:8080/tmdb/3"
+            assert ia.urls["find"].startswith("http://127.0.0.1:8080/imdb/")
+            assert imdb_client.IMDB_SUGGESTION_URL == (
+                "http://127.0.0.1:8080/imdb/suggestion/x"
+            )
+            assert imdb_client.IMDB_TITLE_URL == "http://127.0.0.1:8080/imdb/title"
+
+        assert mtc.MTC_BASE_MOVIE_URL == "https://www.metacritic.com/search/movie"
+        assert tmdb_client.TMDB_BASE_URL == "https://api.themoviedb.org/3"
+        assert imdb_client.IMDB_SUGGESTION_URL == (
+            "https://v3.sg.media-imdb.com/suggestion/x"
+        )
+        assert imdb_client.IMDB_TITLE_URL == "https://www.imdb.com/title"
+        assert ia.urls == urls
@@ -1,5 +1,8 @@
 """Tests for the `Phylm` module."""
+import asyncio
 from typing import Any
+from typing import Dict
+from unittest.mock import ANY
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
@@ -7,9 +10,13 @@ import pytest
 
 from phylm import Phylm
 from phylm.errors import SourceNotLoadedError
+from phylm.errors import SourceTimeoutError
 from phylm.errors import UnrecognizedSourceError
+from tests.conftest import FIXTURES_DIR
+from tests.conftest import my_vcr
 
 MODULE_PATH = "phylm.phylm"
+my_vcr.serializer = "response_body_compressor"
 
 
 class AsyncMock(MagicMock):
@@ -127,6 +134,22 @@ class TestLoadSource:
                 raw_title="bar", movie_id="abc", raw_year=None
             )
 
+    async def test_recognized_source_imdb_with_info(self) -> None:
+        """
+        Given a `Phylm` instance,
+        When the `load_source` method is invoked with the `imdb` source and info sets,
+        Then the info sets are loaded
+        """
+        phylm = Phylm(title="bar")
+
+        with patch(f"{MODULE_PATH}.Imdb", autospec=True) as mock_imdb:
+            mock_imdb.return_value.load_source = AsyncMock()
+            await phylm.load_source("imdb", imdb_info=["main", "plot"])
+
+            mock_imdb.return_value.load_source.assert_called_once_with(
+                session=None, info=["main", "plot"]
+            )
+
     async def test_recognized_source_imdb_with_movie_id_instance_variable(self) -> None:
         """
         Given a `Phylm` instance,
@@ -214,6 +237,18 @@ class TestLoadSource:
                 raw_title="bar", movie_id="abc", raw_year=None
             )
 
+    async def test_recognized_source_tmdb_with_append_to_response(self) -> None:
+        """Can load `tmdb` source with sub-resources."""
+        phylm = Phylm(title="bar")
+
+        with patch(f"{MODULE_PATH}.Tmdb", autospec=True) as mock_tmdb:
+            mock_tmdb.return_value.load_source = AsyncMock()
+            await phylm.load_source("tmdb", tmdb_append_to_response=["credits"])
+
+            mock_tmdb.return_value.load_source.assert_called_once_with(
+                session=None, append_to_response=["credits"]
+            )
+
     async def test_recognized_source_tmdb_with_movie_id_instance_variable(self) -> None:
         """Can load `tmdb` source with a `movie_id` instance variable."""
         phylm = Phylm(title="foo", tmdb_id="abc")
@@ -244,8 +279,13 @@ class TestLoadSource:
 
         assert mock_source.call_count == 1
 
-    @pytest.mark.parametrize("source_class", ["Rt", "Mtc", "Tmdb"])
-    async def test_with_given_session(self, source_class: str) -> None:
+    @pytest.mark.parametrize(
+        ("source_class", "options"),
+        [("Rt", {}), ("Mtc", {}), ("Tmdb", {"append_to_response": None})],
+    )
+    async def test_with_given_session(
+        self, source_class: str, options: Dict[str, Any]
+    ) -> None:
         """
         Given phylm instance,
         When `load_source` is invoked with a `session`,
@@ -259,7 +299,9 @@ class TestLoadSource:
             source_name = source_class.lower()
             await phylm.load_source(source_name, session=session)
 
-        mock_source.return_value.load_source.assert_called_once_with(session=session)
+        mock_source.return_value.load_source.assert_called_once_with(
+            session=session, **options
+        )
 
 
 @pytest.mark.asyncio()
@@ -287,6 +329,31 @@ class TestLoadSources:
         with pytest.raises(SourceNotLoadedError):
             assert phylm.imdb is None
 
+    @pytest.mark.parametrize("partial", [False, True])
+    async def test_source_options(self, partial: bool) -> None:
+        """The IMDb info sets and TMDB sub-resources are passed to the sources."""
+        phylm = Phylm(title="foo")
+
+        with patch(f"{MODULE_PATH}.Imdb", autospec=True) as mock_imdb, patch(
+            f"{MODULE_PATH}.Tmdb", autospec=True
+        ) as mock_tmdb:
+            mock_imdb.return_value.load_source = AsyncMock()
+            mock_tmdb.return_value.load_source = AsyncMock()
+
+            await phylm.load_sources(
+                ["imdb", "tmdb"],
+                partial=partial,
+                imdb_info=["main", "plot"],
+                tmdb_append_to_response=["credits"],
+            )
+
+        mock_imdb.return_value.load_source.assert_called_once_with(
+            session=ANY, info=["main", "plot"]
+        )
+        mock_tmdb.return_value.load_source.assert_called_once_with(
+            session=ANY, append_to_response=["credits"]
+        )
+
     async def test_one_source_not_recognised(self) -> None:
         """
         Given a list of sources where one is unrecognised,
@@ -302,3 +369,180 @@ class TestLoadSources:
             await phylm.load_sources(["rt", "blort"])
 
         assert phylm.rt == mock_rt.return_value
+
+
+@pytest.mark.asyncio()
+class TestLoadSourcesPartial:
+    """Tests for the `load_sources` method with partial results."""
+
+    async def test_failed_source(self) -> None:
+        """
+        Given a source which raises an error,
+        When the `load_sources` is invoked with `partial` set,
+        Then the other sources are loaded and the error is recorded
+        """
+        phylm = Phylm(title="foo")
+        error = ValueError("boom")
+
+        with patch(f"{MODULE_PATH}.Mtc", autospec=True) as mock_mtc, patch(
+            f"{MODULE_PATH}.Rt", autospec=True
+        ) as mock_rt:
+            mock_mtc.return_value.load_source = AsyncMock()
+            mock_rt.return_value.load_source = AsyncMock(side_effect=error)
+
+            await phylm.load_sources(["rt", "mtc"], partial=True)
+
+        assert phylm.mtc == mock_mtc.return_value
+        assert phylm.errors == {"rt": error}
+        with pytest.raises(SourceNotLoadedError):
+            assert phylm.rt is None
+
+    async def test_deadline(self) -> None:
+        """
+        Given a source which is slower than the deadline,
+        When the `load_sources` is invoked with a `timeout`,
+        Then the call returns at the deadline and the timeout is recorded
+        """
+        phylm = Phylm(title="foo")
+
+        async def slow_load(**_: Any) -> None:
+            await asyncio.sleep(10)
+
+        with patch(f"{MODULE_PATH}.Mtc", autospec=True) as mock_mtc, patch(
+            f"{MODULE_PATH}.Rt", autospec=True
+        ) as mock_rt:
+            mock_mtc.return_value.load_source = AsyncMock()
+            mock_rt.return_value.load_source = slow_load
+
+            await asyncio.wait_for(
+                phylm.load_sources(["rt", "mtc"], timeout=0.05, partial=True), 1
+            )
+
+        assert phylm.mtc == mock_mtc.return_value
+        assert isinstance(phylm.errors["rt"], SourceTimeoutError)
+        assert "mtc" not in phylm.errors
+
+    async def test_source_timeouts(self) -> None:
+        """
+        Given a source which is slower than its own deadline,
+        When the `load_sources` is invoked without `partial`,
+        Then a `SourceTimeoutError` is raised
+        """
+        phylm = Phylm(title="foo")
+
+        async def slow_load(**_: Any) -> None:
+            await asyncio.sleep(10)
+
+        with pytest.raises(SourceTimeoutError, match="rt did not load"), patch(
+            f"{MODULE_PATH}.Rt", autospec=True
+        ) as mock_rt:
+            mock_rt.return_value.load_source = slow_load
+            await phylm.load_sources(["rt"], source_timeouts={"rt": 0.01})
+
+    async def test_deadline_raised(self) -> None:
+        """
+        Given a source which is slower than the deadline,
+        When the `load_sources` is invoked with a `timeout` but without `partial`,
+        Then a `SourceTimeoutError` is raised naming the source
+        """
+        phylm = Phylm(title="foo")
+
+        async def slow_load(**_: Any) -> None:
+            await asyncio.sleep(10)
+
+        with pytest.raises(
+            SourceTimeoutError, match="^rt did not load within 0.05 seconds$"
+        ), patch(f"{MODULE_PATH}.Mtc", autospec=True) as mock_mtc, patch(
+            f"{MODULE_PATH}.Rt", autospec=True
+        ) as mock_rt:
+            mock_mtc.return_value.load_source = AsyncMock()
+            mock_rt.return_value.load_source = slow_load
+            await phylm.load_sources(["rt", "mtc"], timeout=0.05)
+
+    async def test_error_cleared(self) -> None:
+        """
+        Given a source which previously failed,
+        When it's loaded successfully,
+        Then its error is cleared
+        """
+        phylm = Phylm(title="foo")
+        phylm.errors["mtc"] = ValueError("boom")
+
+        with patch(f"{MODULE_PATH}.Mtc", autospec=True) as mock_mtc:
+            mock_mtc.return_value.load_source = AsyncMock()
+            await phylm.load_sources(["mtc"], partial=True)
+
+        assert phylm.errors == {}
+
+    async def test_unrecognised_source(self) -> None:
+        """
+        Given a list of sources where one is unrecognised,
+        When the `load_sources` is invoked with `partial` set,
+        Then a UnrecognizedSourceError is raised
+        """
+        phylm = Phylm(title="foo")
+
+        with pytest.raises(UnrecognizedSourceError):
+            await phylm.load_sources(["rt", "blort"], partial=True)
+
+
+@pytest.mark.asyncio()
+class TestSerialization:
+    """Tests for the serialisation methods."""
+
+    async def test_round_trip(self) -> None:
+        """
+        Given a `Phylm` with loaded sources,
+        When it's serialised as bytes and JSON,
+        Then it can be rebuilt with the same data without loading the sources
+        """
+        phylm = Phylm("The Matrix", year=1999)
+        with my_vcr.use_cassette(f"{FIXTURES_DIR}/mtc/matrix.yaml"):
+            await phylm.load_source("mtc")
+        with my_vcr.use_cassette(f"{FIXTURES_DIR}/rt/matrix.yaml"):
+            await phylm.load_source("rt")
+
+        for restored in (
+            Phylm.from_bytes(phylm.to_bytes()),
+            Phylm.from_json(phylm.to_json()),
+        ):
+            assert restored.title == "The Matrix"
+            assert restored.year == 1999
+            assert restored.mtc.rating == phylm.mtc.rating
+            assert restored.mtc.low_confidence == phylm.mtc.low_confidence
+            assert restored.rt.tomato_score == phylm.rt.tomato_score
+            assert restored.to_dict() == phylm.to_dict()
+            with pytest.raises(SourceNotLoadedError):
+                restored.imdb  # noqa: B018
+
+    def test_sources_restored(self) -> None:
+        """Every source is restored from its data."""
+        data = {
+            "version": 1,
+            "title": "The Matrix",
+            "imdb_id": "0133093",
+            "year": None,
+            "tmdb_id": "603",
+            "sources": {
+                "imdb": {
+                    "movie_id": "0133093",
+                    "data": {"id": "0133093", "title": "The Matrix", "rating": 8.7},
+                },
+                "tmdb": {
+                    "movie_id": "603",
+                    "data": {"id": 603, "genres": [{"id": 28, "name": "Action"}]},
+                },
+            },
+        }
+
+        phylm = Phylm.from_bytes(Phylm.from_dict(data).to_bytes())
+
+        assert phylm.imdb_id == "0133093"
+        assert phylm.imdb.rating == 8.7
+        assert phylm.tmdb.id == "603"
+        assert phylm.tmdb.genres() == ["Action"]
+
+    def test_unsupported_version(self) -> None:
+        """Data serialised by another version is rejected."""
+        with pytest.raises(ValueError, match="Unsupported serialization version: 2"):
+            Phylm.from_dict({"version": 2, "title": "The Matrix"})
@@ -1,5 +1,6 @@
 """Tests for the `tools` module."""
 import os
+from typing import Any
 from typing import List
 from unittest.mock import MagicMock
 from unittest.mock import patch
@@ -10,6 +11,7 @@ from imdb.Movie import Movie
 
 from phylm.errors import NoTMDbApiKeyError
 from phylm.tools import get_streaming_providers
+from phylm.tools import iter_streaming_providers
 from phylm.tools import search_movies
 from phylm.tools import search_tmdb_movies
 
@@ -62,7 +64,7 @@ class TestSearchTmdbMovies:
         with pytest.raises(NoTMDbApiKeyError):
             search_tmdb_movies(query="The Matrix")
 
-    @patch(f"{TOOLS_MODULE_PATH}.initialize_tmdb_client", autospec=True)
+    @patch(f"{TOOLS_MODULE_PATH}.get_tmdb_client", autospec=True)
     def test_with_api_key_as_arg(self, mock_initialize_tmdb_client: MagicMock) -> None:
         """
         Given an api_key supplied as an arg,
@@ -81,7 +83,7 @@ class TestSearchTmdbMovies:
             query="The Matrix", region="us"
         )
 
-    @patch(f"{TOOLS_MODULE_PATH}.initialize_tmdb_client", autospec=True)
+    @patch(f"{TOOLS_MODULE_PATH}.get_tmdb_client", autospec=True)
     def test_different_region(self, mock_initialize_tmdb_client: MagicMock) -> None:
         """
         Given a region supplied as an arg,
@@ -103,7 +105,7 @@ class TestSearchTmdbMovies:
 class TestGetStreamingProviders:
     """Tests for the `get_streaming_providers` method."""
 
-    @patch(f"{TOOLS_MODULE_PATH}.initialize_tmdb_client", autospec=True)
+    @patch(f"{TOOLS_MODULE_PATH}.get_tmdb_client", autospec=True)
     def test_success(
         self,
         mock_initialize_client: MagicMock,
@@ -125,3 +127,42 @@ class TestGetStreamingProviders:
 
         assert results == {"gb": "Netflix"}
         mock_initialize_client.assert_called_once_with(api_key=api_key)
+
+
+@pytest.mark.asyncio()
+class TestIterStreamingProviders:
+    """Tests for the `iter_streaming_providers` function."""
+
+    @patch(f"{TOOLS_MODULE_PATH}.initialize_tmdb_client", autospec=True)
+    async def test_success(self, mock_initialize_client: MagicMock) -> None:
+        """
+        Given many movie ids,
+        When the `iter_streaming_providers` function is invoked,
+        Then one client with one session is used and every pair is yielded
+        """
+        sessions = []
+
+        async def _iter_streaming_providers(
+            movie_ids: List[str], regions: List[str], **_: Any
+        ) -> Any:
+            for movie_id in movie_ids:
+                yield movie_id, {region: {} for region in regions}
+
+        def _initialize(async_session: Any, **_: Any) -> MagicMock:
+            sessions.append(async_session)
+            client = MagicMock()
+            client.iter_streaming_providers = _iter_streaming_providers
+            return client
+
+        mock_initialize_client.side_effect = _initialize
+
+        results = [
+            pair
+            async for pair in iter_streaming_providers(
+                ["603", "604"], regions=["gb"], api_key="nice_key"
+            )
+        ]
+
+        assert results == [("603", {"gb": {}}), ("604", {"gb": {}})]
+        assert len(sessions) == 1
+        assert sessions[0].closed
@@ -0,0 +1,109 @@
+"""Tests for the `aio` module."""
+import asyncio
+from typing import List
+
+import pytest
+
+from phylm.utils.aio import SingleFlight
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestSingleFlight:
+    """Tests for the `SingleFlight` class."""
+
+    async def test_shared(self) -> None:
+        """Concurrent calls with the same key share a single call."""
+        single_flight = SingleFlight()
+        calls: List[str] = []
+
+        async def make() -> str:
+            calls.append("call")
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(
+            *[single_flight.do("key", make) for _ in range(5)]
+        )
+
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+        assert len(single_flight) == 0
+
+    async def test_distinct_keys(self) -> None:
+        """Calls with different keys aren't shared."""
+        single_flight = SingleFlight()
+        calls: List[str] = []
+
+        async def make() -> None:
+            calls.append("call")
+            await asyncio.sleep(0.01)
+
+        await asyncio.gather(single_flight.do("a", make), single_flight.do("b", make))
+
+        assert len(calls) == 2
+
+    async def test_sequential(self) -> None:
+        """A finished call isn't reused."""
+        single_flight = SingleFlight()
+        calls: List[str] = []
+
+        async def make() -> None:
+            calls.append("call")
+
+        await single_flight.do("key", make)
+        await single_flight.do("key", make)
+
+        assert len(calls) == 2
+
+    async def test_error_shared(self) -> None:
+        """The error of a call is raised to every caller."""
+        single_flight = SingleFlight()
+
+        async def make() -> None:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            single_flight.do("key", make),
+            single_flight.do("key", make),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    async def test_cancelled_caller(self) -> None:
+        """A cancelled caller doesn't cancel the call for the others."""
+        single_flight = SingleFlight()
+
+        async def make() -> str:
+            await asyncio.sleep(0.02)
+            return "result"
+
+        first = asyncio.ensure_future(single_flight.do("key", make))
+        second = asyncio.ensure_future(single_flight.do("key", make))
+        await asyncio.sleep(0)
+
+        first.cancel()
+
+        assert await second == "result"
+        assert first.cancelled()
+
+    async def test_all_callers_cancelled(self) -> None:
+        """The call is cancelled once every caller has been cancelled."""
+        single_flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def make() -> None:
+            started.set()
+            await asyncio.sleep(10)
+
+        caller = asyncio.ensure_future(single_flight.do("key", make))
+        await started.wait()
+
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+
+        assert len(single_flight) == 0
@@ -0,0 +1,293 @@
+"""Tests for the `cache` module."""
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from phylm.utils.cache import CacheMode
+from phylm.utils.cache import HttpCache
+from phylm.utils.cache import MemoryCache
+from phylm.utils.cache import ResultCache
+from phylm.utils.cache import SqliteCache
+from phylm.utils.cache import cache_mode
+from phylm.utils.cache import configure_http_cache
+from phylm.utils.cache import configure_result_cache
+from phylm.utils.cache import disable_http_cache
+from phylm.utils.cache import disable_result_cache
+from phylm.utils.cache import get_http_cache
+from phylm.utils.cache import get_result_cache
+from phylm.utils.cache import make_key
+from phylm.utils.cache import make_result_key
+
+MODULE_PATH = "phylm.utils.cache"
+
+
+@pytest.fixture(name="sqlite_cache")
+def sqlite_cache_fixture(tmp_path: Path) -> Iterator[SqliteCache]:
+    """Return a `SqliteCache` in a temporary directory."""
+    cache = SqliteCache(str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+
+class TestMemoryCache:
+    """Tests for the `MemoryCache` class."""
+
+    def test_get_set(self) -> None:
+        """A value can be stored and retrieved."""
+        cache = MemoryCache()
+
+        cache.set("foo", "bar")
+
+        assert cache.get("foo") == "bar"
+        assert cache.get("baz") is None
+
+    @patch(f"{MODULE_PATH}.time", autospec=True)
+    def test_expiry(self, mock_time: MagicMock) -> None:
+        """A value is not returned after its ttl has passed."""
+        mock_time.monotonic.return_value = 100
+        cache = MemoryCache()
+        cache.set("foo", "bar", ttl=10)
+
+        assert cache.get("foo") == "bar"
+
+        mock_time.monotonic.return_value = 110
+
+        assert cache.get("foo") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self) -> None:
+        """The least recently used entry is evicted when the cache is full."""
+        cache = MemoryCache(maxsize=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+
+        cache.set("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+    def test_delete_and_clear(self) -> None:
+        """Values can be deleted and cleared."""
+        cache = MemoryCache()
+        cache.set("a", "1")
+        cache.set("b", "2")
+
+        cache.delete("a")
+        assert cache.get("a") is None
+
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestSqliteCache:
+    """Tests for the `SqliteCache` class."""
+
+    def test_get_set(self, sqlite_cache: SqliteCache) -> None:
+        """A value can be stored and retrieved."""
+        sqlite_cache.set("foo", "bar")
+
+        assert sqlite_cache.get("foo") == "bar"
+        assert sqlite_cache.get("baz") is None
+
+    def test_persisted(self, tmp_path: Path) -> None:
+        """Values persist between connections."""
+        path = str(tmp_path / "cache.db")
+        first = SqliteCache(path)
+        first.set("foo", "bar")
+        first.close()
+
+        second = SqliteCache(path)
+
+        assert second.get("foo") == "bar"
+        second.close()
+
+    @patch(f"{MODULE_PATH}.time", autospec=True)
+    def test_expiry(self, mock_time: MagicMock, sqlite_cache: SqliteCache) -> None:
+        """A value is not returned after its ttl has passed."""
+        mock_time.time.return_value = 100
+        sqlite_cache.set("foo", "bar", ttl=10)
+
+        assert sqlite_cache.get("foo") == "bar"
+
+        mock_time.time.return_value = 110
+
+        assert sqlite_cache.get("foo") is None
+
+    def test_delete_and_clear(self, sqlite_cache: SqliteCache) -> None:
+        """Values can be deleted and cleared."""
+        sqlite_cache.set("a", "1")
+        sqlite_cache.set("b", "2")
+
+        sqlite_cache.delete("a")
+        assert sqlite_cache.get("a") is None
+
+        sqlite_cache.clear()
+        assert sqlite_cache.get("b") is None
+
+    def test_invalid_table(self, tmp_path: Path) -> None:
+        """An invalid table name is rejected."""
+        with pytest.raises(ValueError, match="is not a valid table name"):
+            SqliteCache(str(tmp_path / "cache.db"), table="a; DROP TABLE b")
+
+
+class TestHttpCache:
+    """Tests for the `HttpCache` class."""
+
+    def test_ttls(self) -> None:
+        """Source ttls take precedence over the default."""
+        cache = HttpCache(MemoryCache(), default_ttl=10, ttls={"mtc": 20})
+
+        assert cache.ttl_for("mtc") == 20
+        assert cache.ttl_for("rt") == 10
+        assert cache.ttl_for() == 10
+
+    def test_get_set(self) -> None:
+        """Responses are cached by method, url and params."""
+        cache = HttpCache(MemoryCache())
+
+        cache.set("GET", "http://a.com", {"q": "x"}, "body")
+
+        assert cache.get("GET", "http://a.com", {"q": "x"}) == "body"
+        assert cache.get("GET", "http://a.com", {"q": "y"}) is None
+        assert cache.get("GET", "http://b.com", {"q": "x"}) is None
+
+    def test_bypass(self) -> None:
+        """The cache is neither read nor written in `BYPASS` mode."""
+        cache = HttpCache(MemoryCache())
+        cache.set("GET", "http://a.com", None, "body")
+
+        with cache_mode(CacheMode.BYPASS):
+            assert cache.get("GET", "http://a.com") is None
+            cache.set("GET", "http://b.com", None, "body")
+
+        assert cache.get("GET", "http://a.com") == "body"
+        assert cache.get("GET", "http://b.com") is None
+
+    def test_refresh(self) -> None:
+        """The cache is written but not read in `REFRESH` mode."""
+        cache = HttpCache(MemoryCache())
+        cache.set("GET", "http://a.com", None, "old")
+
+        with cache_mode(CacheMode.REFRESH):
+            assert cache.get("GET", "http://a.com") is None
+            cache.set("GET", "http://a.com", None, "new")
+
+        assert cache.get("GET", "http://a.com") == "new"
+
+
+class TestResultCache:
+    """Tests for the `ResultCache` class."""
+
+    def test_get_set(self) -> None:
+        """Results are cached by source and search terms."""
+        cache = ResultCache(MemoryCache())
+        result = {"raw_title": "Alien", "data": {"title": "Alien", "year": 1979}}
+
+        cache.set("mtc", result, "Alien", 1979)
+
+        assert cache.get("mtc", "Alien", 1979) == result
+        assert cache.get("mtc", "Alien") is None
+        assert cache.get("rt", "Alien", 1979) is None
+
+    def test_ttl(self) -> None:
+        """The ttl is passed to the backend."""
+        backend = MagicMock()
+        cache = ResultCache(backend, ttl=5)
+
+        cache.set("imdb", {}, movie_id="0133093")
+
+        backend.set.assert_called_once_with(
+            make_result_key("imdb", movie_id="0133093"), "{}", 5
+        )
+
+    def test_cache_mode(self) -> None:
+        """The `CacheMode` is respected."""
+        cache = ResultCache(MemoryCache())
+        cache.set("mtc", {"data": None}, "Alien")
+
+        with cache_mode(CacheMode.REFRESH):
+            assert cache.get("mtc", "Alien") is None
+
+        with cache_mode(CacheMode.BYPASS):
+            cache.set("mtc", {"data": None}, "Aliens")
+
+        assert cache.get("mtc", "Alien") == {"data": None}
+        assert cache.get("mtc", "Aliens") is None
+
+
+class TestConfigureResultCache:
+    """Tests for configuring the global result cache."""
+
+    def test_configure_and_disable(self) -> None:
+        """The global cache can be configured and disabled."""
+        assert get_result_cache() is None
+
+        cache = configure_result_cache(ttl=5)
+
+        assert get_result_cache() is cache
+        assert isinstance(cache.backend, MemoryCache)
+        assert cache.ttl == 5
+
+        disable_result_cache()
+
+        assert get_result_cache() is None
+
+
+class TestConfigureHttpCache:
+    """Tests for configuring the global HTTP cache."""
+
+    def test_configure_and_disable(self) -> None:
+        """The global cache can be configured and disabled."""
+        assert get_http_cache() is None
+
+        cache = configure_http_cache(default_ttl=5, ttls={"tmdb": 1})
+
+        assert get_http_cache() is cache
+        assert isinstance(cache.backend, MemoryCache)
+        assert cache.ttl_for("tmdb") == 1
+
+        disable_http_cache()
+
+        assert get_http_cache() is None
+
+
+class TestMakeKey:
+    """Tests for the `make_key` function."""
+
+    def test_params_order(self) -> None:
+        """The order of params doesn't affect the key."""
+        assert make_key("GET", "u", {"a": 1, "b": 2}) == make_key(
+            "get", "u", {"b": 2, "a": 1}
+        )
+
+    def test_ignored_params(self) -> None:
+        """`None` values and the api key are ignored."""
+        assert make_key("GET", "u", {"a": 1, "b": None, "api_key": "x"}) == make_key(
+            "GET", "u", {"a": 1}
+        )
+
+
+class TestMakeResultKey:
+    """Tests for the `make_result_key` function."""
+
+    def test_title_normalized(self) -> None:
+        """Titles are compared ignoring case and surrounding whitespace."""
+        assert make_result_key("mtc", " The Matrix ", 1999) == make_result_key(
+            "mtc", "the matrix", 1999
+        )
+
+    def test_distinct(self) -> None:
+        """Different search terms have different keys."""
+        keys = {
+            make_result_key("mtc", "Alien"),
+            make_result_key("rt", "Alien"),
+            make_result_key("mtc", "Alien", 1979),
+            make_result_key("mtc", "Alien", movie_id="1"),
+        }
+
+        assert len(keys) == 4
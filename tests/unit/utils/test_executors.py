@@ -0,0 +1,158 @@
+"""Tests for the `executors` module."""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from threading import get_ident
+from typing import Iterator
+from unittest.mock import MagicMock
+
+import pytest
+
+from phylm.utils.executors import MeteredExecutor
+from phylm.utils.executors import configure_imdb_executor
+from phylm.utils.executors import configure_parse_executor
+from phylm.utils.executors import disable_imdb_executor
+from phylm.utils.executors import disable_parse_executor
+from phylm.utils.executors import get_imdb_executor
+from phylm.utils.executors import get_parse_executor
+from phylm.utils.executors import run_parser
+
+
+@pytest.fixture(autouse=True)
+def _reset_parse_executor() -> Iterator[None]:
+    """Disable any configured executors after a test."""
+    yield
+    disable_parse_executor()
+    disable_imdb_executor()
+
+
+class TestConfigureParseExecutor:
+    """Tests for configuring the parse executor."""
+
+    def test_default(self) -> None:
+        """A process pool is created by default."""
+        assert get_parse_executor() is None
+
+        executor = configure_parse_executor(max_workers=1)
+
+        assert isinstance(executor, ProcessPoolExecutor)
+        assert get_parse_executor() is executor
+
+    def test_given_executor(self) -> None:
+        """A given executor is used."""
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        assert configure_parse_executor(executor) is executor
+
+    def test_disable(self) -> None:
+        """The executor is shut down when disabled unless asked otherwise."""
+        executor = MagicMock()
+        configure_parse_executor(executor)
+
+        disable_parse_executor(shutdown=False)
+
+        assert get_parse_executor() is None
+        executor.shutdown.assert_not_called()
+
+        configure_parse_executor(executor)
+        disable_parse_executor()
+
+        executor.shutdown.assert_called_once_with()
+
+
+@pytest.mark.asyncio()
+class TestRunParser:
+    """Tests for the `run_parser` function."""
+
+    async def test_inline(self) -> None:
+        """The function is called on the event loop thread by default."""
+        assert await run_parser(get_ident) == get_ident()
+
+    async def test_executor(self) -> None:
+        """The function is called in the configured executor."""
+        configure_parse_executor(ThreadPoolExecutor(max_workers=1))
+
+        assert await run_parser(get_ident) != get_ident()
+
+
+class TestMeteredExecutor:
+    """Tests for the `MeteredExecutor` class."""
+
+    def test_metrics(self) -> None:
+        """
+        Given a metered executor with one worker,
+        When calls are submitted faster than they complete,
+        Then the calls waiting for the worker are counted in the queue depth
+        """
+        release = Event()
+        executor = MeteredExecutor(ThreadPoolExecutor(max_workers=1), max_workers=1)
+
+        futures = [executor.submit(release.wait) for _ in range(3)]
+        metrics = executor.metrics()
+
+        assert metrics["submitted"] == 3
+        assert metrics["in_flight"] == 3
+        assert metrics["queue_depth"] == 2
+
+        release.set()
+        for future in futures:
+            future.result()
+        executor.shutdown()
+
+        assert executor.metrics() == {
+            "max_workers": 1,
+            "submitted": 3,
+            "completed": 3,
+            "failed": 0,
+            "in_flight": 0,
+            "queue_depth": 0,
+            "max_queue_depth": 2,
+        }
+
+    def test_failed(self) -> None:
+        """Calls which raise are counted as failed."""
+        with MeteredExecutor(ThreadPoolExecutor(max_workers=1), max_workers=1) as ex:
+            future = ex.submit(int, "not a number")
+
+            with pytest.raises(ValueError, match="invalid literal"):
+                future.result()
+
+        assert ex.metrics()["failed"] == 1
+
+
+class TestConfigureImdbExecutor:
+    """Tests for configuring the IMDb executor."""
+
+    def test_default(self) -> None:
+        """A metered thread pool is created by default."""
+        assert get_imdb_executor() is None
+
+        executor = configure_imdb_executor(max_workers=2)
+
+        assert get_imdb_executor() is executor
+        assert isinstance(executor.executor, ThreadPoolExecutor)
+        assert executor.max_workers == 2
+
+    def test_processes(self) -> None:
+        """A metered process pool can be created."""
+        executor = configure_imdb_executor(max_workers=1, processes=True)
+
+        assert isinstance(executor.executor, ProcessPoolExecutor)
+
+    def test_given_executor(self) -> None:
+        """A given executor is wrapped."""
+        given = ThreadPoolExecutor(max_workers=3)
+
+        executor = configure_imdb_executor(given, max_workers=3)
+
+        assert executor.executor is given
+
+    def test_disable(self) -> None:
+        """The executor is shut down when disabled."""
+        given = MagicMock()
+        configure_imdb_executor(given)
+
+        disable_imdb_executor()
+
+        assert get_imdb_executor() is None
+        given.shutdown.assert_called_once_with(wait=True)
@@ -0,0 +1,122 @@
+"""Tests for the `matching` module."""
+from unittest.mock import patch
+
+import pytest
+
+from phylm.utils.matching import Candidate
+from phylm.utils.matching import score_batch
+from phylm.utils.matching import score_candidates
+from phylm.utils.matching import score_match
+
+MODULE_PATH = "phylm.utils.matching"
+
+QUERIES = [("The Matrix", 1999), ("Amelie", None), ("Alien", 1979), ("", None)]
+CANDIDATES = [
+    [
+        Candidate("The Matrix", 1999, "movie"),
+        Candidate("The Matrix Reloaded", 2003, "movie"),
+        Candidate("The Matrix", 2030, "tv series"),
+        Candidate("Matrix, The", 1998),
+    ],
+    [Candidate("Amélie", 2001), Candidate(None)],
+    [],
+    [Candidate("Alien", 1979)],
+]
+
+
+class TestScoreMatch:
+    """Tests for the `score_match` function."""
+
+    def test_exact(self) -> None:
+        """The same title, year and a movie scores 1."""
+        assert score_match(
+            "The Matrix", 1999, Candidate("the matrix!", 1999, "movie")
+        ) == pytest.approx(1)
+
+    def test_no_year(self) -> None:
+        """The year isn't scored if none is searched for."""
+        assert score_match("The Matrix", None, Candidate("The Matrix", 2030)) == 1
+
+    def test_year_distance(self) -> None:
+        """The year score falls with the distance between the years."""
+        scores = [
+            score_match("The Matrix", 1999, Candidate("The Matrix", year))
+            for year in (1999, 2000, 2001, 2002, 2010, None)
+        ]
+
+        assert scores == sorted(scores, reverse=True)
+        assert scores[3] == scores[4] == scores[5] == pytest.approx(0.7 / 0.9)
+
+    def test_kind(self) -> None:
+        """Results other than movies score lower."""
+        movie = score_match("The Matrix", None, Candidate("The Matrix", kind="movie"))
+        series = score_match(
+            "The Matrix", None, Candidate("The Matrix", kind="tv series")
+        )
+
+        assert movie == pytest.approx(1)
+        assert series == pytest.approx(0.7 / 0.8)
+
+    def test_similar_title(self) -> None:
+        """Similar titles score by their shared tokens and trigrams."""
+        score = score_match("The Matrix", None, Candidate("The Matrix Reloaded"))
+
+        # 2 of 2 and 3 tokens, 11 of 11 and 20 trigrams
+        assert score == pytest.approx((0.8 + 22 / 31) / 2)
+
+    def test_different_title(self) -> None:
+        """Unrelated titles score nothing."""
+        assert score_match("Alien", None, Candidate("Up")) == 0
+
+
+class TestScoreCandidates:
+    """Tests for the `score_candidates` function."""
+
+    def test_scores(self) -> None:
+        """Each candidate is scored."""
+        scores = score_candidates("The Matrix", 1999, CANDIDATES[0])
+
+        assert len(scores) == 4
+        assert scores[0] == max(scores)
+
+
+class TestScoreBatch:
+    """Tests for the `score_batch` function."""
+
+    def test_pure_python(self) -> None:
+        """The candidates of each query are scored without NumPy."""
+        scores = score_batch(QUERIES, CANDIDATES, use_numpy=False)
+
+        assert [len(query_scores) for query_scores in scores] == [4, 2, 0, 1]
+        assert scores[0][0] == pytest.approx(1)
+        assert scores[1][1] == 0
+        assert scores[3][0] == 0
+
+    def test_numpy(self) -> None:
+        """NumPy gives the same scores as pure Python."""
+        pytest.importorskip("numpy")
+
+        expected = score_batch(QUERIES, CANDIDATES, use_numpy=False)
+        scores = score_batch(QUERIES, CANDIDATES, use_numpy=True)
+
+        assert [len(query_scores) for query_scores in scores] == [4, 2, 0, 1]
+        for query_scores, query_expected in zip(scores, expected):
+            assert query_scores == pytest.approx(query_expected)
+
+    def test_numpy_no_candidates(self) -> None:
+        """NumPy handles queries without any candidates."""
+        pytest.importorskip("numpy")
+
+        assert score_batch(QUERIES[:1], [[]], use_numpy=True) == [[]]
+
+    def test_numpy_missing(self) -> None:
+        """NumPy can't be used if it isn't installed."""
+        with patch(f"{MODULE_PATH}.HAS_NUMPY", False), pytest.raises(
+            ValueError, match="NumPy is not installed"
+        ):
+            score_batch(QUERIES, CANDIDATES, use_numpy=True)
+
+    def test_mismatched(self) -> None:
+        """There must be a list of candidates for each query."""
+        with pytest.raises(ValueError, match="a list of candidates for each query"):
+            score_batch(QUERIES, CANDIDATES[:1])
@@ -0,0 +1,174 @@
+"""Tests for the `retry` module."""
+import asyncio
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from phylm.utils.retry import HEDGE_MIN_SAMPLES
+from phylm.utils.retry import LatencyTracker
+from phylm.utils.retry import RequestPolicies
+from phylm.utils.retry import RequestPolicy
+from phylm.utils.retry import configure_request_policies
+from phylm.utils.retry import disable_request_policies
+from phylm.utils.retry import get_request_policies
+from phylm.utils.retry import hedged
+
+MODULE_PATH = "phylm.utils.retry"
+
+
+class TestRequestPolicy:
+    """Tests for the `RequestPolicy` class."""
+
+    def test_invalid_retries(self) -> None:
+        """The number of retries can't be negative."""
+        with pytest.raises(ValueError, match="`retries` must not be negative"):
+            RequestPolicy(retries=-1)
+
+    @patch(f"{MODULE_PATH}.random", autospec=True)
+    def test_backoff_for(self, mock_random: MagicMock) -> None:
+        """The backoff is jittered up to an exponentially growing cap."""
+        mock_random.uniform.side_effect = lambda _, high: high
+        policy = RequestPolicy(backoff=0.5, max_backoff=3)
+
+        assert [policy.backoff_for(attempt) for attempt in range(4)] == [
+            0.5,
+            1,
+            2,
+            3,
+        ]
+        mock_random.uniform.assert_called_with(0, 3)
+
+    def test_backoff_for_retry_after(self) -> None:
+        """A longer `Retry-After` takes precedence over the backoff."""
+        policy = RequestPolicy(backoff=0.5, max_backoff=1)
+
+        assert policy.backoff_for(0, "30") == 30
+
+
+class TestLatencyTracker:
+    """Tests for the `LatencyTracker` class."""
+
+    def test_quantile(self) -> None:
+        """Quantiles are taken from the recent latencies."""
+        tracker = LatencyTracker(size=100)
+
+        assert tracker.quantile(0.95) is None
+
+        for latency in range(1, 201):
+            tracker.record(latency)
+
+        assert len(tracker) == 100
+        assert tracker.quantile(0.95) == 195
+        assert tracker.quantile(0) == 101
+
+
+class TestRequestPolicies:
+    """Tests for the `RequestPolicies` class."""
+
+    def test_for_source(self) -> None:
+        """Sources without their own policy use the default."""
+        default = RequestPolicy(timeout=10)
+        rt = RequestPolicy(timeout=5)
+        policies = RequestPolicies(default=default, sources={"rt": rt})
+
+        assert policies.for_source("rt") is rt
+        assert policies.for_source("mtc") is default
+        assert policies.for_source() is default
+
+    def test_hedge_delay_disabled(self) -> None:
+        """Requests aren't hedged unless enabled."""
+        policies = RequestPolicies(default=RequestPolicy(hedge_after=1))
+
+        assert policies.hedge_delay("rt") is None
+
+    def test_hedge_delay_fixed(self) -> None:
+        """A fixed hedge delay can be given."""
+        policies = RequestPolicies(default=RequestPolicy(hedge=True, hedge_after=1))
+
+        assert policies.hedge_delay("rt") == 1
+
+    def test_hedge_delay_p95(self) -> None:
+        """The hedge delay is the 95th percentile latency of the source."""
+        policies = RequestPolicies(default=RequestPolicy(hedge=True))
+        latencies = policies.latencies("rt")
+
+        for latency in range(1, HEDGE_MIN_SAMPLES):
+            latencies.record(latency)
+        assert policies.hedge_delay("rt") is None
+
+        latencies.record(HEDGE_MIN_SAMPLES)
+        assert policies.hedge_delay("rt") == 19
+        assert policies.hedge_delay("mtc") is None
+
+
+class TestHedged:
+    """Tests for the `hedged` function."""
+
+    pytestmark = pytest.mark.asyncio
+
+    async def test_fast(self) -> None:
+        """A request finishing before the delay isn't duplicated."""
+        calls = []
+
+        async def make() -> str:
+            calls.append(1)
+            return "done"
+
+        assert await hedged(make, 1) == "done"
+        assert len(calls) == 1
+
+    async def test_slow(self) -> None:
+        """A slow request is duplicated and the first result is used."""
+        delays = [1, 0]
+
+        async def make() -> float:
+            delay = delays.pop(0)
+            await asyncio.sleep(delay)
+            return delay
+
+        assert await asyncio.wait_for(hedged(make, 0.01), 0.5) == 0
+
+    async def test_failed_hedge(self) -> None:
+        """A failed duplicate doesn't replace a slow success."""
+        attempts = [0.05, None]
+
+        async def make() -> str:
+            delay = attempts.pop(0)
+            if delay is None:
+                raise ValueError("boom")
+            await asyncio.sleep(delay)
+            return "slow"
+
+        assert await hedged(make, 0.01) == "slow"
+
+    async def test_both_failed(self) -> None:
+        """The error of the first request is raised if both fail."""
+        errors = [ValueError("first"), ValueError("second")]
+
+        async def make() -> None:
+            error = errors.pop(0)
+            await asyncio.sleep(0.02)
+            raise error
+
+        with pytest.raises(ValueError, match="first"):
+            await hedged(make, 0.01)
+
+
+class TestConfigureRequestPolicies:
+    """Tests for configuring the global request policies."""
+
+    def test_configure_and_disable(self) -> None:
+        """The global request policies can be configured and disabled."""
+        assert get_request_policies() is None
+
+        policies = configure_request_policies(
+            default=RequestPolicy(retries=2), sources={"rt": RequestPolicy(timeout=5)}
+        )
+
+        assert get_request_policies() is policies
+        assert policies.for_source("mtc").retries == 2
+
+        disable_request_policies()
+
+        assert get_request_policies() is None
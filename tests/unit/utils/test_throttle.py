@@ -0,0 +1,180 @@
+"""Tests for the `throttle` module."""
+import asyncio
+from email.utils import formatdate
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from phylm.utils.throttle import HostThrottle
+from phylm.utils.throttle import RateLimiter
+from phylm.utils.throttle import configure_rate_limiter
+from phylm.utils.throttle import disable_rate_limiter
+from phylm.utils.throttle import get_rate_limiter
+from phylm.utils.throttle import parse_retry_after
+
+MODULE_PATH = "phylm.utils.throttle"
+
+
+class TestHostThrottle:
+    """Tests for the `HostThrottle` class."""
+
+    def test_invalid_rate(self) -> None:
+        """A rate must be positive."""
+        with pytest.raises(ValueError, match="`rate` must be positive"):
+            HostThrottle(rate=0)
+
+    def test_invalid_concurrency(self) -> None:
+        """The minimum concurrency can't exceed the maximum."""
+        with pytest.raises(ValueError, match="`min_concurrency` must be at least 1"):
+            HostThrottle(max_concurrency=2, min_concurrency=3)
+
+    @patch(f"{MODULE_PATH}.time", autospec=True)
+    def test_token_bucket(self, mock_time: MagicMock) -> None:
+        """Requests beyond the burst wait for the bucket to refill."""
+        mock_time.monotonic.return_value = 100
+        throttle = HostThrottle(rate=2, burst=2)
+
+        throttle.wait()
+        throttle.wait()
+
+        mock_time.sleep.side_effect = lambda seconds: setattr(
+            mock_time.monotonic, "return_value", 100 + seconds
+        )
+        throttle.wait()
+
+        mock_time.sleep.assert_called_once_with(0.5)
+
+    def test_aimd(self) -> None:
+        """The limit halves on throttled responses and ramps up on success."""
+        throttle = HostThrottle(max_concurrency=8, min_concurrency=2, backoff=0)
+
+        throttle.record(429)
+        assert throttle.limit == 4
+
+        throttle.record(503)
+        throttle.record(503)
+        assert throttle.limit == 2
+
+        throttle.record(200)
+        throttle.record(200)
+        assert throttle.limit == pytest.approx(2.9)
+
+        for _ in range(100):
+            throttle.record(200)
+        assert throttle.limit == 8
+
+    def test_server_errors_ignored(self) -> None:
+        """Other server errors and failed requests don't change the limit."""
+        throttle = HostThrottle(max_concurrency=8)
+        throttle.record(429)
+
+        throttle.record(500)
+        throttle.record(None)
+
+        assert throttle.limit == 4
+
+    @patch(f"{MODULE_PATH}.time", autospec=True)
+    def test_retry_after(self, mock_time: MagicMock) -> None:
+        """A throttled response pauses requests until its `Retry-After`."""
+        mock_time.monotonic.return_value = 100
+        throttle = HostThrottle(backoff=1)
+
+        throttle.record(429, "30")
+        assert throttle.blocked_until == 130
+
+        throttle.record(429)
+        assert throttle.blocked_until == 130
+
+        mock_time.monotonic.return_value = 140
+        throttle.record(503)
+        assert throttle.blocked_until == 141
+
+    @pytest.mark.asyncio()
+    async def test_concurrency(self) -> None:
+        """Requests beyond the concurrency limit wait for a slot to be released."""
+        throttle = HostThrottle(rate=1000, max_concurrency=1)
+        await throttle.acquire()
+
+        waiting = asyncio.ensure_future(throttle.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+        throttle.release(200)
+        await asyncio.wait_for(waiting, 1)
+
+        assert throttle.in_flight == 1
+
+    @pytest.mark.asyncio()
+    async def test_cancelled_waiter(self) -> None:
+        """A cancelled request gives up its place in the queue."""
+        throttle = HostThrottle(rate=1000, max_concurrency=1)
+        await throttle.acquire()
+        waiting = asyncio.ensure_future(throttle.acquire())
+        await asyncio.sleep(0.01)
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        throttle.release(200)
+
+        assert throttle.in_flight == 0
+        await asyncio.wait_for(throttle.acquire(), 1)
+
+
+class TestRateLimiter:
+    """Tests for the `RateLimiter` class."""
+
+    def test_for_url(self) -> None:
+        """Each host has its own throttle."""
+        limiter = RateLimiter(rate=3)
+
+        first = limiter.for_url("https://www.metacritic.com/search/alien")
+        second = limiter.for_url("https://WWW.metacritic.com/movie/alien")
+        other = limiter.for_url("https://www.rottentomatoes.com/search")
+
+        assert first is second
+        assert first is not other
+        assert first.rate == 3
+
+    def test_host_overrides(self) -> None:
+        """A host's throttle can be overridden."""
+        tmdb = HostThrottle(rate=40)
+        limiter = RateLimiter(hosts={"api.themoviedb.org": tmdb})
+
+        assert limiter.for_url("https://api.themoviedb.org/3/movie/603") is tmdb
+
+
+class TestParseRetryAfter:
+    """Tests for the `parse_retry_after` function."""
+
+    def test_seconds(self) -> None:
+        """A number of seconds is parsed."""
+        assert parse_retry_after(" 120 ") == 120
+
+    def test_http_date(self) -> None:
+        """A HTTP date is converted to the seconds until then."""
+        with patch(f"{MODULE_PATH}.time.time", return_value=1_000_000_000):
+            assert parse_retry_after(formatdate(1_000_000_060, usegmt=True)) == 60
+
+    @pytest.mark.parametrize("value", [None, "", "soon", "-5"])
+    def test_invalid(self, value: str) -> None:
+        """An invalid value is ignored."""
+        assert parse_retry_after(value) is None
+
+
+class TestConfigureRateLimiter:
+    """Tests for configuring the global rate limiter."""
+
+    def test_configure_and_disable(self) -> None:
+        """The global rate limiter can be configured and disabled."""
+        assert get_rate_limiter() is None
+
+        limiter = configure_rate_limiter(rate=2, max_concurrency=4)
+
+        assert get_rate_limiter() is limiter
+        assert limiter.for_host("a.com").max_concurrency == 4
+
+        disable_rate_limiter()
+
+        assert get_rate_limiter() is None
@@ -0,0 +1,232 @@
+"""Tests for the `title_index` module."""
+from pathlib import Path
+from typing import Iterator
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+
+from phylm.utils.title_index import TitleEntry
+from phylm.utils.title_index import TitleIndex
+from phylm.utils.title_index import TitleMatch
+from phylm.utils.title_index import configure_title_index
+from phylm.utils.title_index import disable_title_index
+from phylm.utils.title_index import get_title_index
+from phylm.utils.title_index import normalize_title
+from phylm.utils.title_index import trigrams
+
+ENTRIES = [
+    TitleEntry("0133093", "The Matrix", 1999, 2000000),
+    TitleEntry("9999991", "The Matrix", 2012, 12),
+    TitleEntry("0234215", "The Matrix Reloaded", 2003, 620000),
+    TitleEntry("0211915", "Amélie", 2001, 780000),
+    TitleEntry("0211915", "Le fabuleux destin d'Amélie Poulain", 2001, 780000),
+    TitleEntry("0078748", "Alien", 1979, 950000),
+    TitleEntry("0000000", "!!!"),
+]
+
+
+SIMILAR_ENTRIES = [
+    TitleEntry("0110475", "The Mask", 1994, 410000),
+    TitleEntry("0234215", "The Matrix Reloaded", 2003, 620000),
+    TitleEntry("0107529", "Matrix", 1993, 100),
+    TitleEntry("0146193", "The Mist", 1999, 300000),
+]
+
+
+@pytest.fixture(name="index")
+def index_fixture(tmp_path: Path) -> Iterator[TitleIndex]:
+    """Build an index of a few titles."""
+    with TitleIndex.build(tmp_path / "titles.db", ENTRIES) as index:
+        yield index
+
+
+class TestNormalizeTitle:
+    """Tests for the `normalize_title` function."""
+
+    @pytest.mark.parametrize(
+        ("title", "expected"),
+        [
+            ("The Matrix", "the matrix"),
+            ("Amélie", "amelie"),
+            ("  Alien:   Resurrection! ", "alien resurrection"),
+            (
+                "Le fabuleux destin d'Amélie Poulain",
+                "le fabuleux destin d amelie poulain",
+            ),
+            ("!!!", ""),
+        ],
+    )
+    def test_normalize_title(self, title: str, expected: str) -> None:
+        """Titles are lowercased and stripped of accents and punctuation."""
+        assert normalize_title(title) == expected
+
+
+class TestTrigrams:
+    """Tests for the `trigrams` function."""
+
+    def test_trigrams(self) -> None:
+        """The title is padded before taking its trigrams."""
+        assert trigrams("alien") == {"  a", " al", "ali", "lie", "ien", "en "}
+
+    def test_empty(self) -> None:
+        """An empty title has no trigrams."""
+        assert trigrams("") == set()
+
+
+class TestBuild:
+    """Tests for building an index."""
+
+    def test_build(self, index: TitleIndex) -> None:
+        """Titles which are empty once normalised are skipped."""
+        assert len(index) == 6
+
+    def test_replace(self, tmp_path: Path) -> None:
+        """Building replaces an existing index."""
+        path = tmp_path / "titles.db"
+        TitleIndex.build(path, ENTRIES).close()
+
+        with TitleIndex.build(path, ENTRIES[:1]) as index:
+            assert len(index) == 1
+
+    def test_not_an_index(self, tmp_path: Path) -> None:
+        """A missing index can't be opened."""
+        with pytest.raises(ValueError, match="is not a title index"):
+            TitleIndex(tmp_path / "missing.db")
+
+
+class TestLookup:
+    """Tests for the `lookup` method."""
+
+    def test_most_popular_first(self, index: TitleIndex) -> None:
+        """Matching titles are ordered by popularity."""
+        assert index.lookup("THE MATRIX") == [
+            TitleMatch("0133093", "The Matrix", 1999, 1.0),
+            TitleMatch("9999991", "The Matrix", 2012, 1.0),
+        ]
+
+    def test_year_first(self, index: TitleIndex) -> None:
+        """Titles of the given year come first."""
+        assert [match.year for match in index.lookup("The Matrix", 2012)] == [
+            2012,
+            1999,
+        ]
+
+    def test_normalised(self, index: TitleIndex) -> None:
+        """Titles match once normalised."""
+        assert [match.title for match in index.lookup("amelie")] == ["Amélie"]
+
+    def test_no_match(self, index: TitleIndex) -> None:
+        """Only whole titles match."""
+        assert index.lookup("Matrix") == []
+
+
+class TestSearch:
+    """Tests for the `search` method."""
+
+    def test_similar(self, index: TitleIndex) -> None:
+        """Titles sharing enough trigrams are returned, most similar first."""
+        results = index.search("The Matrix Reloded")
+
+        assert [match.title for match in results] == [
+            "The Matrix Reloaded",
+            "The Matrix",
+            "The Matrix",
+        ]
+        assert results[0].score == pytest.approx(2 * 17 / (19 + 20))
+        assert results[1].movie_id == "0133093"
+
+    def test_exact(self, index: TitleIndex) -> None:
+        """A matching title scores 1."""
+        assert index.search("Alien") == [TitleMatch("0078748", "Alien", 1979, 1.0)]
+
+    def test_limit_and_min_score(self, index: TitleIndex) -> None:
+        """The number and similarity of the results can be limited."""
+        assert len(index.search("The Matrix Reloded", limit=1)) == 1
+        assert index.search("The Matrix Reloded", min_score=0.9) == []
+
+    @pytest.mark.parametrize("title", ["zzzz", "", "?"])
+    def test_no_match(self, index: TitleIndex, title: str) -> None:
+        """Nothing is returned without similar titles."""
+        assert index.search(title) == []
+
+
+class TestResolve:
+    """Tests for the `resolve` method."""
+
+    def test_exact(self, index: TitleIndex) -> None:
+        """The most popular matching title is picked."""
+        assert index.resolve("The Matrix") == (
+            TitleMatch("0133093", "The Matrix", 1999, 1.0),
+            False,
+        )
+
+    def test_year(self, index: TitleIndex) -> None:
+        """A matching title of the given year is picked first."""
+        assert index.resolve("The Matrix", 2012) == (
+            TitleMatch("9999991", "The Matrix", 2012, 1.0),
+            False,
+        )
+
+    def test_exact_not_searched(self, index: TitleIndex) -> None:
+        """Similar titles aren't searched for when a title matches."""
+        with patch.object(index, "search") as mock_search:
+            index.resolve("The Matrix", 1999)
+
+        mock_search.assert_not_called()
+
+    def test_similar(self, index: TitleIndex) -> None:
+        """Without a matching title the most similar is picked with low confidence."""
+        match, low_confidence = index.resolve("The Matrixy") or (None, False)
+
+        assert match is not None
+        assert match.movie_id == "0133093"
+        assert low_confidence is True
+
+    def test_similar_year(self, index: TitleIndex) -> None:
+        """A similar title of the given year is still low confidence."""
+        match, low_confidence = index.resolve("The Matrix Reloded", 2003) or (
+            None,
+            False,
+        )
+
+        assert match is not None
+        assert match.movie_id == "0234215"
+        assert low_confidence is True
+
+    def test_similar_other_year(self, index: TitleIndex) -> None:
+        """A similar title from another year than the given one isn't picked."""
+        assert index.resolve("The Matrix Reloded", 1999) is None
+
+    @pytest.mark.parametrize("year", [None, 1999])
+    def test_only_loosely_similar(self, tmp_path: Path, year: Optional[int]) -> None:
+        """
+        Given an index without the title but with titles sharing some of its words,
+        When the title is resolved,
+        Then nothing is picked
+        """
+        with TitleIndex.build(tmp_path / "titles.db", SIMILAR_ENTRIES) as index:
+            assert index.resolve("The Matrix", year) is None
+
+    def test_no_match(self, index: TitleIndex) -> None:
+        """`None` is returned without any matches."""
+        assert index.resolve("zzzz") is None
+
+
+class TestConfigureTitleIndex:
+    """Tests for configuring the global index."""
+
+    def test_configure_and_disable(self, tmp_path: Path) -> None:
+        """The global index can be configured and disabled."""
+        TitleIndex.build(tmp_path / "titles.db", ENTRIES).close()
+
+        assert get_title_index() is None
+
+        index = configure_title_index(tmp_path / "titles.db")
+
+        assert get_title_index() is index
+        assert len(index) == 6
+
+        disable_title_index()
+
+        assert get_title_index() is None
@@ -1,13 +1,40 @@
 """Tests for the utils module."""
+import asyncio
+from typing import Iterator
+from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import Mock
 from unittest.mock import patch
 
+import pytest
+import requests
 from aiohttp import ClientSession
+from aiohttp import ClientTimeout
+from aiohttp import web
 from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 
+from phylm.utils.cache import CacheMode
+from phylm.utils.cache import HttpCache
+from phylm.utils.cache import MemoryCache
+from phylm.utils.cache import cache_mode
+from phylm.utils.cache import configure_http_cache
+from phylm.utils.cache import disable_http_cache
+from phylm.utils.retry import RequestPolicy
+from phylm.utils.retry import configure_request_policies
+from phylm.utils.retry import disable_request_policies
+from phylm.utils.throttle import RateLimiter
+from phylm.utils.throttle import configure_rate_limiter
+from phylm.utils.throttle import disable_rate_limiter
 from phylm.utils.web import DEFAULT_HEADERS
+from phylm.utils.web import async_get_text
 from phylm.utils.web import async_soupify
+from phylm.utils.web import get_parser
+from phylm.utils.web import get_request_coalescing
+from phylm.utils.web import get_text
+from phylm.utils.web import make_soup
+from phylm.utils.web import set_parser
+from phylm.utils.web import set_request_coalescing
 from phylm.utils.web import soupify
 from phylm.utils.web import url_encode
 from tests.conftest import FIXTURES_DIR
@@ -32,6 +59,45 @@ class TestUrlEncode:
         assert result == "A+film+with+a+%2F+symbol"
 
 
+class TestParser:
+    """Tests for selecting the parser."""
+
+    @pytest.fixture(autouse=True)
+    def _reset_parser(self) -> Iterator[None]:
+        """Restore the default parser after a test."""
+        yield
+        set_parser()
+
+    def test_set_parser(self) -> None:
+        """An installed parser can be selected."""
+        set_parser("html.parser")
+
+        assert get_parser() == "html.parser"
+
+    def test_unknown_parser(self) -> None:
+        """An unknown parser is rejected."""
+        with pytest.raises(ValueError, match="blort is not an installed"):
+            set_parser("blort")
+
+    @patch("phylm.utils.web.builder_registry", autospec=True)
+    def test_default_parser(self, mock_registry: MagicMock) -> None:
+        """The fastest available parser is the default."""
+        mock_registry.lookup.side_effect = lambda name: name == "html.parser"
+
+        set_parser()
+
+        assert get_parser() == "html.parser"
+
+    def test_make_soup_parse_only(self) -> None:
+        """Only elements matching the strainer are parsed."""
+        html = "<html><p>intro</p><ul><li class='result'><a>Alien</a></li></ul></html>"
+
+        soup = make_soup(html, parse_only=SoupStrainer("li"))
+
+        assert soup.find("p") is None
+        assert soup.find("li").a.string == "Alien"
+
+
 class TestSoupify:
     """Tests for the `soupify` function."""
 
@@ -104,3 +170,315 @@ class TestAsyncSoupify:
         await async_soupify(url=url, session=session)
 
         assert not session.closed
+
+
+class TestCachedRequests:
+    """Tests for requests made with the HTTP cache configured."""
+
+    @pytest.fixture(autouse=True)
+    def _http_cache(self) -> Iterator[HttpCache]:
+        """Enable the HTTP cache for the duration of a test."""
+        yield configure_http_cache(MemoryCache())
+        disable_http_cache()
+
+    @patch("phylm.utils.web.requests", autospec=True)
+    def test_get_text_cached(self, mock_requests: MagicMock) -> None:
+        """A successful response is only requested once."""
+        url = "https://movies.com/search/the+great+movie"
+        mock_requests.get.return_value = Mock(text="body", ok=True)
+
+        assert get_text(url, source="mtc") == "body"
+        assert get_text(url, source="mtc") == "body"
+
+        mock_requests.get.assert_called_once()
+
+    @patch("phylm.utils.web.requests", autospec=True)
+    def test_get_text_not_ok(self, mock_requests: MagicMock) -> None:
+        """An unsuccessful response is not cached."""
+        url = "https://movies.com/search/the+great+movie"
+        mock_requests.get.return_value = Mock(text="error", ok=False)
+
+        get_text(url)
+        get_text(url)
+
+        assert mock_requests.get.call_count == 2
+
+    @patch("phylm.utils.web.requests", autospec=True)
+    def test_get_text_refresh(self, mock_requests: MagicMock) -> None:
+        """A cached response is refetched in `REFRESH` mode."""
+        url = "https://movies.com/search/the+great+movie"
+        mock_requests.get.return_value = Mock(text="body", ok=True)
+        get_text(url)
+
+        with cache_mode(CacheMode.REFRESH):
+            get_text(url)
+
+        assert mock_requests.get.call_count == 2
+
+    @pytest.mark.asyncio()
+    async def test_async_get_text_cached(self) -> None:
+        """A successful async response is only requested once."""
+        url = "http://httpbin.org"
+
+        with my_vcr.use_cassette(
+            f"{VCR_FIXTURES_DIR}/async_soupify.yaml",
+            serializer="response_body_compressor",
+            allow_playback_repeats=True,
+        ) as cass:
+            first = await async_get_text(url, source="mtc")
+            second = await async_get_text(url, source="mtc")
+
+            assert cass.play_count == 1
+
+        assert first == second
+
+
+class TestRateLimitedRequests:
+    """Tests for requests made with the rate limiter configured."""
+
+    @pytest.fixture(name="rate_limiter", autouse=True)
+    def rate_limiter_fixture(self) -> Iterator[RateLimiter]:
+        """Enable the rate limiter for the duration of a test."""
+        yield configure_rate_limiter(max_concurrency=4)
+        disable_rate_limiter()
+
+    @patch("phylm.utils.web.requests", autospec=True)
+    def test_get_text_throttled(
+        self, mock_requests: MagicMock, rate_limiter: RateLimiter
+    ) -> None:
+        """A throttled response pauses requests to the host and lowers its limit."""
+        url = "https://movies.com/search/the+great+movie"
+        mock_requests.get.return_value = Mock(
+            text="slow down", ok=False, status_code=429, headers={"Retry-After": "30"}
+        )
+
+        get_text(url)
+
+        throttle = rate_limiter.for_host("movies.com")
+        assert throttle.limit == 2
+        assert throttle.blocked_until > 0
+
+    @pytest.mark.asyncio()
+    async def test_async_get_text_released(self, rate_limiter: RateLimiter) -> None:
+        """The concurrency slot is released once the response is received."""
+        url = "http://httpbin.org"
+
+        with my_vcr.use_cassette(
+            f"{VCR_FIXTURES_DIR}/async_soupify.yaml",
+            serializer="response_body_compressor",
+        ):
+            await async_get_text(url)
+
+        throttle = rate_limiter.for_host("httpbin.org")
+        assert throttle.in_flight == 0
+        assert throttle.limit == 4
+
+
+def _async_response(status: int, text: str = "body") -> MagicMock:
+    """Return a mock of the context manager returned by `ClientSession.get`."""
+    resp = MagicMock(status=status, headers={})
+    resp.text = AsyncMock(return_value=text)
+    context = MagicMock()
+    context.__aenter__.return_value = resp
+    return context
+
+
+class TestRequestPolicies:
+    """Tests for requests made with request policies configured."""
+
+    @pytest.fixture(autouse=True)
+    def _request_policies(self) -> Iterator[None]:
+        """Configure the request policies for the duration of a test."""
+        configure_request_policies(
+            default=RequestPolicy(retries=2, backoff=0),
+            sources={"rt": RequestPolicy(timeout=5, read_timeout=2)},
+        )
+        yield
+        disable_request_policies()
+
+    @patch("phylm.utils.web.requests", autospec=True)
+    def test_get_text_retried(self, mock_requests: MagicMock) -> None:
+        """A response with a retryable status is retried."""
+        mock_requests.get.side_effect = [
+            Mock(status_code=503, headers={}),
+            Mock(status_code=200, text="body", ok=True),
+        ]
+
+        assert get_text("https://movies.com") == "body"
+        assert mock_requests.get.call_count == 2
+
+    @patch("phylm.utils.web.requests", autospec=True)
+    def test_get_text_retries_exhausted(self, mock_requests: MagicMock) -> None:
+        """The error is raised once the retries are exhausted."""
+        mock_requests.ConnectionError = requests.ConnectionError
+        mock_requests.Timeout = requests.Timeout
+        mock_requests.get.side_effect = requests.ConnectionError("refused")
+
+        with pytest.raises(requests.ConnectionError):
+            get_text("https://movies.com")
+
+        assert mock_requests.get.call_count == 3
+
+    @patch("phylm.utils.web.requests", autospec=True)
+    def test_get_text_timeout(self, mock_requests: MagicMock) -> None:
+        """The source's connect and read timeouts are passed to the request."""
+        mock_requests.get.return_value = Mock(status_code=200, text="body", ok=True)
+
+        get_text("https://movies.com", source="rt")
+
+        mock_requests.get.assert_called_once_with(
+            "https://movies.com", headers=None, timeout=(5, 2)
+        )
+
+    @pytest.mark.asyncio()
+    async def test_async_get_text_retried(self) -> None:
+        """A timed out request is retried."""
+        session = MagicMock()
+        session.get.side_effect = [asyncio.TimeoutError(), _async_response(200)]
+
+        assert await async_get_text("https://movies.com", session=session) == "body"
+        assert session.get.call_count == 2
+
+    @pytest.mark.asyncio()
+    async def test_async_get_text_raise_for_status(self) -> None:
+        """The last response is checked once the retries are exhausted."""
+        responses = [_async_response(503) for _ in range(3)]
+        session = MagicMock()
+        session.get.side_effect = responses
+
+        await async_get_text(
+            "https://movies.com", session=session, raise_for_status=True
+        )
+
+        assert session.get.call_count == 3
+        last = responses[-1].__aenter__.return_value
+        last.raise_for_status.assert_called_once()
+
+    @pytest.mark.asyncio()
+    async def test_async_get_text_timeout(self) -> None:
+        """The source's timeouts are passed to the request."""
+        session = MagicMock()
+        session.get.return_value = _async_response(200)
+
+        await async_get_text("https://movies.com", session=session, source="rt")
+
+        session.get.assert_called_once_with(
+            "https://movies.com",
+            params=None,
+            headers=None,
+            timeout=ClientTimeout(total=5, sock_read=2),
+        )
+
+
+class TestRequestCoalescing:
+    """Tests for coalescing concurrent identical requests."""
+
+    @pytest.fixture(autouse=True)
+    def _reset_coalescing(self) -> Iterator[None]:
+        """Restore request coalescing after a test."""
+        yield
+        set_request_coalescing()
+
+    @pytest.mark.asyncio()
+    async def test_coalesced(self) -> None:
+        """Concurrent identical requests share a single request."""
+        session = MagicMock()
+        session.get.return_value = _async_response(200)
+
+        results = await asyncio.gather(
+            *[async_get_text("https://movies.com", session=session) for _ in range(3)]
+        )
+
+        assert results == ["body"] * 3
+        session.get.assert_called_once()
+
+    @pytest.mark.asyncio()
+    async def test_different_params(self) -> None:
+        """Requests with different params aren't coalesced."""
+        session = MagicMock()
+        session.get.return_value = _async_response(200)
+
+        await asyncio.gather(
+            async_get_text("https://movies.com", session=session, params={"q": "a"}),
+            async_get_text("https://movies.com", session=session, params={"q": "b"}),
+        )
+
+        assert session.get.call_count == 2
+
+    @pytest.mark.asyncio()
+    async def test_raise_for_status_per_caller(self) -> None:
+        """Each caller checks the shared response's status as it asked."""
+        session = MagicMock()
+        session.get.return_value = _async_response(404)
+        resp = session.get.return_value.__aenter__.return_value
+        resp.raise_for_status.side_effect = ValueError("not found")
+
+        results = await asyncio.gather(
+            async_get_text("https://movies.com", session=session),
+            async_get_text(
+                "https://movies.com", session=session, raise_for_status=True
+            ),
+            return_exceptions=True,
+        )
+
+        assert results[0] == "body"
+        assert isinstance(results[1], ValueError)
+        session.get.assert_called_once()
+
+    @pytest.mark.asyncio()
+    async def test_different_sessions(self) -> None:
+        """
+        Given two callers requesting the same url in their own sessions,
+        When the first caller times out and closes its session while the request is
+            being retried,
+        Then the second caller still gets the response
+        """
+        calls = []
+
+        async def unavailable_once(_: web.Request) -> web.Response:
+            calls.append(1)
+            if len(calls) == 1:
+                return web.Response(status=503, headers={"Retry-After": "1"})
+            return web.Response(text="body")
+
+        app = web.Application()
+        app.router.add_get("/", unavailable_once)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        url = f"http://127.0.0.1:{port}/"
+
+        async def first() -> None:
+            async with ClientSession() as session:
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(async_get_text(url, session=session), 0.1)
+
+        async def second() -> str:
+            await asyncio.sleep(0.01)
+            async with ClientSession() as session:
+                return await async_get_text(url, session=session)
+
+        configure_request_policies(default=RequestPolicy(retries=1, backoff=0))
+        try:
+            _, text = await asyncio.gather(first(), second())
+        finally:
+            disable_request_policies()
+            await runner.cleanup()
+
+        assert text == "body"
+
+    @pytest.mark.asyncio()
+    async def test_disabled(self) -> None:
+        """Requests aren't coalesced when disabled."""
+        set_request_coalescing(False)
+        session = MagicMock()
+        session.get.return_value = _async_response(200)
+
+        await asyncio.gather(
+            *[async_get_text("https://movies.com", session=session) for _ in range(3)]
+        )
+
+        assert get_request_coalescing() is False
+        assert session.get.call_count == 3